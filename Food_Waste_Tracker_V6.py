@@ -1,5 +1,6 @@
 import datetime as dt
 import csv
+import heapq
 
 beenden_message = "\nProgramm beendet."
 file_not_found_message = "Datei nicht gefunden. Sie müssen zuerst eine Liste anlegen oder die Datei in den Ordner des Programmes verschieben."
@@ -127,10 +128,9 @@ def get_top3():
                     no_doubles_dict[food_name] +=  food_amount
                 except KeyError:
                     no_doubles_dict[food_name] = food_amount
-            no_doubles_list = list(no_doubles_dict.items())
-            sorted_no_doubles_list = sorted(no_doubles_list, key=lambda item: item[1], reverse=True)
-            # True: Liste absteigend sortiert, lambda item: item[1]: Anonyme Funktion, die item[1] returnt (unseren int)
-            top_3_list = sorted_no_doubles_list[:3:]
+            # Heap statt komplettem Sortieren: nur die 3 größten Mengen werden behalten, bei Gleichstand alphabetisch
+            # lambda item: (-item[1], item[0]): negierte Menge (absteigend), dann Name (aufsteigend)
+            top_3_list = heapq.nsmallest(3, no_doubles_dict.items(), key=lambda item: (-item[1], item[0]))
             return top_3_list, True
     except FileNotFoundError:
         return [], False
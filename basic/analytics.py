@@ -1,4 +1,5 @@
 
+import heapq
 from collections import Counter     # Importiert Counter, um automatisch counts für listen zu erstellen
 
 class Analytics:
@@ -9,8 +10,8 @@ class Analytics:
         grams_by_item = {}
         for e in entries:
             grams_by_item[e.item] = grams_by_item.get(e.item, 0) + e.grams      # Erstellt einen Eintrag oder ruft den aktuellen auf, nimmt den Eintrag oder 0 und fügt die grams für den aktuellen Eintrag hinzu
-        return sorted(grams_by_item.items(), key=lambda kv: kv[1], reverse=True)[:3]    # .items() bringt das dict als liste mit tuplen: [(key, value)]
-        # Sortiert das Dict nach den Values vom Schlüssel [1] (Grams) absteigend und vom 0. bis 2. Eintrag
+        # Heap statt komplettem Sortieren: nur die 3 größten werden behalten; bei Gleichstand alphabetisch nach Item
+        return heapq.nsmallest(3, grams_by_item.items(), key=lambda kv: (-kv[1], kv[0]))    # .items() bringt das dict als liste mit tuplen: [(key, value)]
 
     def waste_in_period(self, entries, start_date, end_date):   # Erklärt sich von selbst
         if end_date < start_date:
@@ -54,30 +54,35 @@ class CsvImporter:
                 )
 
             # Zeilen abarbeiten (Zeile 1 = Header => start=2)
-            for i, row in enumerate(reader, start=2):
-                try:
-                    raw_date = row["DATE"]
-                    raw_item = row["ITEM"]
-                    raw_grams = row["GRAMS"]
-                    raw_reason = row["REASON"]
-
-                    if not raw_item or not str(raw_item).strip():
-                        raise ValueError("ITEM ist leer.")
-
-                    d = parse_date_or_today(raw_date)
-                    grams = parse_int_nonnegative(raw_grams)
-                    reason = (raw_reason or "").strip()
-
-                    # ID wird NICHT aus der CSV gelesen, sondern neu vergeben
-                    entry = new_entry(raw_item, grams, reason, d)
-
-                    if not dry_run:
-                        store.append(entry)
-
-                    added += 1
-                except Exception as ex:
-                    errors.append(f"line {i}: {ex}")
-                    skipped += 1
+            def valid_entries():
+                nonlocal skipped
+                for i, row in enumerate(reader, start=2):
+                    try:
+                        raw_date = row["DATE"]
+                        raw_item = row["ITEM"]
+                        raw_grams = row["GRAMS"]
+                        raw_reason = row["REASON"]
+
+                        if not raw_item or not str(raw_item).strip():
+                            raise ValueError("ITEM ist leer.")
+
+                        d = parse_date_or_today(raw_date)
+                        grams = parse_int_nonnegative(raw_grams)
+                        reason = (raw_reason or "").strip()
+
+                        # ID wird NICHT aus der CSV gelesen, sondern neu vergeben
+                        entry = new_entry(raw_item, grams, reason, d)
+                    except Exception as ex:
+                        errors.append(f"line {i}: {ex}")
+                        skipped += 1
+                        continue
+                    yield entry
+
+            if dry_run:
+                added = sum(1 for _ in valid_entries())
+            else:
+                # Alle gültigen Einträge blockweise über ein Dateihandle schreiben
+                added = store.append_many(valid_entries())
 
         return {
             "added": added,
@@ -30,6 +30,37 @@ class Store:
             f.write(json.dumps(entry.to_dict(), ensure_ascii=False) + "\n")     # dumps wandelt dict in json-String um
             # Schreibt in die Datei ein dump für den übergebenen Entry-Eintrag mit utf-8 und fügt einen Zeilenumbruch ein
 
+    def append_many(self, entries, batch_size=1000):
+        """
+        Viele Einträge über ein einziges Dateihandle anhängen (z.B. beim CSV-Import).
+        Je batch_size Einträge werden komplett serialisiert und in einem Stück geschrieben.
+        Schlägt ein Block fehl, wird die Datei auf den Stand davor gekürzt, damit keine halbe Zeile bleibt.
+        Gibt die Anzahl geschriebener Einträge zurück.
+        """
+        written = 0
+        with open(self.path, "ab", buffering=0) as f:   # Binär: tell()/truncate() arbeiten mit exakten Byte-Offsets
+            batch = []
+            for e in entries:
+                batch.append(json.dumps(e.to_dict(), ensure_ascii=False) + "\n")
+                if len(batch) >= batch_size:
+                    self._write_batch(f, batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                self._write_batch(f, batch)
+                written += len(batch)
+        return written
+
+    def _write_batch(self, f, lines):
+        payload = memoryview("".join(lines).encode("utf-8"))
+        offset = f.tell()
+        try:
+            while payload:
+                payload = payload[f.write(payload):]    # write() kann weniger Bytes schreiben als übergeben
+        except BaseException:
+            f.truncate(offset)      # Angefangenen Block wieder entfernen
+            raise
+
     def read_all(self):
         """Alle Einträge aus der JSONL-Datei als Entry-Objekte laden."""
         res = []
@@ -1,13 +1,22 @@
 
 import os
 from datetime import datetime, date
+from functools import lru_cache
 
 DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%Y/%m/%d"]
 
 def parse_date_or_today(s):
     if not s or not str(s).strip():
         return datetime.today().date()
-    s = str(s).strip()
+    return _parse_date_cached(str(s).strip())
+
+@lru_cache(maxsize=4096)    # Importe haben nur wenige tausend verschiedene Daten -> Wiederholungen aus dem Cache
+def _parse_date_cached(s):
+    if len(s) == 10 and s[4] == "-" and s[7] == "-":
+        try:
+            return date.fromisoformat(s)    # Schneller Weg für YYYY-MM-DD ohne strptime
+        except ValueError:
+            pass
     last_err = None
     for f in DATE_FORMATS:
         try:
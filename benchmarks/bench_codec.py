@@ -0,0 +1,55 @@
+# Mikro-Benchmark: generischer Weg (TO_DICT + json.dumps / json.loads + FROM_DICT, csv.DictWriter)
+# gegen die spezialisierten Routinen aus codec.py. Prüft vorher, dass die Ausgabe byte-identisch ist.
+# Aufruf: PYTHONPATH=src python benchmarks/bench_codec.py [ANZAHL]
+from __future__ import annotations
+import csv
+import io
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from food_waste_tracker.codec import CSV_ROW, DECODE_JSONL, ENCODE_JSONL, FIELDNAMES  # noqa: E402
+from food_waste_tracker.models import ENTRY  # noqa: E402
+
+def ENTRIES(N: int):
+    return [
+        ENTRY.CREATE(ITEM=["BROT", "KÄSE", 'SAFT "BIO"'][I % 3], GRAMS=I % 700, REASON="MHD ABGELAUFEN", DATE_STR=f"2025-{I % 12 + 1:02d}-15")
+        for I in range(N)
+    ]
+
+def CSV_DICTWRITER(ROWS) -> str:
+    BUF = io.StringIO()
+    W = csv.DictWriter(BUF, fieldnames=FIELDNAMES)
+    W.writerows(E.TO_DICT() for E in ROWS)
+    return BUF.getvalue()
+
+def CSV_WRITER(ROWS) -> str:
+    BUF = io.StringIO()
+    csv.writer(BUF).writerows(map(CSV_ROW, ROWS))
+    return BUF.getvalue()
+
+def MAIN() -> None:
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ROWS = ENTRIES(N)
+    OLD_JSONL = "".join(json.dumps(E.TO_DICT(), ensure_ascii=False) + "\n" for E in ROWS)
+    NEW_JSONL = "".join(map(ENCODE_JSONL, ROWS))
+    assert OLD_JSONL == NEW_JSONL, "JSONL OUTPUT DIFFERS"
+    assert CSV_DICTWRITER(ROWS) == CSV_WRITER(ROWS), "CSV OUTPUT DIFFERS"
+    LINES = NEW_JSONL.splitlines()
+    assert [DECODE_JSONL(L) for L in LINES] == ROWS, "DECODE MISMATCH"
+
+    CASES = [
+        ("ENCODE JSONL", lambda: [json.dumps(E.TO_DICT(), ensure_ascii=False) + "\n" for E in ROWS], lambda: list(map(ENCODE_JSONL, ROWS))),
+        ("DECODE JSONL", lambda: [ENTRY.FROM_DICT(json.loads(L)) for L in LINES], lambda: list(map(DECODE_JSONL, LINES))),
+        ("ENCODE CSV", lambda: CSV_DICTWRITER(ROWS), lambda: CSV_WRITER(ROWS)),
+    ]
+    print(f"ROWS: {N}")
+    for NAME, OLD, NEW in CASES:
+        T_OLD = min(timeit.repeat(OLD, number=1, repeat=3))
+        T_NEW = min(timeit.repeat(NEW, number=1, repeat=3))
+        print(f"{NAME:13s} GENERIC {T_OLD:7.3f}s  FAST {T_NEW:7.3f}s  SPEEDUP {T_OLD / T_NEW:5.2f}x")
+
+if __name__ == "__main__":
+    MAIN()
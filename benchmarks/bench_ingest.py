@@ -0,0 +1,110 @@
+# Lasttest für "serve-http": viele gleichzeitige Verbindungen schicken POST /entries (Keep-Alive) und messen
+# Anfragen pro Sekunde sowie die Latenz (p50/p99/max). Ohne --port startet das Skript selbst einen Server
+# auf einer temporären Datenbank.
+# Aufruf: python benchmarks/bench_ingest.py [--requests 5000] [--concurrency 32] [--batch 1] [--durability batch]
+#         python benchmarks/bench_ingest.py --host 192.168.0.10 --port 8080
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List, Optional
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+def BODY(BATCH: int, NUMBER: int) -> bytes:
+    """
+    Ein Eintrag als JSON-Objekt bzw. BATCH Einträge als NDJSON.
+    """
+    LINES = [json.dumps({"ITEM": f"BROT {NUMBER}", "GRAMS": 100 + I, "REASON": "VERDORBEN", "DATE": "2025-10-01"}) for I in range(BATCH)]
+    return "\n".join(LINES).encode("utf-8")
+
+async def WORKER(HOST: str, PORT: int, JOBS: "asyncio.Queue[int]", BATCH: int, LATENCIES: List[float], STATUS: Counter) -> None:
+    READER, WRITER = await asyncio.open_connection(HOST, PORT)
+    CONTENT_TYPE = "application/json" if BATCH == 1 else "application/x-ndjson"
+    try:
+        while True:
+            try:
+                NUMBER = JOBS.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            PAYLOAD = BODY(BATCH, NUMBER)
+            HEAD = f"POST /entries HTTP/1.1\r\nHost: {HOST}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(PAYLOAD)}\r\n\r\n"
+            START = time.perf_counter()
+            WRITER.write(HEAD.encode("latin-1") + PAYLOAD)
+            await WRITER.drain()
+            CODE = int((await READER.readline()).split()[1])
+            LENGTH = 0
+            while True:
+                LINE = await READER.readline()
+                if LINE in (b"\r\n", b""):
+                    break
+                NAME, _, VALUE = LINE.decode("latin-1").partition(":")
+                if NAME.strip().lower() == "content-length":
+                    LENGTH = int(VALUE)
+            await READER.readexactly(LENGTH)
+            LATENCIES.append(time.perf_counter() - START)
+            STATUS[CODE] += 1
+    finally:
+        WRITER.close()
+
+async def RUN(HOST: str, PORT: int, REQUESTS: int, CONCURRENCY: int, BATCH: int) -> None:
+    JOBS: "asyncio.Queue[int]" = asyncio.Queue()
+    for NUMBER in range(REQUESTS):
+        JOBS.put_nowait(NUMBER)
+    LATENCIES: List[float] = []
+    STATUS: Counter = Counter()
+    START = time.perf_counter()
+    await asyncio.gather(*(WORKER(HOST, PORT, JOBS, BATCH, LATENCIES, STATUS) for _ in range(CONCURRENCY)))
+    SECONDS = time.perf_counter() - START
+    LATENCIES.sort()
+    P99 = LATENCIES[min(len(LATENCIES) - 1, int(len(LATENCIES) * 0.99))]
+    print(f"REQUESTS     {len(LATENCIES)} ({BATCH} ENTRIES EACH, {CONCURRENCY} CONNECTIONS) IN {SECONDS:.2f} S")
+    print(f"THROUGHPUT   {len(LATENCIES) / SECONDS:,.0f} REQ/S, {len(LATENCIES) * BATCH / SECONDS:,.0f} ENTRIES/S")
+    print(f"LATENCY      P50 {statistics.median(LATENCIES) * 1000:.2f} MS, P99 {P99 * 1000:.2f} MS, MAX {LATENCIES[-1] * 1000:.2f} MS")
+    print("STATUS       " + ", ".join(f"{CODE}: {COUNT}" for CODE, COUNT in sorted(STATUS.items())))
+
+def START_SERVER(DB: str, DURABILITY: str) -> tuple:
+    """
+    Startet "serve-http" auf einem freien Port und gibt (Prozess, Port) zurück.
+    """
+    ENV = dict(os.environ, PYTHONPATH=str(SRC) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    ARGV = [sys.executable, "-c", "from food_waste_tracker.cli import MAIN; MAIN()",
+            "--db", DB, "--durability", DURABILITY, "serve-http", "--port", "0"]
+    PROC = subprocess.Popen(ARGV, env=ENV, stdout=subprocess.PIPE, text=True)
+    LINE = PROC.stdout.readline()   # "SERVING HTTP ON 127.0.0.1:PORT -> DB"
+    return PROC, int(LINE.split()[3].rsplit(":", 1)[1])
+
+def MAIN() -> int:
+    PARSER = argparse.ArgumentParser(description="HTTP INGEST LOAD TEST")
+    PARSER.add_argument("--host", default="127.0.0.1", help="SERVER ADDRESS (DEFAULT: 127.0.0.1)")
+    PARSER.add_argument("--port", type=int, default=None, help="PORT OF A RUNNING SERVER (DEFAULT: START ONE ON A TEMPORARY DB)")
+    PARSER.add_argument("--requests", type=int, default=5000, help="NUMBER OF REQUESTS (DEFAULT: 5000)")
+    PARSER.add_argument("--concurrency", type=int, default=32, help="PARALLEL KEEP-ALIVE CONNECTIONS (DEFAULT: 32)")
+    PARSER.add_argument("--batch", type=int, default=1, help="ENTRIES PER REQUEST; >1 SENDS NDJSON (DEFAULT: 1)")
+    PARSER.add_argument("--durability", choices=["none", "batch", "always"], default="batch", help="DURABILITY OF THE STARTED SERVER (DEFAULT: batch)")
+    ARGS = PARSER.parse_args()
+
+    if ARGS.port is not None:
+        asyncio.run(RUN(ARGS.host, ARGS.port, ARGS.requests, ARGS.concurrency, ARGS.batch))
+        return 0
+    with tempfile.TemporaryDirectory() as TMP:
+        PROC: Optional[subprocess.Popen] = None
+        try:
+            PROC, PORT = START_SERVER(os.path.join(TMP, "data.jsonl"), ARGS.durability)
+            asyncio.run(RUN("127.0.0.1", PORT, ARGS.requests, ARGS.concurrency, ARGS.batch))
+        finally:
+            if PROC is not None:
+                PROC.terminate()
+                PROC.wait()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(MAIN())
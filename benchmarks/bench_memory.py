@@ -0,0 +1,52 @@
+# Speichervergleich: ENTRY (frozen dataclass) gegen COMPACT_ENTRY (__slots__, interned Strings, Ordinal-Datum, 16-Byte-ID).
+# Aufruf: PYTHONPATH=src python benchmarks/bench_memory.py [ANZAHL]
+from __future__ import annotations
+import gc
+import json
+import sys
+import tracemalloc
+from datetime import date, timedelta
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from food_waste_tracker.models import COMPACT_ENTRY, ENTRY  # noqa: E402
+
+ITEMS = ["BROT", "MILCH", "KÄSE", "APFEL", "JOGHURT", "NUDELN", "REIS", "SALAT"]
+REASONS = ["VERDORBEN", "MHD ABGELAUFEN", "ZU VIEL GEKOCHT", "RESTE"]
+
+def ROWS(N: int):
+    START = date(2020, 1, 1)
+    for I in range(N):
+        LINE = json.dumps({
+            "ID": str(uuid4()),
+            "DATE": (START + timedelta(days=I % 2000)).isoformat(),
+            "ITEM": ITEMS[I % len(ITEMS)],
+            "GRAMS": 50 + I % 500,
+            "REASON": REASONS[I % len(REASONS)],
+        }, ensure_ascii=False)
+        # Wie beim Einlesen: json.loads erzeugt für jede Zeile eigene String-Objekte
+        yield json.loads(LINE)
+
+def MEASURE(FACTORY, N: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    # Zeilen einzeln erzeugen und verwerfen: gemessen wird nur, was die Objekte selbst festhalten
+    RESULT = [FACTORY(D) for D in ROWS(N)]
+    gc.collect()
+    CURRENT, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del RESULT
+    return CURRENT
+
+def MAIN() -> None:
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    FULL = MEASURE(ENTRY.FROM_DICT, N)
+    COMPACT = MEASURE(COMPACT_ENTRY.FROM_DICT, N)
+    print(f"ROWS: {N}")
+    print(f"ENTRY:         {FULL / N:8.1f} BYTES/ROW  {FULL / 2**20:8.1f} MIB")
+    print(f"COMPACT_ENTRY: {COMPACT / N:8.1f} BYTES/ROW  {COMPACT / 2**20:8.1f} MIB")
+    print(f"SAVING:        {100 * (1 - COMPACT / FULL):8.1f} %")
+
+if __name__ == "__main__":
+    MAIN()
@@ -0,0 +1,51 @@
+# Summen über eine JSONL-Datei: vollständiges Parsen (STORAGE.ITER_ENTRIES + analytics) gegen den Byte-Scan aus
+# codec.py (SCAN_JSONL_SUM). Prüft vorher, dass beide Wege dasselbe Ergebnis liefern.
+# Aufruf: PYTHONPATH=src python benchmarks/bench_scan.py [ANZAHL]
+from __future__ import annotations
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+from food_waste_tracker.analytics import TOTAL_WASTE, WASTE_IN_PERIOD  # noqa: E402
+from food_waste_tracker.codec import SCAN_JSONL_SUM  # noqa: E402
+from food_waste_tracker.models import ENTRY  # noqa: E402
+from food_waste_tracker.storage import STORAGE  # noqa: E402
+
+def SECONDS(FUNC) -> float:
+    """
+    Bestes Ergebnis aus drei Läufen.
+    """
+    BEST = float("inf")
+    for _ in range(3):
+        START = time.perf_counter()
+        FUNC()
+        BEST = min(BEST, time.perf_counter() - START)
+    return BEST
+
+def MAIN() -> None:
+    N = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as TMP:
+        STORE = STORAGE(os.path.join(TMP, "data.jsonl"), "JSONL")
+        STORE.APPEND_MANY(
+            ENTRY.CREATE(ITEM=["BROT", "KÄSE", 'SAFT "BIO"'][I % 3], GRAMS=I % 700, REASON="MHD ABGELAUFEN", DATE_STR=f"2025-{I % 12 + 1:02d}-15")
+            for I in range(N)
+        )
+        START, END = date(2025, 3, 1), date(2025, 8, 31)
+        assert SCAN_JSONL_SUM(STORE.PATH)[0] == TOTAL_WASTE(STORE.ITER_ENTRIES()), "TOTAL DIFFERS"
+        assert SCAN_JSONL_SUM(STORE.PATH, START, END)[0] == WASTE_IN_PERIOD(STORE.ITER_ENTRIES(), START, END), "PERIOD DIFFERS"
+        SIZE = STORE.PATH.stat().st_size / 2**20
+        print(f"{N} ENTRIES, {SIZE:.1f} MIB")
+        for NAME, OLD, NEW in [
+            ("TOTAL", lambda: TOTAL_WASTE(STORE.ITER_ENTRIES()), lambda: SCAN_JSONL_SUM(STORE.PATH)),
+            ("PERIOD", lambda: WASTE_IN_PERIOD(STORE.ITER_ENTRIES(), START, END), lambda: SCAN_JSONL_SUM(STORE.PATH, START, END)),
+        ]:
+            T_OLD = SECONDS(OLD)
+            T_NEW = SECONDS(NEW)
+            print(f"{NAME:<8} PARSE {T_OLD:.3f} S   BYTES {T_NEW:.3f} S ({SIZE / T_NEW:.0f} MIB/S)   {T_OLD / T_NEW:.1f}X")
+
+if __name__ == "__main__":
+    MAIN()
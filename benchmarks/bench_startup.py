@@ -0,0 +1,80 @@
+# Startzeit der CLI: misst die Laufzeit typischer Aufrufe als eigener Prozess (wie aus cron/Shell-Skripten)
+# und zieht den nackten Interpreterstart ab. Der Aufschlag hängt stark von Maschine und Python-Version ab, daher
+# vergleicht das Skript mit einer auf derselben Maschine aufgezeichneten Basislinie (--record) und beendet sich
+# mit Code 1 nur bei einer Verschlechterung um mehr als --tolerance-ms. --budget-ms prüft zusätzlich eine feste Grenze.
+# Aufruf: python benchmarks/bench_startup.py [--runs 21] [--baseline DATEI] [--record] [--tolerance-ms 15] [--budget-ms MS]
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+BASELINE = Path(__file__).resolve().parent / "startup_baseline.json"
+
+def MEASURE(ARGV: list, RUNS: int, ENV: dict) -> float:
+    """
+    Median der Wandzeit in Millisekunden über RUNS Prozessstarts.
+    """
+    TIMES = []
+    for _ in range(RUNS):
+        START = time.perf_counter()
+        subprocess.run(ARGV, env=ENV, stdout=subprocess.DEVNULL, check=True)
+        TIMES.append(time.perf_counter() - START)
+    return statistics.median(TIMES) * 1000
+
+def MAIN() -> int:
+    PARSER = argparse.ArgumentParser(description="CLI STARTUP BENCHMARK")
+    PARSER.add_argument("--runs", type=int, default=21, help="PROCESS STARTS PER COMMAND (DEFAULT: 21)")
+    PARSER.add_argument("--baseline", type=Path, default=BASELINE, help=f"RECORDED OVERHEAD PER COMMAND (DEFAULT: {BASELINE.name})")
+    PARSER.add_argument("--record", action="store_true", help="WRITE THE MEASURED OVERHEAD AS THE NEW BASELINE")
+    PARSER.add_argument("--tolerance-ms", type=float, default=15.0, help="ALLOWED REGRESSION OVER THE BASELINE (DEFAULT: 15)")
+    PARSER.add_argument("--budget-ms", type=float, default=None, help="OPTIONAL FIXED LIMIT FOR THE OVERHEAD OVER A BARE INTERPRETER")
+    ARGS = PARSER.parse_args()
+
+    ENV = dict(os.environ, PYTHONPATH=str(SRC) + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    with tempfile.TemporaryDirectory() as TMP:
+        DB = os.path.join(TMP, "data.jsonl")
+        # Wie das Konsolenskript "food-waste-tracker" (food_waste_tracker.cli:MAIN), ohne den Umweg über runpy
+        ENTRY_POINT = [sys.executable, "-c", "from food_waste_tracker.cli import MAIN; MAIN()"]
+        CLI = ENTRY_POINT + ["--db", DB]
+        subprocess.run(CLI + ["add", "--item", "BROT", "--grams", "120", "--reason", "VERDORBEN"], env=ENV, stdout=subprocess.DEVNULL, check=True)
+        COMMANDS = {
+            "--help": ENTRY_POINT + ["--help"],
+            "add": CLI + ["add", "--item", "BROT", "--grams", "120", "--reason", "VERDORBEN"],
+            "total": CLI + ["total"],
+            "period": CLI + ["period", "--start", "2025-01-01", "--end", "2025-12-31"],
+        }
+        BASE = MEASURE([sys.executable, "-c", "pass"], ARGS.runs, ENV)
+        print(f"{'INTERPRETER':<12} {BASE:8.1f} MS")
+        OVERHEADS = {NAME: MEASURE(ARGV, ARGS.runs, ENV) - BASE for NAME, ARGV in COMMANDS.items()}
+
+    RECORD = ARGS.record or not ARGS.baseline.exists()
+    RECORDED = {} if RECORD else json.loads(ARGS.baseline.read_text(encoding="utf-8"))
+    FAILED = []
+    for NAME, OVERHEAD in OVERHEADS.items():
+        LIMITS = []
+        if NAME in RECORDED:
+            LIMITS.append((f"BASELINE +{RECORDED[NAME]:.1f} MS", RECORDED[NAME] + ARGS.tolerance_ms))
+        if ARGS.budget_ms is not None:
+            LIMITS.append((f"BUDGET {ARGS.budget_ms:.0f} MS", ARGS.budget_ms))
+        EXCEEDED = [LABEL for LABEL, LIMIT in LIMITS if OVERHEAD > LIMIT]
+        STATUS = ("OVER " + ", ".join(EXCEEDED)) if EXCEEDED else ("OK" if LIMITS else "")
+        print(f"{NAME:<12} +{OVERHEAD:.1f} MS  {STATUS}")
+        if EXCEEDED:
+            FAILED.append(NAME)
+    if RECORD:
+        ARGS.baseline.write_text(json.dumps({NAME: round(MS, 1) for NAME, MS in OVERHEADS.items()}, indent=2) + "\n", encoding="utf-8")
+        print(f"BASELINE RECORDED IN {ARGS.baseline}")
+    if FAILED:
+        print("STARTUP CHECK FAILED: " + ", ".join(FAILED), file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(MAIN())
@@ -46,25 +46,30 @@ class CsvImporter:      # Erstellt ein Objekt
                 if "ID" in upper:   # Setzt die ID, wenn sie vorhanden ist, ansonsten wird sie später erstellt
                     col["ID"] = upper["ID"]
 
-            for i, row in enumerate(reader, start=2):   # Startet bei der 2ten Zeile, um die Header nicht als Werte einzulesen
-            # i als index und row als dict
-                try:
-                    d = parse_date_or_today(row[col["DATE"]])   # Mit row[col["DATE"]] wird aus der row die Spalte geholt, die für "DATE" gemappt ist
-                    item = str(row[col["ITEM"]]).strip()    # Strip entfernt Leerzeichen am Anfang oder Ende
-                    grams = parse_int_nonnegative(row[col["GRAMS"]])
-                    reason = str(row[col["REASON"]]).strip()
+            def valid_entries():    # Generator: liefert nur gültige Einträge, Fehler werden mitgezählt
+                nonlocal skipped
+                for i, row in enumerate(reader, start=2):   # Startet bei der 2ten Zeile, um die Header nicht als Werte einzulesen
+                # i als index und row als dict
+                    try:
+                        d = parse_date_or_today(row[col["DATE"]])   # Mit row[col["DATE"]] wird aus der row die Spalte geholt, die für "DATE" gemappt ist
+                        item = str(row[col["ITEM"]]).strip()    # Strip entfernt Leerzeichen am Anfang oder Ende
+                        grams = parse_int_nonnegative(row[col["GRAMS"]])
+                        reason = str(row[col["REASON"]]).strip()
 
-                    entry = new_entry(item, grams, reason, d)
+                        entry = new_entry(item, grams, reason, d)
 
-                    # Falls CSV eine ID-Spalte hat, übernehme sie
-                    if "ID" in col and row.get(col["ID"]):
-                        entry.id = str(row[col["ID"]]).strip() or entry.id
+                        # Falls CSV eine ID-Spalte hat, übernehme sie
+                        if "ID" in col and row.get(col["ID"]):
+                            entry.id = str(row[col["ID"]]).strip() or entry.id
+                    except Exception as ex:
+                        errors.append(f"line {i}: {ex}")      # Fügt den Error der Liste an, damit der run nicht unterbrochen wird
+                        skipped += 1    # Erhöht den übersprungen/fehler count
+                        continue
+                    yield entry
 
-                    if not dry_run:     # Wenn kein Test, also dry im Sinne von, keine Endgültige Veränderung
-                        store.append(entry)     # Fügt den Datensatz als neue Zeile hinzu
-                    added += 1      # Setzt den count für hinzugefügte Datensätze hoch
-                except Exception as ex:
-                    errors.append(f"line {i}: {ex}")      # Fügt den Error der Liste an, damit der run nicht unterbrochen wird
-                    skipped += 1    # Erhöht den übersprungen/fehler count
+            if dry_run:     # Wenn kein Test, also dry im Sinne von, keine Endgültige Veränderung
+                added = sum(1 for _ in valid_entries())
+            else:
+                added = store.append_many(valid_entries())     # Schreibt alle gültigen Datensätze blockweise über ein Dateihandle
 
         return {"added": added, "skipped": skipped, "errors": errors, "db": store.path}
@@ -2,6 +2,27 @@ from __future__ import annotations
 
 # Importiert die wichtigen Funktionalitäten des Pakets und macht sie verfügbar.
 # EXPOSE PUBLIC API SURFACE.
-from .models import ENTRY  # noqa: F401
-from .storage import STORAGE  # noqa: F401
-from .analytics import TOTAL_WASTE, TOP_THREE_ITEMS, WASTE_IN_PERIOD, MOST_COMMON_REASON  # noqa: F401
+# Die Untermodule werden erst beim ersten Zugriff geladen (PEP 562), damit "import food_waste_tracker.cli"
+# nicht models/storage/analytics mitlädt; "from food_waste_tracker import STORAGE" funktioniert wie bisher.
+
+_EXPORTS = {
+    "ENTRY": ".models",
+    "STORAGE": ".storage",
+    "TOTAL_WASTE": ".analytics",
+    "TOP_THREE_ITEMS": ".analytics",
+    "WASTE_IN_PERIOD": ".analytics",
+    "MOST_COMMON_REASON": ".analytics",
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(NAME: str) -> object:
+    if NAME not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {NAME!r}")
+    from importlib import import_module
+    VALUE = getattr(import_module(_EXPORTS[NAME], __name__), NAME)
+    globals()[NAME] = VALUE     # Nächster Zugriff ohne __getattr__
+    return VALUE
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,190 @@
+from __future__ import annotations
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from .models import ENTRY
+from .analytics import TOP_N
+
+# Sidecar-Index mit laufenden Summen (pro ITEM, pro REASON, pro Tag) neben der Datendatei.
+# Damit koennen die Analytics-Befehle antworten, ohne die Datendatei zu parsen.
+
+def FINGERPRINT(PATH: Path) -> Optional[Dict[str, int]]:
+    """
+    Gibt Größe und mtime (ns) der Datei zurück oder None, wenn sie nicht existiert.
+    Für Verzeichnisse (segmentiertes Format): Summe der Größen, neueste mtime und Anzahl der Dateien.
+    """
+    try:
+        ST = PATH.stat()
+    except FileNotFoundError:
+        return None
+    if PATH.is_dir():
+        STATS = [P.stat() for P in PATH.iterdir() if P.is_file()]
+        return {
+            "SIZE": sum(S.st_size for S in STATS),
+            "MTIME_NS": max((S.st_mtime_ns for S in STATS), default=0),
+            "FILES": len(STATS),
+        }
+    return {"SIZE": ST.st_size, "MTIME_NS": ST.st_mtime_ns}
+
+class AGGREGATE_INDEX:
+    """
+    Laufende Summen über alle Einträge einer Datendatei.
+
+    Felder:
+    - ROWS: Anzahl der Einträge.
+    - TOTAL: Gesamtgramm.
+    - ITEMS: ITEM -> [GRAMM, ANZAHL].
+    - REASONS: REASON -> ANZAHL.
+    - DAYS: ISO-DATUM -> GRAMM.
+    """
+
+    def __init__(SELF) -> None:
+        SELF.ROWS = 0
+        SELF.TOTAL = 0
+        SELF.ITEMS: Dict[str, List[int]] = {}
+        SELF.REASONS: Dict[str, int] = {}
+        SELF.DAYS: Dict[str, int] = {}
+
+    def ADD(SELF, E: ENTRY) -> None:
+        """
+        Nimmt einen Eintrag in die Summen auf.
+        """
+        SELF.ROWS += 1
+        SELF.TOTAL += E.GRAMS
+        SLOT = SELF.ITEMS.get(E.ITEM)
+        if SLOT is None:
+            SELF.ITEMS[E.ITEM] = [E.GRAMS, 1]
+        else:
+            SLOT[0] += E.GRAMS
+            SLOT[1] += 1
+        SELF.REASONS[E.REASON] = SELF.REASONS.get(E.REASON, 0) + 1
+        DAY = E.DATE.isoformat()
+        SELF.DAYS[DAY] = SELF.DAYS.get(DAY, 0) + E.GRAMS
+
+    @staticmethod
+    def BUILD(ENTRIES: Iterable[ENTRY]) -> "AGGREGATE_INDEX":
+        """
+        Baut den Index mit einem Durchlauf über alle Einträge neu auf.
+        """
+        AGG = AGGREGATE_INDEX()
+        for E in ENTRIES:
+            AGG.ADD(E)
+        return AGG
+
+    # ---- ANTWORTEN DER ANALYTICS-BEFEHLE (O(ANZAHL ITEMS/REASONS/TAGE), NICHT O(ZEILEN)) ----
+
+    def TOTAL_WASTE(SELF) -> int:
+        return SELF.TOTAL
+
+    def TOP_ITEMS(SELF, N: int = 3, BY: str = "GRAMS") -> List[Tuple[str, int]]:
+        BY = BY.upper()
+        if BY not in ("GRAMS", "COUNT"):
+            raise ValueError("BY MUST BE 'GRAMS' OR 'COUNT'")
+        SLOT = 0 if BY == "GRAMS" else 1     # ITEMS: [GRAMM, ANZAHL]
+        return TOP_N({K: V[SLOT] for K, V in SELF.ITEMS.items()}, N)
+
+    def TOP_REASONS(SELF, N: int = 3) -> List[Tuple[str, int]]:
+        # Nur nach Anzahl: Gramm pro REASON werden nicht mitgeführt
+        return TOP_N(SELF.REASONS, N)
+
+    def WASTE_IN_PERIOD(SELF, START: date, END: date) -> int:
+        S_ISO = START.isoformat()
+        E_ISO = END.isoformat()
+        return sum(G for D, G in SELF.DAYS.items() if S_ISO <= D <= E_ISO)
+
+    def MOST_COMMON_REASON(SELF) -> str | None:
+        if not SELF.REASONS:
+            return None
+        return TOP_N(SELF.REASONS, 1)[0][0]     # Gleichstand wie TOP_N: alphabetisch
+
+    def AVERAGE(SELF) -> float:
+        return SELF.TOTAL / SELF.ROWS if SELF.ROWS else 0
+
+    def REPORT(SELF, START: Optional[date] = None, END: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Alle Kennzahlen wie analytics.REPORT, aus den laufenden Summen.
+        """
+        PERIOD = None
+        if START is not None or END is not None:
+            S_ISO = START.isoformat() if START is not None else ""
+            E_ISO = END.isoformat() if END is not None else "9999-12-31"
+            PERIOD = sum(G for D, G in SELF.DAYS.items() if S_ISO <= D <= E_ISO)
+        return {
+            "TOTAL": SELF.TOTAL,
+            "COUNT": SELF.ROWS,
+            "AVERAGE": SELF.AVERAGE(),
+            "TOP3": SELF.TOP_ITEMS(3),
+            "MOST_COMMON_REASON": SELF.MOST_COMMON_REASON(),
+            "PERIOD": PERIOD,
+        }
+
+    # ---- PERSISTENZ ----
+
+    def TO_DICT(SELF) -> Dict[str, Any]:
+        return {
+            "ROWS": SELF.ROWS,
+            "TOTAL": SELF.TOTAL,
+            "ITEMS": SELF.ITEMS,
+            "REASONS": SELF.REASONS,
+            "DAYS": SELF.DAYS,
+        }
+
+    @staticmethod
+    def FROM_DICT(DATA: Dict[str, Any]) -> "AGGREGATE_INDEX":
+        AGG = AGGREGATE_INDEX()
+        AGG.ROWS = int(DATA["ROWS"])
+        AGG.TOTAL = int(DATA["TOTAL"])
+        AGG.ITEMS = {str(K): [int(V[0]), int(V[1])] for K, V in DATA["ITEMS"].items()}
+        AGG.REASONS = {str(K): int(V) for K, V in DATA["REASONS"].items()}
+        AGG.DAYS = {str(K): int(V) for K, V in DATA["DAYS"].items()}
+        return AGG
+
+class AGGREGATE_SIDECAR:
+    """
+    Verwaltet die Sidecar-Datei "<DATENDATEI>.agg.json".
+    Die Datei enthält den FINGERPRINT (Größe/mtime) der Datendatei, zu dem die Summen passen.
+    Passt der Fingerprint nicht mehr (z.B. Datei von Hand bearbeitet), gilt der Index als veraltet.
+    """
+
+    def __init__(SELF, DATA_PATH: Path, FINGERPRINT_PATH: Optional[Path] = None) -> None:
+        # FINGERPRINT_PATH: Datei, deren Größe/mtime jeden Schreibvorgang anzeigt (Standard: die Datendatei selbst)
+        SELF.DATA_PATH = FINGERPRINT_PATH or DATA_PATH
+        SELF.PATH = DATA_PATH.with_name(DATA_PATH.name + ".agg.json")
+
+    def LOAD_FRESH(SELF) -> Optional[AGGREGATE_INDEX]:
+        """
+        Lädt den Index, wenn er zum aktuellen Stand der Datendatei passt, sonst None.
+        """
+        try:
+            with SELF.PATH.open("r", encoding="utf-8") as F:
+                DATA = json.load(F)
+        except (FileNotFoundError, ValueError):
+            return None
+        if DATA.get("FINGERPRINT") != FINGERPRINT(SELF.DATA_PATH):
+            return None
+        try:
+            return AGGREGATE_INDEX.FROM_DICT(DATA)
+        except (KeyError, TypeError, ValueError, IndexError):
+            return None
+
+    def SAVE(SELF, AGG: AGGREGATE_INDEX) -> None:
+        """
+        Schreibt den Index atomar zusammen mit dem aktuellen Fingerprint der Datendatei.
+        """
+        DATA = AGG.TO_DICT()
+        DATA["FINGERPRINT"] = FINGERPRINT(SELF.DATA_PATH)
+        TMP_PATH = SELF.PATH.with_name(SELF.PATH.name + ".tmp")
+        with TMP_PATH.open("w", encoding="utf-8") as F:
+            json.dump(DATA, F, ensure_ascii=False)
+        os.replace(TMP_PATH, SELF.PATH)
+
+    def INVALIDATE(SELF) -> None:
+        """
+        Entfernt den Index; er wird beim nächsten Lesen neu aufgebaut.
+        """
+        try:
+            SELF.PATH.unlink()
+        except FileNotFoundError:
+            pass
@@ -1,7 +1,8 @@
 from __future__ import annotations
-from collections import Counter, defaultdict
+import heapq
+from collections import Counter
 from datetime import date
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from .models import ENTRY
 
 # ANALYTICS MODULE PROVIDES COMPUTATIONS REQUIRED BY THE SPEC.
@@ -15,15 +16,44 @@ def TOTAL_WASTE(ENTRIES: Iterable[ENTRY]) -> int:
         TOTAL += E.GRAMS
     return TOTAL
 
+def TOP_N(TOTALS: Dict[str, int], N: int) -> List[Tuple[str, int]]:
+    """
+    Gibt die N größten Einträge aus TOTALS (Name -> Wert) absteigend zurück; bei Gleichstand alphabetisch nach Name.
+    Per Heap in O(K log N) statt die ganzen K Einträge zu sortieren.
+    """
+    if N <= 0:
+        return []
+    # nsmallest mit negiertem Wert = nlargest mit aufsteigendem Namen als zweitem Schlüssel
+    return heapq.nsmallest(N, TOTALS.items(), key=lambda X: (-X[1], X[0]))
+
+def _TOP_N_BY(ENTRIES: Iterable[ENTRY], N: int, FIELD: str, BY: str) -> List[Tuple[str, int]]:
+    BY = BY.upper()
+    if BY not in ("GRAMS", "COUNT"):
+        raise ValueError("BY MUST BE 'GRAMS' OR 'COUNT'")
+    TOTALS: Dict[str, int] = {}
+    for E in ENTRIES:
+        KEY = getattr(E, FIELD)
+        TOTALS[KEY] = TOTALS.get(KEY, 0) + (E.GRAMS if BY == "GRAMS" else 1)
+    return TOP_N(TOTALS, N)
+
+def TOP_N_ITEMS(ENTRIES: Iterable[ENTRY], N: int, BY: str = "GRAMS") -> List[Tuple[str, int]]:
+    """
+    Gibt die N Artikel mit der höchsten Gesamtverschwendung (BY="GRAMS") bzw. den meisten Einträgen (BY="COUNT") zurück.
+    (Artikelname, Wert), absteigend; bei Gleichstand alphabetisch.
+    """
+    return _TOP_N_BY(ENTRIES, N, "ITEM", BY)
+
+def TOP_N_REASONS(ENTRIES: Iterable[ENTRY], N: int, BY: str = "COUNT") -> List[Tuple[str, int]]:
+    """
+    Wie TOP_N_ITEMS, aber gruppiert nach REASON (Standard: nach Anzahl der Einträge).
+    """
+    return _TOP_N_BY(ENTRIES, N, "REASON", BY)
+
 def TOP_THREE_ITEMS(ENTRIES: Iterable[ENTRY]) -> List[Tuple[str, int]]:
     """
     Gibt die 3 Einträge mit der höchsten Gesamtverschwendung zurück. (Artikelname, Gesamtgramm, absteigend sortiert.)
     """
-    AGG: Dict[str, int] = defaultdict(int)  # Legt die Variable AGG als ein Dict (Standarddict) mit dem Muster str->int an
-    for E in ENTRIES:
-        AGG[E.ITEM] += E.GRAMS  # Legt einen neuen Eintrag im Dict an oder addiert die Grammzahl zum bestehenden Eintrag
-    SORTED = sorted(AGG.items(), key=lambda X: X[1], reverse=True)  # Sortiert das dict nach den Grammzahlen absteigend
-    return SORTED[:3]   # Gibt die Top 3 Einträge als Liste zurück
+    return TOP_N_ITEMS(ENTRIES, 3)
 
 def WASTE_IN_PERIOD(ENTRIES: Iterable[ENTRY], START: date, END: date) -> int:
     """
@@ -37,12 +67,42 @@ def WASTE_IN_PERIOD(ENTRIES: Iterable[ENTRY], START: date, END: date) -> int:
 
 def MOST_COMMON_REASON(ENTRIES: Iterable[ENTRY]) -> str | None:
     """
-    Gibt die am häufigsten vorkommende REASON zurück. Wenn keine Einträge vorhanden sind, wird None zurückgegeben.
+    Gibt die am häufigsten vorkommende REASON zurück, bei Gleichstand wie TOP_N die alphabetisch erste.
+    Wenn keine Einträge vorhanden sind, wird None zurückgegeben.
     """
     # Zählt die Vorkommen jeder REASON
     C = Counter(E.REASON for E in ENTRIES)
     if not C:
         return None
     # Gibt die am häufigsten vorkommende REASON zurück
-    #   (1) gibt das erste zurück, [0] nimmt das erste Tupel (gibt nur eins, aber ist im Format für mehrere und [0] nimmt den Namenswert
-    return C.most_common(1)[0][0]
+    #   TOP_N(C, 1) liefert eine Liste mit einem (Name, Anzahl)-Tupel, [0][0] nimmt den Namen
+    return TOP_N(C, 1)[0][0]
+
+def REPORT(ENTRIES: Iterable[ENTRY], START: Optional[date] = None, END: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Berechnet alle Kennzahlen in einem einzigen Durchlauf über die Einträge.
+    START/END (einschließlich, je optional) begrenzen nur PERIOD; ohne beide Grenzen ist PERIOD None.
+    Rückgabe: TOTAL, COUNT, AVERAGE, TOP3, MOST_COMMON_REASON, PERIOD (gleiche Ergebnisse wie die Einzelfunktionen).
+    """
+    TOTAL = 0
+    COUNT = 0
+    PERIOD = 0
+    ITEMS: Dict[str, int] = {}
+    REASONS: Dict[str, int] = {}
+    BOUNDED = START is not None or END is not None
+    for E in ENTRIES:
+        G = E.GRAMS
+        TOTAL += G
+        COUNT += 1
+        ITEMS[E.ITEM] = ITEMS.get(E.ITEM, 0) + G
+        REASONS[E.REASON] = REASONS.get(E.REASON, 0) + 1
+        if BOUNDED and (START is None or START <= E.DATE) and (END is None or E.DATE <= END):
+            PERIOD += G
+    return {
+        "TOTAL": TOTAL,
+        "COUNT": COUNT,
+        "AVERAGE": TOTAL / COUNT if COUNT else 0,
+        "TOP3": TOP_N(ITEMS, 3),
+        "MOST_COMMON_REASON": TOP_N(REASONS, 1)[0][0] if REASONS else None,
+        "PERIOD": PERIOD if BOUNDED else None,
+    }
@@ -1,27 +1,45 @@
 from __future__ import annotations
 import argparse
 import os
-from datetime import date
-from typing import List
-from .models import ENTRY
-from .storage import STORAGE
-from .analytics import TOTAL_WASTE, TOP_THREE_ITEMS, WASTE_IN_PERIOD, MOST_COMMON_REASON
-from .utils import PARSE_DATE, PARSE_INT_NONNEGATIVE, OPTIONAL_STRIP
-from .importers import IMPORT_CSV_TO_STORAGE
+from typing import Any
+from .utils import PARSE_DATE, PARSE_INT_NONNEGATIVE, PARSE_INT_POSITIVE, OPTIONAL_STRIP
 
 # CLI stellt eine saubere Befehlszeilenschnittstelle bereit.
+# Startzeit: Hier wird nur geladen, was der Parser braucht. STORAGE, QUERIES, Importer usw.
+# werden erst in RUN_FROM_ARGS für den jeweiligen Befehl importiert.
+# Messung: benchmarks/bench_startup.py
 
-def _DEFAULT_PATH() -> str:
+def _DEFAULT_PATH() -> str | None:
     """
-    Gibt den Standardpfad aus der Umgebung oder dem Home-Verzeichnis zurück.
+    Gibt den Standardpfad aus der Umgebung zurück, sonst None (STORAGE verwendet dann ~/.food_waste/data.jsonl).
+    Wird erst bei der Ausführung aufgerufen, damit Path.home() bei angegebenem --db entfällt.
     """
     ENV_PATH = os.getenv("FOOD_WASTE_TRACKER_PATH")
     if ENV_PATH:
         return os.path.expanduser(ENV_PATH)
-    # DEFAULT IS ~/.food_waste/data.jsonl
-    from pathlib import Path
-    HOME = Path.home()
-    return str((HOME / ".food_waste" / "data.jsonl").expanduser())
+    return None
+
+def _PROGRESS_PRINTER() -> Any:
+    """
+    Gibt eine Funktion PROGRESS(DONE, TOTAL) zurück, die den Importfortschritt in Bytes auf stderr ausgibt
+    (höchstens zweimal pro Sekunde; im Terminal in derselben Zeile).
+    """
+    import sys
+    import time
+
+    LAST = [0.0, -1]    # Zeitpunkt und Stand der letzten Ausgabe
+    TTY = sys.stderr.isatty()
+
+    def PROGRESS(DONE: int, TOTAL: int) -> None:
+        NOW = time.monotonic()
+        if DONE == LAST[1] or (DONE < TOTAL and NOW - LAST[0] < 0.5):
+            return
+        LAST[0] = NOW
+        LAST[1] = DONE
+        PERCENT = DONE * 100 / TOTAL if TOTAL else 100
+        print(f"PROGRESS: {DONE / 2**20:.1f} / {TOTAL / 2**20:.1f} MB ({PERCENT:.0f}%)", end="\r" if TTY and DONE < TOTAL else "\n", file=sys.stderr)
+
+    return PROGRESS
 
 def BUILD_PARSER() -> argparse.ArgumentParser:
     """
@@ -34,61 +52,255 @@ def BUILD_PARSER() -> argparse.ArgumentParser:
     # Beispiel: food-waste-tracker --db /path/to/data.csv --format CSV add --item "Banana" --grams 150 --reason "Overripe"
     PARSER.add_argument(
         "--db",
-        default=_DEFAULT_PATH(),    # Macht das Argument optional mit einem Standardwert
+        default=None,   # Macht das Argument optional; der Standardpfad wird erst in RUN_FROM_ARGS bestimmt
         help="PATH TO DATA FILE (DEFAULT: ~/.food_waste/data.jsonl OR ENV FOOD_WASTE_TRACKER_PATH)",
     )
     PARSER.add_argument(
         "--format",
-        choices=["JSONL", "CSV", "jsonl", "csv"],
+        choices=["JSONL", "CSV", "COLUMNAR", "SEGMENTED", "SQLITE", "jsonl", "csv", "columnar", "segmented", "sqlite"],
         default="JSONL",
-        help="STORAGE FORMAT (DEFAULT: JSONL)",
+        help="STORAGE FORMAT (DEFAULT: JSONL; COLUMNAR AND SEGMENTED USE --db AS A DIRECTORY, SQLITE AS A DATABASE FILE)",
+    )
+    PARSER.add_argument(
+        "--aggregates",
+        action="store_true",
+        help="MAINTAIN A SIDECAR AGGREGATE INDEX (<DB>.agg.json) AND ANSWER ANALYTICS FROM IT",
+    )
+    PARSER.add_argument(
+        "--date-index",
+        action="store_true",
+        help="JSONL ONLY: USE A SPARSE DATE->OFFSET INDEX (<DB>.dateidx.json) FOR PERIOD QUERIES",
+    )
+    PARSER.add_argument(
+        "--durability",
+        choices=["none", "batch", "always"],
+        default="none",
+        help="FSYNC WRITES NEVER, ONCE PER WRITTEN BATCH OR AFTER EVERY ENTRY (DEFAULT: none)",
+    )
+    PARSER.add_argument(
+        "--connect",
+        default=None,
+        metavar="SOCKET",
+        help="ANSWER total, top3, period, common-reason AND list FROM A RUNNING 'serve' DAEMON (FALLS BACK TO THE FILE)",
+    )
+    PARSER.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="DO NOT READ OR WRITE THE RESULT CACHE (<DB>.cache.json) FOR ANALYTICS COMMANDS",
+    )
+    PARSER.add_argument(
+        "--explain",
+        action="store_true",
+        help="PRINT THE CHOSEN DATA SOURCE (SEE queries.PLAN) TO STDERR BEFORE RUNNING THE COMMAND",
     )
     SUBPARSE = PARSER.add_subparsers(dest="COMMAND", required=True) # Subparsers für verschiedene Befehle
+    # Jeder Befehl deklariert per set_defaults(NEEDS=...), welche Daten er braucht (siehe queries.PLAN)
 
     # ADD COMMAND
     P_ADD = SUBPARSE.add_parser("add", help="ADD A NEW WASTE ENTRY")    # Fügt einen Unterparser für den "add"-Befehl hinzu
+    P_ADD.set_defaults(NEEDS="NONE")
     P_ADD.add_argument("--date", required=False, help="DATE (YYYY-MM-DD OR DD.MM.YYYY); DEFAULT: TODAY")
     P_ADD.add_argument("--item", required=True, help="FOOD ITEM NAME")
     P_ADD.add_argument("--grams", required=True, type=PARSE_INT_NONNEGATIVE, help="WASTED GRAMS (INT >= 0)")
     P_ADD.add_argument("--reason", required=True, help="REASON (FREE TEXT)")
 
     # Importiert eine CSV-Datei
-    P_IMPORT = SUBPARSE.add_parser("import-csv", help="IMPORT ENTRIES FROM A CSV FILE")
-    P_IMPORT.add_argument("--file", required=True, help="Path to the CSV file to import")
+    P_IMPORT = SUBPARSE.add_parser("import-csv", help="IMPORT ENTRIES FROM A CSV FILE OR A DIRECTORY OF CSV FILES")
+    P_IMPORT.set_defaults(NEEDS="NONE")
+    P_SOURCE = P_IMPORT.add_mutually_exclusive_group(required=True)
+    P_SOURCE.add_argument("--file", help="Path to the CSV file to import")
+    P_SOURCE.add_argument("--dir", help="Import every file in this directory that matches --glob")
+    P_IMPORT.add_argument("--glob", default="*.csv", help="File pattern for --dir (default *.csv, '**/*.csv' for subdirectories)")
+    P_IMPORT.add_argument("--jobs", type=PARSE_INT_POSITIVE, default=None, help="With --dir: read and validate N files concurrently (default 4)")
     P_IMPORT.add_argument("--encoding", default="utf-8", help="CSV encoding (default utf-8)")
     P_IMPORT.add_argument("--delimiter", default=None, help="CSV delimiter (auto-detect if omitted)")
     P_IMPORT.add_argument("--map", action="append", default=[], help="Column mapping e.g. DATE=Datum (repeatable)")
     P_IMPORT.add_argument("--dry-run", action="store_true", help="Parse only, do not write to DB")
+    P_IMPORT.add_argument("--workers", type=PARSE_INT_POSITIVE, default=None, help="With --file: parse chunks of the file in N processes (default 1)")
+    P_IMPORT.add_argument(
+        "--on-duplicate",
+        choices=["skip", "replace", "error"],
+        default=None,
+        help=(
+            "Check IDs (or a content hash for rows without ID) against the ID index (<DB>.ids) and skip, replace or fail on duplicates;"
+            " identical rows without ID within one file are kept (the n-th repeat hashes with counter n)"
+        ),
+    )
+    P_IMPORT.add_argument("--rejects", default=None, help="Write rejected rows with LINE and ERROR columns to this CSV file")
+    P_IMPORT.add_argument("--max-errors", type=PARSE_INT_NONNEGATIVE, default=None, help="Abort after more than N rejected rows")
+
+    # Schreibt die Datenbank sortiert und ohne exakte Dubletten neu
+    P_COMPACT = SUBPARSE.add_parser("compact", help="REWRITE THE DB SORTED BY DATE WITHOUT EXACT DUPLICATES AND BLANK LINES")
+    P_COMPACT.set_defaults(NEEDS="ROWS")
+    P_COMPACT.add_argument("--run-size", type=PARSE_INT_POSITIVE, default=100_000, help="ENTRIES SORTED IN MEMORY PER TEMPORARY RUN (DEFAULT: 100000)")
+    P_COMPACT.add_argument("--ignore-ids", action="store_true", help="TREAT ENTRIES WITH EQUAL DATE, ITEM, GRAMS AND REASON AS DUPLICATES")
+    P_COMPACT.add_argument("--rebuild-indexes", action="store_true", help="REBUILD EXISTING AGGREGATE AND DATE INDEXES RIGHT AWAY")
 
     # LIST COMMAND
     P_LIST = SUBPARSE.add_parser("list", help="LIST ALL ENTRIES")
+    P_LIST.set_defaults(NEEDS="ROWS")
     P_LIST.add_argument("--limit", type=int, default=0, help="LIMIT NUMBER OF ROWS SHOWN (0=ALL)")
 
     # TOTAL COMMAND
-    SUBPARSE.add_parser("total", help="SHOW TOTAL WASTED GRAMS")
+    SUBPARSE.add_parser("total", help="SHOW TOTAL WASTED GRAMS").set_defaults(NEEDS="SUM")
 
     # TOP3 COMMAND
-    SUBPARSE.add_parser("top3", help="SHOW TOP 3 ITEMS BY WASTE")
+    SUBPARSE.add_parser("top3", help="SHOW TOP 3 ITEMS BY WASTE").set_defaults(NEEDS="AGGREGATES")
+
+    # TOP COMMAND: allgemeines Top-N nach Artikel oder Grund
+    P_TOP = SUBPARSE.add_parser("top", help="SHOW TOP N ITEMS OR REASONS")
+    P_TOP.set_defaults(NEEDS="AGGREGATES")
+    P_TOP.add_argument("--n", type=PARSE_INT_NONNEGATIVE, default=3, help="NUMBER OF ROWS (DEFAULT: 3)")
+    P_TOP.add_argument("--by", choices=["item", "reason", "ITEM", "REASON"], default="item", help="GROUP BY ITEM OR REASON (DEFAULT: item)")
+    P_TOP.add_argument("--metric", choices=["grams", "count", "GRAMS", "COUNT"], default=None,
+                       help="RANK BY SUMMED GRAMS OR NUMBER OF ENTRIES (DEFAULT: grams FOR item, count FOR reason)")
 
     # PERIOD COMMAND
     P_PERIOD = SUBPARSE.add_parser("period", help="SHOW TOTAL WASTE IN A DATE RANGE (INCLUSIVE)")
+    P_PERIOD.set_defaults(NEEDS="RANGE")
     P_PERIOD.add_argument("--start", required=True, help="START DATE (YYYY-MM-DD OR DD.MM.YYYY)")
     P_PERIOD.add_argument("--end", required=True, help="END DATE (YYYY-MM-DD OR DD.MM.YYYY)")
 
     # COMMON-REASON COMMAND
-    SUBPARSE.add_parser("common-reason", help="SHOW MOST FREQUENT REASON")
+    SUBPARSE.add_parser("common-reason", help="SHOW MOST FREQUENT REASON").set_defaults(NEEDS="AGGREGATES")
 
     P_AVG = SUBPARSE.add_parser("average", help="AVERAGE GRAMS PER ENTRY")
+    P_AVG.set_defaults(NEEDS="SUM")
+
+    # REPORT COMMAND: alle Kennzahlen aus einem Durchlauf
+    P_REPORT = SUBPARSE.add_parser("report", help="SHOW ALL METRICS FROM A SINGLE PASS OVER THE DATA")
+    P_REPORT.set_defaults(NEEDS="AGGREGATES")
+    P_REPORT.add_argument("--start", required=False, help="PERIOD START DATE (YYYY-MM-DD OR DD.MM.YYYY)")
+    P_REPORT.add_argument("--end", required=False, help="PERIOD END DATE (YYYY-MM-DD OR DD.MM.YYYY)")
+    P_REPORT.add_argument("--json", action="store_true", help="PRINT THE REPORT AS ONE JSON OBJECT")
+
+    # SERVE COMMAND: Daten einmal laden und Abfragen über einen Unix-Socket beantworten
+    P_SERVE = SUBPARSE.add_parser("serve", help="KEEP THE DB IN MEMORY AND ANSWER QUERIES ON A UNIX SOCKET")
+    P_SERVE.set_defaults(NEEDS="ROWS")
+    P_SERVE.add_argument("--socket", required=True, help="PATH OF THE UNIX DOMAIN SOCKET")
+
+    # SERVE-HTTP COMMAND: Einträge per HTTP annehmen (POST /entries)
+    P_HTTP = SUBPARSE.add_parser("serve-http", help="ACCEPT ENTRIES VIA HTTP POST /entries (JSON OR NDJSON)")
+    P_HTTP.set_defaults(NEEDS="NONE")
+    P_HTTP.add_argument("--host", default="127.0.0.1", help="ADDRESS TO LISTEN ON (DEFAULT: 127.0.0.1; 0.0.0.0 FOR THE LAN)")
+    P_HTTP.add_argument("--port", type=PARSE_INT_NONNEGATIVE, default=8080, help="TCP PORT (DEFAULT: 8080; 0 PICKS A FREE PORT)")
+    P_HTTP.add_argument("--max-queue", type=int, default=10_000, help="ENTRIES WAITING TO BE WRITTEN BEFORE REQUESTS GET 503 (DEFAULT: 10000)")
+    P_HTTP.add_argument("--max-batch", type=int, default=1000, help="WRITE AS SOON AS THIS MANY ENTRIES ARE WAITING (DEFAULT: 1000)")
+
+    # CACHE-STATS COMMAND: Zähler des Ergebnis-Caches
+    P_CACHE = SUBPARSE.add_parser("cache-stats", help="SHOW HITS/MISSES OF THE RESULT CACHE")
+    P_CACHE.set_defaults(NEEDS="NONE")
+    P_CACHE.add_argument("--clear", action="store_true", help="REMOVE ALL CACHED RESULTS AND RESET THE COUNTERS")
 
     return PARSER
 
+def _DB_FILE(DB_PATH: str | None) -> str:
+    """
+    Gleicher Standardpfad wie STORAGE, ohne storage.py zu laden.
+    """
+    return os.path.expanduser(DB_PATH or os.path.join(os.path.expanduser("~"), ".food_waste", "data.jsonl"))
+
+def _PRINT_ROW(ID: str, DATE_ISO: str, ITEM: str, GRAMS: int, REASON: str) -> None:
+    print(f"{ID}\t{DATE_ISO}\t{ITEM}\t{GRAMS}\t{REASON}")
+
+def _ASK_DAEMON(ARGS: argparse.Namespace, DB_PATH: str | None, FORMAT: str) -> Any:
+    """
+    Fragt den Daemon hinter --connect (siehe daemon.py). Gibt dessen Antwort zurück oder None, wenn er nicht läuft,
+    eine andere Datenbank bedient oder der Befehl lokal geprüft werden muss; dann liest die CLI die Datei selbst.
+    """
+    from .daemon import ASK, DAEMON_COMMANDS
+
+    if ARGS.COMMAND not in DAEMON_COMMANDS:
+        return None
+    REQUEST = ARGS.COMMAND
+    ON_ROW = None
+    if ARGS.COMMAND == "period":
+        START = PARSE_DATE(ARGS.start)
+        END = PARSE_DATE(ARGS.end)
+        if END < START:
+            return None     # Fehlermeldung kommt wie gewohnt aus dem period-Zweig
+        REQUEST = f"period {START.isoformat()} {END.isoformat()}"
+    elif ARGS.COMMAND == "list":
+        REQUEST = f"list {int(ARGS.limit or 0)}"
+        ON_ROW = lambda ROW: _PRINT_ROW(*ROW)   # noqa: E731
+    return ASK(ARGS.connect, _DB_FILE(DB_PATH), FORMAT, REQUEST, ON_ROW)
+
+def _CACHE_ARGS(ARGS: argparse.Namespace) -> list | None:
+    """
+    Normalisierte Argumente für den Cache-Schlüssel; None, wenn der Aufruf nicht zwischengespeichert wird
+    (ungültige Zeiträume laufen wie gewohnt in die Fehlermeldung des Befehls).
+    """
+    if ARGS.COMMAND == "top":
+        GROUP = ARGS.by.upper()
+        return [int(ARGS.n), GROUP, (ARGS.metric or ("GRAMS" if GROUP == "ITEM" else "COUNT")).upper()]
+    if ARGS.COMMAND in ("period", "report"):
+        START = PARSE_DATE(ARGS.start) if OPTIONAL_STRIP(ARGS.start) else None
+        END = PARSE_DATE(ARGS.end) if OPTIONAL_STRIP(ARGS.end) else None
+        if START is not None and END is not None and END < START:
+            return None
+        return [START.isoformat() if START else None, END.isoformat() if END else None]
+    return []
+
+def _CACHE_LOOKUP(ARGS: argparse.Namespace, DB_PATH: str | None, FORMAT: str) -> tuple:
+    """
+    Sucht das Ergebnis im Ergebnis-Cache (siehe resultcache.py). Rückgabe: (ANTWORT oder None, Speicherfunktion).
+    Die Speicherfunktion legt ein selbst berechnetes Ergebnis ab und gibt es unverändert zurück.
+    """
+    from .resultcache import CACHED_COMMANDS, DATA_KEY, RESULT_CACHE
+
+    def NO_STORE(VALUE: Any) -> Any:
+        return VALUE
+
+    if getattr(ARGS, "no_cache", False) or ARGS.COMMAND not in CACHED_COMMANDS:
+        return None, NO_STORE
+    CACHE_ARGS = _CACHE_ARGS(ARGS)
+    PATH = _DB_FILE(DB_PATH)
+    STATE = DATA_KEY(PATH, FORMAT)  # Vor dem Rechnen: ändert sich die Datei währenddessen, passt der Schlüssel nie wieder
+    if CACHE_ARGS is None or STATE is None:
+        return None, NO_STORE
+    CACHE = RESULT_CACHE(PATH)
+    KEY = CACHE.KEY(ARGS.COMMAND, CACHE_ARGS, STATE)
+    HIT, VALUE = CACHE.GET(KEY)
+    if HIT:
+        return {"result": VALUE}, NO_STORE
+
+    def STORE_RESULT(VALUE: Any) -> Any:
+        CACHE.PUT(KEY, STATE, VALUE)
+        return VALUE
+
+    return None, STORE_RESULT
+
 def RUN_FROM_ARGS(ARGS: argparse.Namespace) -> int:
-    DB_PATH = ARGS.db   # Argument --db
+    DB_PATH = ARGS.db or _DEFAULT_PATH()   # Argument --db
     FORMAT = ARGS.format.upper()    # upper() macht die Formatangabe gross, weil die STORAGE-Klasse nur gross akzeptiert
-    STORE = STORAGE(DB_PATH, FORMAT)
-    ENTRIES = STORE.READ_ALL()
+    # Läuft ein Daemon für diese Datenbank, antwortet er; die Datei wird dann weder geöffnet noch geparst
+    ANSWER = _ASK_DAEMON(ARGS, DB_PATH, FORMAT) if getattr(ARGS, "connect", None) else None
+    ANSWERED_BY = "DAEMON"
+    REMEMBER: Any = lambda VALUE: VALUE     # noqa: E731
+    if ANSWER is None:
+        # Sonst der Ergebnis-Cache: ein Treffer braucht nur os.stat der Datenbank
+        ANSWER, REMEMBER = _CACHE_LOOKUP(ARGS, DB_PATH, FORMAT)
+        ANSWERED_BY = "CACHE"
+    STORE: Any = None
+    if ANSWER is None:
+        from .storage import STORAGE
+
+        STORE = STORAGE(DB_PATH, FORMAT, USE_AGGREGATES=ARGS.aggregates, USE_DATE_INDEX=ARGS.date_index, DURABILITY=ARGS.durability)
+    if getattr(ARGS, "explain", False):
+        import sys
+
+        NEED = getattr(ARGS, "NEEDS", "ROWS")
+        if ANSWER is not None:
+            SOURCE = ANSWERED_BY
+        else:
+            from .queries import PLAN
+
+            SOURCE = PLAN(STORE, NEED)
+        print(f"PLAN: {ARGS.COMMAND} NEEDS {NEED} -> {SOURCE}", file=sys.stderr)
 
     if ARGS.COMMAND == "add":
+        from .models import ENTRY
+
         DATE_STR = OPTIONAL_STRIP(ARGS.date)    # Argument --date, OPTIONAL_STRIP entfernt führende und nachfolgende Leerzeichen oder gibt None zurück
         ITEM = ARGS.item
         GRAMS = int(ARGS.grams)
@@ -99,48 +311,113 @@ def RUN_FROM_ARGS(ARGS: argparse.Namespace) -> int:
         return 0
 
     if ARGS.COMMAND == "import-csv":
+        from .importers import IMPORT_CSV_TO_STORAGE
+
         mapping = {}
         for m in ARGS.map:
             if "=" not in m:
                 raise ValueError(f"Invalid --map '{m}'. Use KEY=VALUE, e.g. DATE=Datum")
             k, v = m.split("=", 1)
             mapping[k.strip().upper()] = v.strip()  # KEY in {DATE, ITEM, GRAMS, REASON, ID}
-        stats = IMPORT_CSV_TO_STORAGE(
-            CSV_PATH=ARGS.file,
+        OPTIONS = dict(
             STORE=STORE,
             MAPPING=mapping or None,
             ENCODING=ARGS.encoding,
             DELIMITER=ARGS.delimiter,
             DRY_RUN=ARGS.dry_run,
+            ON_DUPLICATE=ARGS.on_duplicate,
+            REJECTS_PATH=ARGS.rejects,
+            MAX_ERRORS=ARGS.max_errors,
         )
-        print(f"IMPORTED {stats['added']} rows, skipped {stats['skipped']}. DB: {stats['db']}")
+        # --jobs gilt nur für --dir, --workers nur für --file: nicht stillschweigend ignorieren
+        if ARGS.dir and ARGS.workers is not None:
+            raise ValueError("--workers only applies to --file; use --jobs with --dir")
+        if ARGS.file and ARGS.jobs is not None:
+            raise ValueError("--jobs only applies to --dir; use --workers with --file")
+        if ARGS.dir:
+            from .importers import IMPORT_CSV_DIR_TO_STORAGE
+
+            stats = IMPORT_CSV_DIR_TO_STORAGE(ARGS.dir, GLOB=ARGS.glob, JOBS=ARGS.jobs or 4, PROGRESS=_PROGRESS_PRINTER(), **OPTIONS)
+            # Zusammenfassung je Datei
+            print(f"{'FILE':<40} {'ADDED':>9} {'SKIPPED':>9} {'DUPLICATES':>10}")
+            for f in stats["files"]:
+                print(f"{f['file']:<40} {f['added']:>9} {f['skipped']:>9} {f['duplicates']:>10}" + (f"  FAILED: {f['error']}" if f["error"] else ""))
+            print(f"IMPORTED {stats['added']} rows from {len(stats['files'])} files, skipped {stats['skipped']}. DB: {stats['db']}")
+        else:
+            stats = IMPORT_CSV_TO_STORAGE(CSV_PATH=ARGS.file, WORKERS=ARGS.workers or 1, **OPTIONS)
+            print(f"IMPORTED {stats['added']} rows, skipped {stats['skipped']}. DB: {stats['db']}")
+        if ARGS.on_duplicate:
+            print(f"DUPLICATES: {stats['duplicates']} ({ARGS.on_duplicate})")
         if stats["errors"]:
             print("ERRORS:")
             for e in stats["errors"][:10]:
                 print(" -", e)
-            if len(stats["errors"]) > 10:
-                print(f" ... and {len(stats['errors']) - 10} more.")
+            if stats["skipped"] > 10:
+                print(f" ... and {stats['skipped'] - 10} more.")
+        if stats["rejects"]:
+            print(f"REJECTED ROWS WRITTEN TO {stats['rejects']}")
+        if stats["aborted"]:
+            print(f"ABORTED: MORE THAN {ARGS.max_errors} REJECTED ROWS")
+            return 1
+        return 1 if any(f["error"] for f in stats["files"]) else 0
+
+    if ARGS.COMMAND == "compact":
+        from .compact import COMPACT
+
+        stats = COMPACT(STORE, RUN_SIZE=ARGS.run_size, IGNORE_IDS=ARGS.ignore_ids, REBUILD_INDEXES=ARGS.rebuild_indexes)
+        print(f"COMPACTED {stats['read']} ENTRIES: WROTE {stats['written']}, DROPPED {stats['duplicates']} DUPLICATES. DB: {stats['db']}")
+        return 0
+
+    if ARGS.COMMAND == "serve":
+        from .daemon import SERVE
+
+        def READY(SERVER: Any) -> None:
+            print(f"SERVING {STORE.PATH} ON {ARGS.socket}", flush=True)
+
+        SERVE(STORE, ARGS.socket, READY)
+        return 0
+
+    if ARGS.COMMAND == "serve-http":
+        from .ingest import SERVE_HTTP
+
+        def HTTP_READY(SERVER: Any, PORT: int) -> None:
+            print(f"SERVING HTTP ON {ARGS.host}:{PORT} -> {STORE.PATH}", flush=True)
+
+        SERVE_HTTP(STORE, ARGS.host, ARGS.port, HTTP_READY, MAX_QUEUE=ARGS.max_queue, MAX_BATCH=ARGS.max_batch)
         return 0
 
     if ARGS.COMMAND == "list":
-        LIMIT = int(ARGS.limit or 0)
-        COUNT = 0
-        for E in ENTRIES:
-            print(f"{E.ID}\t{E.DATE.isoformat()}\t{E.ITEM}\t{E.GRAMS}\t{E.REASON}")
-            COUNT += 1
-            if LIMIT > 0 and COUNT >= LIMIT:
-                break
+        if ANSWER is not None:
+            COUNT = ANSWER["result"]    # Zeilen hat der Daemon bereits gestreamt
+        else:
+            LIMIT = int(ARGS.limit or 0)
+            COUNT = 0
+            for E in STORE.ITER_ENTRIES():   # Streamt; bricht die Schleife ab, wird die Datei nicht weiter gelesen
+                _PRINT_ROW(E.ID, E.DATE.isoformat(), E.ITEM, E.GRAMS, E.REASON)
+                COUNT += 1
+                if LIMIT > 0 and COUNT >= LIMIT:
+                    break
         if COUNT == 0:
             print("NO ENTRIES")
         return 0
 
     if ARGS.COMMAND == "total":
-        T = TOTAL_WASTE(ENTRIES)
+        if ANSWER is not None:
+            T = ANSWER["result"]
+        else:
+            from .queries import QUERY_TOTAL
+
+            T = REMEMBER(QUERY_TOTAL(STORE))
         print(f"TOTAL WASTE: {T} G")
         return 0
 
     if ARGS.COMMAND == "top3":
-        TOP = TOP_THREE_ITEMS(ENTRIES)
+        if ANSWER is not None:
+            TOP = [tuple(ROW) for ROW in ANSWER["result"]]
+        else:
+            from .queries import QUERY_TOP_THREE
+
+            TOP = REMEMBER(QUERY_TOP_THREE(STORE))
         if not TOP:
             print("NO ENTRIES")
         else:
@@ -148,26 +425,107 @@ def RUN_FROM_ARGS(ARGS: argparse.Namespace) -> int:
                 print(f"{RANK}. {ITEM}: {GRAMS} G")
         return 0
 
+    if ARGS.COMMAND == "top":
+        GROUP = ARGS.by.upper()
+        METRIC = (ARGS.metric or ("GRAMS" if GROUP == "ITEM" else "COUNT")).upper()
+        if ANSWER is not None:
+            TOP = [tuple(ROW) for ROW in ANSWER["result"]]
+        else:
+            from .queries import QUERY_TOP
+
+            TOP = REMEMBER(QUERY_TOP(STORE, int(ARGS.n), GROUP, METRIC))
+        if not TOP:
+            print("NO ENTRIES")
+        else:
+            UNIT = " G" if METRIC == "GRAMS" else " ENTRIES"
+            for RANK, (NAME, VALUE) in enumerate(TOP, start=1):
+                print(f"{RANK}. {NAME}: {VALUE}{UNIT}")
+        return 0
+
     if ARGS.COMMAND == "period":
         START = PARSE_DATE(ARGS.start)
         END = PARSE_DATE(ARGS.end)
         if END < START:
             raise ValueError("END DATE MUST BE >= START DATE")
-        T = WASTE_IN_PERIOD(ENTRIES, START, END)
+        if ANSWER is not None:
+            T = ANSWER["result"]
+        else:
+            from .queries import QUERY_PERIOD
+
+            T = REMEMBER(QUERY_PERIOD(STORE, START, END))
         print(f"WASTE FROM {START.isoformat()} TO {END.isoformat()}: {T} G")
         return 0
 
     if ARGS.COMMAND == "common-reason":
-        R = MOST_COMMON_REASON(ENTRIES)
+        if ANSWER is not None:
+            R = ANSWER["result"]
+        else:
+            from .queries import QUERY_COMMON_REASON
+
+            R = REMEMBER(QUERY_COMMON_REASON(STORE))
         print("NO ENTRIES" if R is None else f"MOST COMMON REASON: {R}")
         return 0
 
     if ARGS.COMMAND == "average":
-        entries = STORE.READ_ALL()
-        avg = sum(e.GRAMS for e in entries) / len(entries) if entries else 0
+        if ANSWER is not None:
+            avg = ANSWER["result"]
+        else:
+            from .queries import QUERY_AVERAGE
+
+            avg = REMEMBER(QUERY_AVERAGE(STORE))
         print(f"AVERAGE: {avg:.1f} G")
         return 0
 
+    if ARGS.COMMAND == "report":
+        import json
+
+        START = PARSE_DATE(ARGS.start) if OPTIONAL_STRIP(ARGS.start) else None
+        END = PARSE_DATE(ARGS.end) if OPTIONAL_STRIP(ARGS.end) else None
+        if START is not None and END is not None and END < START:
+            raise ValueError("END DATE MUST BE >= START DATE")
+        if ANSWER is not None:
+            R = ANSWER["result"]
+        else:
+            from .queries import QUERY_REPORT
+
+            R = REMEMBER(QUERY_REPORT(STORE, START, END))
+        if ARGS.json:
+            print(json.dumps({
+                "TOTAL": R["TOTAL"],
+                "COUNT": R["COUNT"],
+                "AVERAGE": R["AVERAGE"],
+                "TOP3": [{"ITEM": ITEM, "GRAMS": GRAMS} for ITEM, GRAMS in R["TOP3"]],
+                "MOST_COMMON_REASON": R["MOST_COMMON_REASON"],
+                "PERIOD": None if R["PERIOD"] is None else {
+                    "START": START.isoformat() if START else None,
+                    "END": END.isoformat() if END else None,
+                    "GRAMS": R["PERIOD"],
+                },
+            }, ensure_ascii=False))
+            return 0
+        print(f"TOTAL WASTE: {R['TOTAL']} G")
+        print(f"ENTRIES: {R['COUNT']}")
+        print(f"AVERAGE: {R['AVERAGE']:.1f} G")
+        print("TOP 3 ITEMS:" if R["TOP3"] else "TOP 3 ITEMS: NO ENTRIES")
+        for RANK, (ITEM, GRAMS) in enumerate(R["TOP3"], start=1):
+            print(f"{RANK}. {ITEM}: {GRAMS} G")
+        print("MOST COMMON REASON: " + ("NO ENTRIES" if R["MOST_COMMON_REASON"] is None else R["MOST_COMMON_REASON"]))
+        if R["PERIOD"] is not None:
+            S_TXT = START.isoformat() if START else "BEGINNING"
+            E_TXT = END.isoformat() if END else "END"
+            print(f"WASTE FROM {S_TXT} TO {E_TXT}: {R['PERIOD']} G")
+        return 0
+
+    if ARGS.COMMAND == "cache-stats":
+        from .resultcache import RESULT_CACHE
+
+        CACHE = RESULT_CACHE(_DB_FILE(DB_PATH))
+        if ARGS.clear:
+            CACHE.CLEAR()
+        S = CACHE.STATS()
+        print(f"CACHE HITS: {S['HITS']}, MISSES: {S['MISSES']}, ENTRIES: {S['ENTRIES']}, BYTES: {S['BYTES']}")
+        return 0
+
     raise RuntimeError("UNKNOWN COMMAND")
 
 def MAIN() -> None:
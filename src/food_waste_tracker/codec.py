@@ -0,0 +1,226 @@
+from __future__ import annotations
+import json
+import re
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from json.encoder import encode_basestring  # type: ignore[attr-defined]
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .models import ENTRY
+
+# Schneller Kodier-/Dekodierweg für das feste 5-Felder-Schema von ENTRY.
+# Die Ausgabe ist byte-identisch zu json.dumps(E.TO_DICT(), ensure_ascii=False) bzw. csv.DictWriter,
+# spart aber das Zwischen-Dict und den generischen JSON-Encoder pro Zeile.
+
+FIELDNAMES = ["ID", "DATE", "ITEM", "GRAMS", "REASON"]
+
+# encode_basestring ist der (C-)String-Encoder, den json.dumps bei ensure_ascii=False verwendet
+_STR = encode_basestring
+_DECODE = json.JSONDecoder().decode     # Einmal erzeugter Decoder, wird für jede Zeile wiederverwendet
+_NEW = object.__new__
+
+def ENCODE_JSONL(E: ENTRY) -> str:
+    """
+    Gibt die JSONL-Zeile (inkl. Zeilenumbruch) für einen Eintrag zurück.
+    """
+    return (
+        '{"ID": ' + _STR(E.ID)
+        + ', "DATE": "' + E.DATE.isoformat()
+        + '", "ITEM": ' + _STR(E.ITEM)
+        + ', "GRAMS": ' + int.__repr__(E.GRAMS)
+        + ', "REASON": ' + _STR(E.REASON)
+        + "}\n"
+    )
+
+def CSV_ROW(E: ENTRY) -> List[Any]:
+    """
+    Gibt die CSV-Zeile in der Spaltenreihenfolge FIELDNAMES zurück (für csv.writer statt csv.DictWriter).
+    """
+    return [E.ID, E.DATE.isoformat(), E.ITEM, E.GRAMS, E.REASON]
+
+def PARSE_ISO_DATE(VAL: str) -> date:
+    """
+    "YYYY-MM-DD" direkt über date.fromisoformat; längere ISO-Werte (mit Uhrzeit) wie bisher über datetime.
+    """
+    if len(VAL) == 10:
+        return date.fromisoformat(VAL)
+    return datetime.fromisoformat(VAL).date()
+
+def BUILD_ENTRY(ID: str, DATE: date, ITEM: str, GRAMS: int, REASON: str) -> ENTRY:
+    """
+    Wie ENTRY(...), aber ohne den Umweg über das generierte __init__ (fünf object.__setattr__-Aufrufe).
+    Prüft und wandelt nichts: nur für Werte mit bereits passenden Typen (sonst FROM_VALUES).
+    """
+    E = _NEW(ENTRY)
+    E.__dict__.update(ID=ID, DATE=DATE, ITEM=ITEM, GRAMS=GRAMS, REASON=REASON)
+    return E
+
+def FROM_VALUES(ID: Any, DATE: Any, ITEM: Any, GRAMS: Any, REASON: Any) -> ENTRY:
+    """
+    Baut ein ENTRY aus Rohwerten; str()/int() nur, wenn der Typ nicht schon stimmt.
+    """
+    return BUILD_ENTRY(
+        ID if type(ID) is str else str(ID),
+        PARSE_ISO_DATE(DATE),
+        ITEM if type(ITEM) is str else str(ITEM),
+        GRAMS if type(GRAMS) is int else int(GRAMS),
+        REASON if type(REASON) is str else str(REASON),
+    )
+
+def DECODE_JSONL(LINE: str | bytes) -> ENTRY:
+    """
+    Dekodiert eine JSONL-Zeile in ein ENTRY.
+    """
+    D: Dict[str, Any] = _DECODE(LINE) if isinstance(LINE, str) else json.loads(LINE)
+    return FROM_VALUES(D["ID"], D["DATE"], D["ITEM"], D["GRAMS"], D["REASON"])
+
+def DECODE_CSV_ROW(ROW: Sequence[str], POSITIONS: Sequence[int]) -> ENTRY:
+    """
+    Dekodiert eine csv.reader-Zeile; POSITIONS enthält die Spaltenindizes von ID, DATE, ITEM, GRAMS, REASON.
+    """
+    return FROM_VALUES(ROW[POSITIONS[0]], ROW[POSITIONS[1]], ROW[POSITIONS[2]], ROW[POSITIONS[3]], ROW[POSITIONS[4]])
+
+def DECODE_JSONL_COLUMNS(LINE: str | bytes) -> Tuple[int, int, str, str]:
+    """
+    Dekodiert eine JSONL-Zeile nur in die Spaltenwerte (DATUM als Ordinalzahl, GRAMS, ITEM, REASON), ohne ENTRY.
+    """
+    D: Dict[str, Any] = _DECODE(LINE) if isinstance(LINE, str) else json.loads(LINE)
+    return PARSE_ISO_DATE(D["DATE"]).toordinal(), int(D["GRAMS"]), str(D["ITEM"]), str(D["REASON"])
+
+def DECODE_CSV_COLUMNS(ROW: Sequence[str], POSITIONS: Sequence[int]) -> Tuple[int, int, str, str]:
+    """
+    Wie DECODE_JSONL_COLUMNS für eine csv.reader-Zeile (POSITIONS wie bei DECODE_CSV_ROW).
+    """
+    return PARSE_ISO_DATE(ROW[POSITIONS[1]]).toordinal(), int(ROW[POSITIONS[3]]), ROW[POSITIONS[2]], ROW[POSITIONS[4]]
+
+# ---- BYTE-SCAN FÜR SUMMEN ----
+# total, average und period brauchen nur DATE und GRAMS. Zeilen im Format von ENCODE_JSONL erkennt ein einmal kompilierter
+# Bytes-Regex direkt im gelesenen Block, ohne json.loads und ENTRY. Er deckt jeweils eine ganze Zeile ab: Jeder Treffer
+# beginnt mit dem Zeilenumbruch davor (der Block bekommt vorne einen) und endet vor dem nächsten, DATE muss ein gültiges
+# Datum sein, GRAMS eine Zahl ohne führende Null. Bei Zeiträumen prüft der Regex (je Zeitraum einmal erzeugt) auch den
+# Zeitraum und liefert GRAMS nur für passende Zeilen, so dass DATE nicht erst in Python verglichen wird.
+# Ein Block läuft nur dann über den schnellen Weg, wenn zusätzlich
+# - es genau einen Treffer pro Zeile gibt und außer den Zeilenumbrüchen keine Steuerzeichen (Bytes < 0x20),
+# - jeder Backslash ein gültiges JSON-Escape beginnt und kein "\\" vorkommt (dann ist \" sicher ein Escape; der Regex
+#   beendet Strings nur an '"' ohne Backslash davor),
+# - der Block gültiges UTF-8 ist.
+# Eine so erkannte Zeile liefert mit DECODE_JSONL dieselben Werte. Andere Blöcke (anderer Schreiber, Leerzeilen,
+# Leerzeichen, \r\n, abgerissene Zeilen, ungültige Werte) werden wie in STORAGE.ITER_ENTRIES Zeile für Zeile über
+# DECODE_JSONL gelesen - mit denselben Werten und Fehlern.
+# Geschwindigkeit: benchmarks/bench_scan.py
+
+# JSON-String: endet am ersten '"' ohne Backslash davor. Ab Python 3.11 mit possessiven Quantoren (ohne Backtracking,
+# deutlich schneller); davor dieselbe Sprache mit (?<!\\) vor dem schließenden '"', damit Backtracking den String nie an
+# einem \" enden lässt (sonst würde z.B. "x\", "GRAMS": 5 ... als gültige Zeile erkannt).
+if sys.version_info >= (3, 11):
+    _STRING = rb'"[^"]*+(?:(?<=\\)"[^"]*+)*+"'
+else:
+    _STRING = rb'"[^"]*(?:(?<=\\)"[^"]*)*(?<!\\)"'
+_DATE = (
+    rb'(?:(?!0000)\d{4}-(?:(?:0[1-9]|1[0-2])-(?:0[1-9]|1\d|2[0-8])|(?:0[13-9]|1[0-2])-(?:29|30)|(?:0[13578]|1[02])-31)'
+    rb'|(?:\d\d(?:0[48]|[2468][048]|[13579][26])|(?:0[48]|[2468][048]|[13579][26])00)-02-29)'   # inkl. Schaltjahre
+)
+_HEAD = rb'\n\{"ID": ' + _STRING + rb', "DATE": "'
+_MIDDLE = rb'", "ITEM": ' + _STRING + rb', "GRAMS": '
+_GRAMS = rb'(?:0|[1-9]\d*)'
+_TAIL = rb', "REASON": ' + _STRING + rb'\}(?=\n)'
+_BAD_ESCAPE = re.compile(rb'\\(?!["/bfnrt]|u[0-9a-fA-F]{4})')    # Trifft auch "\\"
+_NOT_CONTROL = bytes(range(32, 256))
+SCAN_BLOCK_SIZE = 512 << 10   # Bytes pro read()
+
+def _DATE_BOUND(DAY: str, UP: bool) -> str:
+    """
+    Regex für den Anfang von ISO-Daten >= DAY (UP) bzw. <= DAY: Ziffer für Ziffer gleich oder an der ersten
+    abweichenden Stelle größer bzw. kleiner. Den Rest des Datums prüft _DATE.
+    """
+    PATTERN = ""
+    for I in range(len(DAY) - 1, -1, -1):
+        C = DAY[I]
+        if C != "-" and C != ("9" if UP else "0"):
+            LOW, HIGH = (int(C) + 1, 9) if UP else (0, int(C) - 1)
+            PATTERN = f"(?:{C}{PATTERN}|" + (f"[{LOW}-{HIGH}])" if LOW < HIGH else f"{LOW})")
+        else:
+            PATTERN = C + PATTERN
+    return PATTERN
+
+@lru_cache(maxsize=None)
+def _GRAMS_LINE() -> re.Pattern[bytes]:
+    """
+    Regex für eine ganze Zeile; liefert GRAMS. Erst beim ersten Scan kompiliert, nicht bei jedem CLI-Start.
+    """
+    return re.compile(_HEAD + _DATE + _MIDDLE + b"(" + _GRAMS + b")" + _TAIL)
+
+@lru_cache(maxsize=64)
+def _RANGE_LINE(LOW: date, HIGH: date) -> re.Pattern[bytes]:
+    """
+    Wie _GRAMS_LINE, aber GRAMS nur für Zeilen mit LOW <= DATE <= HIGH; gültige Zeilen außerhalb liefern b"".
+    """
+    IN_RANGE = "(?=" + _DATE_BOUND(LOW.isoformat(), True) + ")(?=" + _DATE_BOUND(HIGH.isoformat(), False) + ")"
+    return re.compile(
+        _HEAD + b"(?:" + IN_RANGE.encode("ascii") + _DATE + _MIDDLE + b"(" + _GRAMS + b")|" + _DATE + _MIDDLE + _GRAMS + b")" + _TAIL
+    )
+
+def _SCAN_BLOCK(FENCED: bytes, START: Optional[date], END: Optional[date]) -> Tuple[int, int]:
+    """
+    Summe und Anzahl für einen Block aus vollständigen Zeilen, dem ein Zeilenumbruch vorangestellt ist.
+    """
+    if START is None and END is None:
+        VALUES = _GRAMS_LINE().findall(FENCED)
+    else:
+        VALUES = _RANGE_LINE(START or date.min, END or date.max).findall(FENCED)
+    CONTROL = FENCED.translate(None, _NOT_CONTROL)     # Bytes < 0x20; im Normalfall nur die Zeilenumbrüche
+    if (
+        len(VALUES) == len(CONTROL) - 1
+        and not CONTROL.strip(b"\n")
+        and (b"\\" not in FENCED or _BAD_ESCAPE.search(FENCED) is None)
+    ):
+        try:
+            FENCED.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        else:
+            VALUES = list(filter(None, VALUES))     # Ohne Zeilen außerhalb des Zeitraums
+            return sum(map(int, VALUES)), len(VALUES)
+    TOTAL = 0
+    COUNT = 0
+    for LINE in FENCED[1:].splitlines():
+        TEXT = LINE.decode("utf-8").strip()
+        if not TEXT:
+            continue
+        E = DECODE_JSONL(TEXT)
+        if (START is not None and E.DATE < START) or (END is not None and E.DATE > END):
+            continue
+        TOTAL += E.GRAMS
+        COUNT += 1
+    return TOTAL, COUNT
+
+def SCAN_JSONL_SUM(PATH: Any, START: Optional[date] = None, END: Optional[date] = None) -> Tuple[int, int]:
+    """
+    Summe der GRAMS und Anzahl der Einträge einer JSONL-Datei, optional nur mit START <= DATE <= END.
+    Liest die Datei in Blöcken von SCAN_BLOCK_SIZE Bytes; fehlt sie, ist das Ergebnis (0, 0).
+    """
+    TOTAL = 0
+    COUNT = 0
+    try:
+        F = open(PATH, "rb")
+    except FileNotFoundError:
+        return 0, 0
+    with F:
+        REST = b""
+        while True:
+            DATA = F.read(SCAN_BLOCK_SIZE)
+            if not DATA:
+                break
+            CUT = DATA.rfind(b"\n") + 1
+            if CUT == 0:
+                REST += DATA    # Zeile länger als ein Block
+                continue
+            T, C = _SCAN_BLOCK(b"".join((b"\n", REST, memoryview(DATA)[:CUT])), START, END)   # Eine Kopie
+            TOTAL += T
+            COUNT += C
+            REST = DATA[CUT:]
+        if REST:
+            T, C = _SCAN_BLOCK(b"\n" + REST + b"\n", START, END)    # Letzte Zeile ohne Zeilenumbruch
+            TOTAL += T
+            COUNT += C
+    return TOTAL, COUNT
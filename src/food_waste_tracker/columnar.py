@@ -0,0 +1,234 @@
+from __future__ import annotations
+import json
+import mmap
+import os
+import shutil
+from array import array
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional
+from .models import ENTRY
+from .utils import FSYNC_DIRECTORY, RECOVER_DIRECTORY, REPLACE_DIRECTORY
+from .vectorized import COLUMNS
+
+# Spaltenformat (FORMAT="COLUMNAR"): Der DB-Pfad ist ein Verzeichnis mit einer Datei pro Spalte.
+#
+#   DATE.i32     Datum als int32-Ordinalzahl (date.toordinal())
+#   GRAMS.i32    Gramm als int32
+#   ITEM.i32     Code in das Wörterbuch ITEMS.jsonl
+#   REASON.i32   Code in das Wörterbuch REASONS.jsonl
+#   ITEMS.jsonl / REASONS.jsonl   Wörterbücher, eine JSON-Zeichenkette pro Zeile (Code = Zeilennummer)
+#   ID.jsonl     IDs, eine JSON-Zeichenkette pro Zeile (nur beim Erzeugen von ENTRY-Objekten gelesen)
+#
+# Die festen Spalten haben 4 Byte pro Zeile in nativer Byte-Reihenfolge und werden per mmap gelesen,
+# so dass Summen über GRAMS/DATE ein Durchlauf über einen zusammenhängenden Puffer sind.
+# DATE.i32 wird pro Block als letzte Datei geschrieben und bestimmt die Zeilenanzahl.
+# Während ein Schreiber offen ist, existiert die Markierung WRITING. Findet OPEN_WRITER sie vor (Prozess per SIGKILL
+# beendet, Stromausfall mitten im Block), kürzt _REPAIR zuerst alle Dateien auf den Stand von DATE.i32; sonst lägen neue
+# Werte hinter dem abgerissenen Rest und die Spalten (und die zeilenweise gelesenen IDs) wären dauerhaft verschoben.
+
+INT32_MAX = 2**31 - 1
+FIXED_COLUMNS = ["GRAMS", "ITEM", "REASON", "DATE"]  # Schreibreihenfolge, DATE zuletzt
+
+class COLUMNAR_STORE:
+    def __init__(SELF, PATH: Path) -> None:
+        SELF.PATH = PATH
+        RECOVER_DIRECTORY(SELF.PATH)    # Vor mkdir: ein abgebrochenes SAVE_ALL hat PATH womöglich nach PATH.old verschoben
+        SELF.PATH.mkdir(parents=True, exist_ok=True)
+        for NAME in [f"{N}.i32" for N in FIXED_COLUMNS] + ["ITEMS.jsonl", "REASONS.jsonl", "ID.jsonl"]:
+            if not (SELF.PATH / NAME).exists():
+                (SELF.PATH / NAME).touch()  # touch() nur bei neuen Dateien, sonst ändert sich die mtime
+        # Änderungen an DATE.i32 kennzeichnen jeden Schreibvorgang (für Sidecar-Fingerprints)
+        SELF.FINGERPRINT_PATH = SELF.PATH / "DATE.i32"
+
+    def ROW_COUNT(SELF) -> int:
+        return SELF.FINGERPRINT_PATH.stat().st_size // 4
+
+    def IS_EMPTY(SELF) -> bool:
+        return SELF.ROW_COUNT() == 0
+
+    def _READ_DICTIONARY(SELF, NAME: str) -> List[str]:
+        # Eine Zeile ohne Zeilenumbruch am Ende stammt aus einem abgebrochenen Block und hat noch keinen Code in Gebrauch
+        with (SELF.PATH / f"{NAME}.jsonl").open("r", encoding="utf-8") as F:
+            return [json.loads(LINE) for LINE in F if LINE.endswith("\n") and LINE.strip()]
+
+    def _REPAIR(SELF) -> None:
+        """
+        Kürzt alle Dateien auf die ROW_COUNT() Zeilen aus DATE.i32: die festen Spalten auf ROW_COUNT()*4 Bytes,
+        ID.jsonl auf ROW_COUNT() Zeilen und die Wörterbücher auf ihre letzte vollständige Zeile. Vollständig
+        geschriebene neue Wörterbucheinträge bleiben stehen (ungenutzte Codes stören nicht).
+        """
+        ROWS = SELF.ROW_COUNT()
+        for N in FIXED_COLUMNS:
+            with (SELF.PATH / f"{N}.i32").open("r+b") as F:
+                F.truncate(ROWS * 4)
+        with (SELF.PATH / "ID.jsonl").open("r+b") as F:
+            for _ in range(ROWS):
+                if not F.readline().endswith(b"\n"):
+                    raise ValueError("ID.jsonl HAS FEWER ROWS THAN DATE.i32")
+            F.truncate()
+        for NAME in ["ITEMS.jsonl", "REASONS.jsonl"]:
+            with (SELF.PATH / NAME).open("r+b") as F:
+                F.truncate(F.read().rfind(b"\n") + 1)
+
+    @contextmanager
+    def _MAPPED(SELF, NAME: str) -> Iterator[Any]:
+        """
+        Liefert die Spalte NAME als memoryview über eine schreibgeschützte mmap (int32-Werte).
+        Die Länge wird auf ROWS begrenzt, damit halb geschriebene Blöcke nie sichtbar sind.
+        """
+        ROWS = SELF.ROW_COUNT()
+        if ROWS == 0:
+            yield memoryview(array("i"))
+            return
+        with (SELF.PATH / f"{NAME}.i32").open("rb") as F:
+            MM = mmap.mmap(F.fileno(), 0, access=mmap.ACCESS_READ)
+            VIEW = memoryview(MM)[:ROWS * 4].cast("i")
+            try:
+                yield VIEW
+            finally:
+                VIEW.release()
+                MM.close()
+
+    # ---- LESEN ----
+
+    def ITER_ENTRIES(SELF) -> Iterator[ENTRY]:
+        ITEMS = SELF._READ_DICTIONARY("ITEMS")
+        REASONS = SELF._READ_DICTIONARY("REASONS")
+        with SELF._MAPPED("DATE") as DATES, SELF._MAPPED("GRAMS") as GRAMS, \
+                SELF._MAPPED("ITEM") as ITEM_CODES, SELF._MAPPED("REASON") as REASON_CODES, \
+                (SELF.PATH / "ID.jsonl").open("r", encoding="utf-8") as IDS:
+            for ROW in range(len(DATES)):
+                yield ENTRY(
+                    ID=json.loads(IDS.readline()),
+                    DATE=date.fromordinal(DATES[ROW]),
+                    ITEM=ITEMS[ITEM_CODES[ROW]],
+                    GRAMS=GRAMS[ROW],
+                    REASON=REASONS[REASON_CODES[ROW]],
+                )
+
+    def TO_COLUMNS(SELF) -> COLUMNS:
+        """
+        Gibt die Spalten ohne Kopie als memoryviews auf die gemappten Dateien zurück.
+        Die Mappings bleiben offen, bis COLUMNS.CLOSE() aufgerufen wird.
+        """
+        ROWS = SELF.ROW_COUNT()
+        VIEWS: Dict[str, Any] = {}
+        RESOURCES: List[Any] = []
+        for NAME in FIXED_COLUMNS:
+            if ROWS == 0:
+                VIEWS[NAME] = memoryview(array("i"))
+                continue
+            with (SELF.PATH / f"{NAME}.i32").open("rb") as F:
+                MM = mmap.mmap(F.fileno(), 0, access=mmap.ACCESS_READ)  # mmap bleibt nach dem Schließen der Datei gültig
+            RESOURCES.append(MM)
+            VIEWS[NAME] = memoryview(MM)[:ROWS * 4].cast("i")
+        return COLUMNS(
+            VIEWS["DATE"], VIEWS["GRAMS"], VIEWS["ITEM"], SELF._READ_DICTIONARY("ITEMS"),
+            VIEWS["REASON"], SELF._READ_DICTIONARY("REASONS"), RESOURCES,
+        )
+
+    def SUM_GRAMS(SELF, START: Optional[date] = None, END: Optional[date] = None) -> int:
+        """
+        Summiert GRAMS direkt auf dem gemappten Puffer, optional nur für START <= DATE <= END.
+        """
+        with SELF._MAPPED("GRAMS") as GRAMS:
+            if START is None and END is None:
+                return sum(GRAMS)
+            S_ORD = START.toordinal() if START is not None else 0
+            E_ORD = END.toordinal() if END is not None else INT32_MAX
+            with SELF._MAPPED("DATE") as DATES:
+                return sum(G for D, G in zip(DATES, GRAMS) if S_ORD <= D <= E_ORD)
+
+    # ---- SCHREIBEN ----
+
+    @contextmanager
+    def OPEN_WRITER(SELF, SYNC: bool = False) -> Iterator[Callable[[List[ENTRY]], None]]:
+        """
+        Öffnet alle Spaltendateien einmal und liefert eine Funktion WRITE(BATCH).
+        Schlägt ein Block fehl, werden alle Dateien auf den Stand vor dem Block gekürzt.
+        SYNC=True: nach jedem Block fsync aller Spaltendateien.
+        """
+        MARKER = SELF.PATH / "WRITING"
+        if MARKER.exists():
+            SELF._REPAIR()   # Der letzte Schreiber wurde nicht sauber beendet
+        MARKER.touch()
+        if SYNC:
+            FSYNC_DIRECTORY(SELF.PATH)     # Markierung vor den Daten dauerhaft machen
+        CODES = {
+            "ITEMS": {V: I for I, V in enumerate(SELF._READ_DICTIONARY("ITEMS"))},
+            "REASONS": {V: I for I, V in enumerate(SELF._READ_DICTIONARY("REASONS"))},
+        }
+        NAMES = ["ITEMS.jsonl", "REASONS.jsonl", "ID.jsonl"] + [f"{N}.i32" for N in FIXED_COLUMNS]
+        FILES: Dict[str, BinaryIO] = {}
+        try:
+            for NAME in NAMES:
+                FILES[NAME] = (SELF.PATH / NAME).open("ab", buffering=0)
+
+            def WRITE(BATCH: List[ENTRY]) -> None:
+                NEW: Dict[str, List[str]] = {"ITEMS": [], "REASONS": []}
+
+                def CODE(KIND: str, VALUE: str) -> int:
+                    C = CODES[KIND].get(VALUE)
+                    if C is None:
+                        C = CODES[KIND][VALUE] = len(CODES[KIND])
+                        NEW[KIND].append(VALUE)
+                    return C
+
+                OFFSETS = {NAME: F.tell() for NAME, F in FILES.items()}
+                try:
+                    COLUMNS = {N: array("i") for N in FIXED_COLUMNS}
+                    for E in BATCH:
+                        if E.GRAMS > INT32_MAX:
+                            raise ValueError("GRAMS TOO LARGE FOR COLUMNAR FORMAT (INT32)")
+                        COLUMNS["GRAMS"].append(E.GRAMS)
+                        COLUMNS["ITEM"].append(CODE("ITEMS", E.ITEM))
+                        COLUMNS["REASON"].append(CODE("REASONS", E.REASON))
+                        COLUMNS["DATE"].append(E.DATE.toordinal())
+                    PAYLOADS = {
+                        "ITEMS.jsonl": "".join(json.dumps(V, ensure_ascii=False) + "\n" for V in NEW["ITEMS"]).encode("utf-8"),
+                        "REASONS.jsonl": "".join(json.dumps(V, ensure_ascii=False) + "\n" for V in NEW["REASONS"]).encode("utf-8"),
+                        "ID.jsonl": "".join(json.dumps(E.ID, ensure_ascii=False) + "\n" for E in BATCH).encode("utf-8"),
+                    }
+                    for N in FIXED_COLUMNS:
+                        PAYLOADS[f"{N}.i32"] = COLUMNS[N].tobytes()
+                    for NAME in NAMES:
+                        DATA = memoryview(PAYLOADS[NAME])
+                        while DATA:
+                            DATA = DATA[FILES[NAME].write(DATA):]   # write() kann weniger Bytes schreiben als übergeben
+                except BaseException:
+                    # Block vollständig zurücknehmen: Dateien kürzen, neue Wörterbuch-Codes vergessen
+                    for NAME, F in FILES.items():
+                        F.truncate(OFFSETS[NAME])
+                    for KIND in NEW:
+                        for VALUE in NEW[KIND]:
+                            del CODES[KIND][VALUE]
+                    raise
+                if SYNC:
+                    for F in FILES.values():
+                        os.fsync(F.fileno())
+
+            yield WRITE
+        finally:
+            for F in FILES.values():
+                F.close()
+            MARKER.unlink()     # Jeder Block ist vollständig geschrieben oder zurückgenommen
+
+    def SAVE_ALL(SELF, ENTRIES: Iterable[ENTRY], BATCH_SIZE: int = 1000) -> None:
+        """
+        Schreibt alle Spalten in ein temporäres Verzeichnis und tauscht es anschließend aus (REPLACE_DIRECTORY).
+        """
+        TMP_PATH = SELF.PATH.with_name(SELF.PATH.name + ".tmp")
+        shutil.rmtree(TMP_PATH, ignore_errors=True)     # Reste eines abgebrochenen Laufs entfernen
+        TMP = COLUMNAR_STORE(TMP_PATH)
+        with TMP.OPEN_WRITER() as WRITE:
+            BATCH: List[ENTRY] = []
+            for E in ENTRIES:
+                BATCH.append(E)
+                if len(BATCH) >= BATCH_SIZE:
+                    WRITE(BATCH)
+                    BATCH = []
+            if BATCH:
+                WRITE(BATCH)
+        REPLACE_DIRECTORY(TMP.PATH, SELF.PATH)
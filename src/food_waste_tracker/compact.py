@@ -0,0 +1,105 @@
+from __future__ import annotations
+import heapq
+import tempfile
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import ENTRY
+from .codec import DECODE_JSONL, ENCODE_JSONL
+from .storage import STORAGE
+
+# Kompaktieren: den Datensatz nach Datum sortiert, ohne exakte Dubletten und ohne Leerzeilen neu schreiben.
+#
+# Sortiert wird extern mit begrenztem Speicher: Je RUN_SIZE Einträge werden im Speicher sortiert und als
+# temporäre JSONL-Datei ("Run") abgelegt, danach mischt heapq.merge alle Runs in einem Durchlauf.
+# Passt alles in einen Run, entfallen die temporären Dateien. Die Sortierung ist stabil (gleiches Datum:
+# ursprüngliche Reihenfolge), exakte Dubletten liegen daher im selben Datumsblock und werden dort entfernt.
+# Geschrieben wird über STORAGE.SAVE_ALL (atomar); Zeitraum-Abfragen lesen danach sequenziell.
+
+def _KEY(E: ENTRY) -> date:
+    return E.DATE
+
+def _READ_RUN(PATH: Path) -> Iterator[ENTRY]:
+    with PATH.open("r", encoding="utf-8") as F:
+        for LINE in F:
+            yield DECODE_JSONL(LINE)
+
+def SORTED_ENTRIES(ENTRIES: Iterable[ENTRY], RUN_SIZE: int = 100_000, TMP_DIR: Optional[str] = None) -> Iterator[ENTRY]:
+    """
+    Liefert ENTRIES stabil nach DATE sortiert; höchstens RUN_SIZE Einträge liegen gleichzeitig im Speicher.
+    Temporäre Runs landen in TMP_DIR (Standard: Systemverzeichnis) und werden danach gelöscht.
+    Alle Eingaben sind gelesen, bevor der erste Eintrag geliefert wird.
+    """
+    if RUN_SIZE < 1:
+        raise ValueError("RUN_SIZE MUST BE >= 1")
+    SOURCE = iter(ENTRIES)
+    FIRST = sorted(islice(SOURCE, RUN_SIZE), key=_KEY)
+    if len(FIRST) < RUN_SIZE:
+        yield from FIRST    # Alles passt in einen Run: keine temporären Dateien
+        return
+    with tempfile.TemporaryDirectory(prefix="compact-", dir=TMP_DIR) as TMP:
+        RUNS: List[Path] = []
+        RUN = FIRST
+        while RUN:
+            PATH = Path(TMP) / f"run-{len(RUNS):06d}.jsonl"
+            with PATH.open("w", encoding="utf-8") as F:
+                F.writelines(map(ENCODE_JSONL, RUN))
+            RUNS.append(PATH)
+            RUN = sorted(islice(SOURCE, RUN_SIZE), key=_KEY)
+        # heapq.merge ist stabil: bei gleichem Datum gewinnt der frühere Run
+        yield from heapq.merge(*(_READ_RUN(P) for P in RUNS), key=_KEY)
+
+def DROP_DUPLICATES(SORTED: Iterable[ENTRY], IGNORE_IDS: bool = False, STATS: Optional[Dict[str, int]] = None) -> Iterator[ENTRY]:
+    """
+    Entfernt exakte Dubletten aus einer nach DATE sortierten Folge (das erste Vorkommen bleibt).
+    Exakt: alle Felder gleich; IGNORE_IDS=True vergleicht nur DATE, ITEM, GRAMS und REASON.
+    Gemerkt werden nur die Einträge des aktuellen Datums. STATS zählt "read" und "duplicates".
+    """
+    STATS = STATS if STATS is not None else {}
+    STATS.setdefault("read", 0)
+    STATS.setdefault("duplicates", 0)
+    CURRENT: Optional[date] = None
+    SEEN: set[Tuple[Any, ...]] = set()
+    for E in SORTED:
+        STATS["read"] += 1
+        if E.DATE != CURRENT:
+            CURRENT = E.DATE
+            SEEN.clear()
+        KEY = (E.ITEM, E.GRAMS, E.REASON) if IGNORE_IDS else (E.ID, E.ITEM, E.GRAMS, E.REASON)
+        if KEY in SEEN:
+            STATS["duplicates"] += 1
+            continue
+        SEEN.add(KEY)
+        yield E
+
+def COMPACT(
+    STORE: STORAGE,
+    RUN_SIZE: int = 100_000,
+    IGNORE_IDS: bool = False,
+    REBUILD_INDEXES: bool = False,
+) -> Dict[str, Any]:
+    """
+    Schreibt den Datensatz von STORE sortiert und ohne exakte Dubletten über STORE.SAVE_ALL neu.
+    Die temporären Runs liegen neben der Datenbank (gleiches Dateisystem, genug Platz).
+
+    REBUILD_INDEXES: Sidecar-Summen (<DB>.agg.json) und Datumsindex (<DB>.dateidx.json, nur JSONL) werden direkt neu
+    aufgebaut, wenn sie existieren oder an STORE aktiviert sind; sonst erst beim nächsten Zugriff.
+    Ein vorhandener ID-Index wird von SAVE_ALL immer neu aufgebaut.
+
+    Rückgabe: {"read": int, "written": int, "duplicates": int, "db": str}
+    """
+    STATS: Dict[str, Any] = {"read": 0, "duplicates": 0}
+    if REBUILD_INDEXES and STORE.SIDECAR is None and STORE.PATH.with_name(STORE.PATH.name + ".agg.json").exists():
+        # Summen im selben Durchlauf wie das Schreiben mitzählen (SAVE_ALL pflegt den Sidecar der STORAGE)
+        from .aggregates import AGGREGATE_SIDECAR
+        STORE.SIDECAR = AGGREGATE_SIDECAR(STORE.PATH, STORE._FINGERPRINT_PATH)
+    HAS_DATE_INDEX = STORE.DATE_INDEX is not None or STORE.PATH.with_name(STORE.PATH.name + ".dateidx.json").exists()
+    STORE.SAVE_ALL(DROP_DUPLICATES(SORTED_ENTRIES(STORE.ITER_ENTRIES(), RUN_SIZE, str(STORE.PATH.parent)), IGNORE_IDS, STATS))
+    if REBUILD_INDEXES and STORE.FORMAT == "JSONL" and HAS_DATE_INDEX:
+        from .dateindex import DATE_INDEX
+
+        (STORE.DATE_INDEX or DATE_INDEX(STORE.PATH)).UPDATE()   # Ein Durchlauf; die Datei ist jetzt sortiert
+    STATS["written"] = STATS["read"] - STATS["duplicates"]
+    STATS["db"] = str(STORE.PATH)
+    return STATS
@@ -0,0 +1,233 @@
+from __future__ import annotations
+import json
+import os
+import socket
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .aggregates import AGGREGATE_INDEX
+    from .storage import STORAGE
+
+# Abfrage-Daemon: "serve --socket PATH" lädt die Datenbank einmal, hält Einträge und laufende Summen im Speicher
+# und beantwortet Abfragen über einen Unix-Domain-Socket. Die CLI nutzt ihn mit "--connect PATH", falls er läuft.
+#
+# Zeilenprotokoll (UTF-8, eine Zeile pro Nachricht, Antworten als JSON):
+#   Server -> Client beim Verbinden:  {"db": "<realpath>", "format": "JSONL"}
+#   Client -> Server:                 total | top3 | common-reason | period START END | list [LIMIT]
+#   Server -> Client:                 bei list zuerst je Eintrag [ID, DATE, ITEM, GRAMS, REASON],
+#                                     danach immer {"ok": true, "result": ...} oder {"ok": false, "error": "..."}
+# Mehrere Abfragen pro Verbindung sind erlaubt.
+#
+# Vor jeder Antwort prüft der Daemon die Datei: Bei JSONL werden nur die neu angehängten, vollständigen Zeilen
+# gelesen (STORAGE hängt nur an oder ersetzt die Datei atomar; neue Inode oder kürzere Datei -> neu laden).
+# Andere Formate werden neu geladen, wenn sich ihr Fingerprint (Größe/mtime) geändert hat.
+
+DAEMON_COMMANDS = ["total", "top3", "period", "common-reason", "list"]
+
+# ---- CLIENT (wird von der CLI geladen, daher nur Standardbibliothek) ----
+
+def ASK(SOCKET_PATH: str, DB_PATH: str, FORMAT: str, REQUEST: str, ON_ROW: Optional[Callable[[List[Any]], None]] = None, TIMEOUT: float = 30.0) -> Optional[Dict[str, Any]]:
+    """
+    Schickt REQUEST an den Daemon und gibt die abschließende Antwort zurück.
+    None, wenn kein Daemon erreichbar ist oder er eine andere Datenbank bedient (der Aufrufer rechnet dann selbst).
+    Zeilen von list werden an ON_ROW übergeben, sobald sie ankommen.
+    """
+    SOCK = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    SOCK.settimeout(TIMEOUT)
+    try:
+        try:
+            SOCK.connect(SOCKET_PATH)
+        except OSError:
+            return None     # Kein Daemon (Socket fehlt oder niemand hört zu)
+        with SOCK.makefile("rwb") as F:
+            HELLO = json.loads(F.readline() or b"null")
+            if not isinstance(HELLO, dict) or HELLO.get("db") != os.path.realpath(DB_PATH) or HELLO.get("format") != FORMAT:
+                return None
+            F.write(REQUEST.encode("utf-8") + b"\n")
+            F.flush()
+            # Ab hier keine stille Rückfallebene mehr: Zeilen von list könnten schon ausgegeben sein
+            for LINE in F:
+                MESSAGE = json.loads(LINE)
+                if isinstance(MESSAGE, list):
+                    if ON_ROW is not None:
+                        ON_ROW(MESSAGE)
+                    continue
+                if not MESSAGE.get("ok"):
+                    raise ValueError(MESSAGE.get("error") or "DAEMON ERROR")
+                return MESSAGE
+            raise ConnectionError("DAEMON CLOSED THE CONNECTION")
+    finally:
+        SOCK.close()
+
+# ---- SERVER ----
+
+class DATASET:
+    """
+    Stand der Datenbank im Speicher: alle Einträge (COMPACT_ENTRY) und die laufenden Summen.
+    Zugriffe nur unter LOCK (der Server beantwortet Verbindungen in eigenen Threads).
+    """
+
+    def __init__(SELF, STORE: STORAGE) -> None:
+        SELF.STORE = STORE
+        SELF.LOCK = threading.Lock()
+        SELF.ENTRIES: List[Any] = []
+        SELF.AGG: AGGREGATE_INDEX
+        SELF.RELOADS = 0    # Vollständige Ladevorgänge (für Tests/Diagnose)
+        SELF._FILE_ID: Optional[Tuple[int, int]] = None   # (st_dev, st_ino) der JSONL-Datei
+        SELF._OFFSET = 0    # JSONL: bis hierhin gelesen (immer am Ende einer vollständigen Zeile)
+        SELF._FINGERPRINT: Any = None
+        SELF.RELOAD()
+
+    def RELOAD(SELF) -> None:
+        from .aggregates import AGGREGATE_INDEX, FINGERPRINT
+        from .models import COMPACT_ENTRY
+
+        SELF.RELOADS += 1
+        SELF.ENTRIES = []
+        SELF.AGG = AGGREGATE_INDEX()
+        if SELF.STORE.FORMAT == "JSONL":
+            SELF._FILE_ID = None
+            SELF._OFFSET = 0
+            SELF._READ_TAIL()
+            return
+        SELF._FINGERPRINT = FINGERPRINT(SELF.STORE.BACKEND.FINGERPRINT_PATH if SELF.STORE.BACKEND is not None else SELF.STORE.PATH)
+        for E in SELF.STORE.ITER_ENTRIES():
+            SELF.AGG.ADD(E)
+            SELF.ENTRIES.append(COMPACT_ENTRY.FROM_ENTRY(E))
+
+    def _READ_TAIL(SELF) -> None:
+        """
+        Liest die vollständigen Zeilen ab _OFFSET; eine halb geschriebene letzte Zeile bleibt für den nächsten Aufruf liegen.
+        """
+        from .codec import DECODE_JSONL
+        from .models import COMPACT_ENTRY
+
+        try:
+            F = SELF.STORE.PATH.open("rb")
+        except FileNotFoundError:
+            return
+        with F:
+            ST = os.fstat(F.fileno())
+            SELF._FILE_ID = (ST.st_dev, ST.st_ino)
+            F.seek(SELF._OFFSET)
+            for LINE in F:
+                if not LINE.endswith(b"\n"):
+                    break
+                TEXT = LINE.strip()
+                if TEXT:
+                    E = DECODE_JSONL(TEXT)    # _OFFSET erst danach: eine fehlerhafte Zeile scheitert bei jeder Abfrage erneut
+                    SELF.AGG.ADD(E)
+                    SELF.ENTRIES.append(COMPACT_ENTRY.FROM_ENTRY(E))
+                SELF._OFFSET += len(LINE)
+
+    def REFRESH(SELF) -> None:
+        """
+        Bringt den Stand auf die aktuelle Datei: neue Zeilen anhängen oder, wenn die Datei ersetzt wurde, neu laden.
+        """
+        if SELF.STORE.FORMAT != "JSONL":
+            from .aggregates import FINGERPRINT
+
+            if FINGERPRINT(SELF.STORE.BACKEND.FINGERPRINT_PATH if SELF.STORE.BACKEND is not None else SELF.STORE.PATH) != SELF._FINGERPRINT:
+                SELF.RELOAD()
+            return
+        try:
+            ST = os.stat(SELF.STORE.PATH)
+        except FileNotFoundError:
+            if SELF._FILE_ID is not None:
+                SELF.RELOAD()
+            return
+        if (ST.st_dev, ST.st_ino) != SELF._FILE_ID or ST.st_size < SELF._OFFSET:
+            SELF.RELOAD()
+        elif ST.st_size > SELF._OFFSET:
+            SELF._READ_TAIL()
+
+    def ANSWER(SELF, REQUEST: str, SEND_ROW: Callable[[List[Any]], None]) -> Any:
+        """
+        Beantwortet eine Anfragezeile (siehe Protokoll oben) und gibt das Ergebnis zurück.
+        """
+        from .utils import PARSE_DATE
+
+        PARTS = REQUEST.split()
+        if not PARTS:
+            raise ValueError("EMPTY REQUEST")
+        COMMAND, ARGS = PARTS[0], PARTS[1:]
+        if COMMAND not in DAEMON_COMMANDS:
+            raise ValueError(f"UNKNOWN COMMAND: {COMMAND}")
+        if COMMAND == "period":
+            if len(ARGS) != 2:
+                raise ValueError("USAGE: period START END")
+            START = PARSE_DATE(ARGS[0])
+            END = PARSE_DATE(ARGS[1])
+            if END < START:
+                raise ValueError("END DATE MUST BE >= START DATE")
+        LIMIT = int(ARGS[0]) if COMMAND == "list" and ARGS else 0
+        with SELF.LOCK:
+            SELF.REFRESH()
+            if COMMAND == "total":
+                return SELF.AGG.TOTAL_WASTE()
+            if COMMAND == "top3":
+                return SELF.AGG.TOP_ITEMS(3)
+            if COMMAND == "period":
+                return SELF.AGG.WASTE_IN_PERIOD(START, END)
+            if COMMAND == "common-reason":
+                return SELF.AGG.MOST_COMMON_REASON()
+            # list: Liste und Länge festhalten; ENTRIES wird nur verlängert oder beim Neuladen ersetzt
+            ROWS = SELF.ENTRIES
+            COUNT = len(ROWS) if LIMIT <= 0 else min(LIMIT, len(ROWS))
+        # Zeilen außerhalb des Locks senden: ein langsamer Client hält die anderen nicht auf
+        for I in range(COUNT):
+            E = ROWS[I]
+            SEND_ROW([E.ID, E.DATE.isoformat(), E.ITEM, E.GRAMS, E.REASON])
+        return COUNT
+
+def SERVE(STORE: STORAGE, SOCKET_PATH: str, READY: Optional[Callable[[Any], None]] = None) -> None:
+    """
+    Startet den Daemon und blockiert bis Strg+C bzw. SERVER.shutdown().
+    READY(SERVER) wird aufgerufen, sobald der Socket Verbindungen annimmt (SERVER.DATA ist der DATASET, z.B. für Tests).
+    """
+    import socketserver
+
+    DATA = DATASET(STORE)
+    HELLO = (json.dumps({"db": os.path.realpath(STORE.PATH), "format": STORE.FORMAT}) + "\n").encode("utf-8")
+
+    class HANDLER(socketserver.StreamRequestHandler):
+        def handle(SELF) -> None:  # noqa: N802
+            def SEND(VALUE: Any) -> None:
+                SELF.wfile.write((json.dumps(VALUE, ensure_ascii=False) + "\n").encode("utf-8"))
+
+            SELF.wfile.write(HELLO)
+            for LINE in SELF.rfile:
+                try:
+                    RESULT = DATA.ANSWER(LINE.decode("utf-8"), SEND)
+                except (ValueError, KeyError) as E:
+                    SEND({"ok": False, "error": str(E)})
+                else:
+                    SEND({"ok": True, "result": RESULT})
+                SELF.wfile.flush()
+
+    # Verwaister Socket eines beendeten Daemons wird ersetzt, ein laufender nicht
+    if os.path.exists(SOCKET_PATH):
+        PROBE = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            PROBE.connect(SOCKET_PATH)
+        except OSError:
+            os.remove(SOCKET_PATH)
+        else:
+            raise ValueError(f"A DAEMON IS ALREADY LISTENING ON {SOCKET_PATH}")
+        finally:
+            PROBE.close()
+    class SERVER_CLASS(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True   # Offene Client-Verbindungen halten das Beenden nicht auf
+
+    with SERVER_CLASS(SOCKET_PATH, HANDLER) as SERVER:
+        os.chmod(SOCKET_PATH, 0o600)    # Nur der eigene Benutzer darf fragen
+        SERVER.DATA = DATA  # type: ignore[attr-defined]
+        try:
+            if READY is not None:
+                READY(SERVER)
+            SERVER.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(SOCKET_PATH)
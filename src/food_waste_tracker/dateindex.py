@@ -0,0 +1,164 @@
+from __future__ import annotations
+import json
+import os
+import zlib
+from bisect import bisect_left
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+from .models import ENTRY
+from .codec import DECODE_JSONL
+
+# Dünner Datumsindex für JSONL-Dateien: "<DATENDATEI>.dateidx.json" speichert für jeden Block
+# von EVERY Zeilen den Byte-Offset sowie das kleinste und größte Datum (als Ordinalzahl).
+#
+# - Sind die Blöcke nach Datum geordnet (SORTED), springt eine Zeitraum-Abfrage per Binärsuche
+#   direkt zum ersten Kandidatenblock und hört auf, sobald die Daten hinter END liegen.
+# - Sonst werden nur Blöcke gelesen, deren [MIN, MAX] den Zeitraum überlappt (Zone Map).
+# - Zeilen hinter INDEXED_TO (der noch nicht volle letzte Block) werden immer vollständig geprüft.
+# Der Index wächst inkrementell ab INDEXED_TO; ist die Datei kürzer geworden oder hat sich die
+# Prüfsumme vor INDEXED_TO geändert, wird er komplett neu aufgebaut.
+
+CHECK_BYTES = 64    # Anzahl Bytes vor INDEXED_TO, deren CRC32 das Umschreiben der Datei erkennt
+
+class DATE_INDEX:
+    def __init__(SELF, DATA_PATH: Path, EVERY: int = 256) -> None:
+        if EVERY < 1:
+            raise ValueError("EVERY MUST BE >= 1")
+        SELF.DATA_PATH = DATA_PATH
+        SELF.PATH = DATA_PATH.with_name(DATA_PATH.name + ".dateidx.json")
+        SELF.EVERY = EVERY
+        SELF.BLOCKS: List[List[int]] = []     # [OFFSET, MIN_ORD, MAX_ORD]
+        SELF.INDEXED_TO = 0
+        SELF.SORTED = True
+        SELF.CHECK = 0
+
+    # ---- PERSISTENZ ----
+
+    def _LOAD(SELF) -> None:
+        try:
+            with SELF.PATH.open("r", encoding="utf-8") as F:
+                DATA: Dict[str, Any] = json.load(F)
+            if int(DATA["EVERY"]) != SELF.EVERY:
+                raise ValueError("EVERY CHANGED")
+            SELF.BLOCKS = [[int(X) for X in B] for B in DATA["BLOCKS"]]
+            SELF.INDEXED_TO = int(DATA["INDEXED_TO"])
+            SELF.SORTED = bool(DATA["SORTED"])
+            SELF.CHECK = int(DATA["CHECK"])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            SELF._RESET()
+
+    def _SAVE(SELF) -> None:
+        DATA = {
+            "EVERY": SELF.EVERY,
+            "BLOCKS": SELF.BLOCKS,
+            "INDEXED_TO": SELF.INDEXED_TO,
+            "SORTED": SELF.SORTED,
+            "CHECK": SELF.CHECK,
+        }
+        TMP_PATH = SELF.PATH.with_name(SELF.PATH.name + ".tmp")
+        with TMP_PATH.open("w", encoding="utf-8") as F:
+            json.dump(DATA, F)
+        os.replace(TMP_PATH, SELF.PATH)
+
+    def _RESET(SELF) -> None:
+        SELF.BLOCKS = []
+        SELF.INDEXED_TO = 0
+        SELF.SORTED = True
+        SELF.CHECK = 0
+
+    def INVALIDATE(SELF) -> None:
+        """
+        Entfernt den Index (z.B. nach SAVE_ALL); er wird beim nächsten Zugriff neu aufgebaut.
+        """
+        SELF._RESET()
+        try:
+            SELF.PATH.unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _CHECKSUM(F: Any, END: int) -> int:
+        START = max(0, END - CHECK_BYTES)
+        F.seek(START)
+        return zlib.crc32(F.read(END - START))
+
+    # ---- AUFBAU ----
+
+    def UPDATE(SELF) -> None:
+        """
+        Bringt den Index auf den Stand der Datei; liest nur die Bytes ab INDEXED_TO.
+        """
+        SELF._LOAD()
+        try:
+            SIZE = SELF.DATA_PATH.stat().st_size
+        except FileNotFoundError:
+            SELF._RESET()
+            return
+        with SELF.DATA_PATH.open("rb") as F:
+            if SELF.INDEXED_TO > SIZE or SELF._CHECKSUM(F, SELF.INDEXED_TO) != SELF.CHECK:
+                SELF._RESET()   # Datei wurde gekürzt oder umgeschrieben
+            if SIZE - SELF.INDEXED_TO == 0:
+                return
+            F.seek(SELF.INDEXED_TO)
+            OFFSET = SELF.INDEXED_TO
+            BLOCK_START = OFFSET
+            LINES = 0
+            LOW: Optional[int] = None
+            HIGH: Optional[int] = None
+            CHANGED = False
+            for LINE in F:
+                if not LINE.endswith(b"\n"):
+                    break   # Unvollständige letzte Zeile (Schreibvorgang läuft noch)
+                OFFSET += len(LINE)
+                LINES += 1
+                if LINE.strip():
+                    ORD = date.fromisoformat(json.loads(LINE)["DATE"][:10]).toordinal()
+                    LOW = ORD if LOW is None or ORD < LOW else LOW
+                    HIGH = ORD if HIGH is None or ORD > HIGH else HIGH
+                if LINES == SELF.EVERY:
+                    if LOW is not None and HIGH is not None:
+                        if SELF.BLOCKS and LOW < SELF.BLOCKS[-1][2]:
+                            SELF.SORTED = False
+                        SELF.BLOCKS.append([BLOCK_START, LOW, HIGH])
+                    SELF.INDEXED_TO = OFFSET
+                    BLOCK_START = OFFSET
+                    LINES = 0
+                    LOW = HIGH = None
+                    CHANGED = True
+            if CHANGED:
+                SELF.CHECK = SELF._CHECKSUM(F, SELF.INDEXED_TO)
+                SELF._SAVE()
+
+    # ---- ZEITRAUM-ABFRAGE ----
+
+    def ITER_RANGE(SELF, START: date, END: date) -> Iterator[ENTRY]:
+        """
+        Liefert alle Einträge mit START <= DATE <= END und liest dabei nur Kandidatenblöcke und den Rest hinter INDEXED_TO.
+        """
+        SELF.UPDATE()
+        S_ORD = START.toordinal()
+        E_ORD = END.toordinal()
+        BOUNDS = [B[0] for B in SELF.BLOCKS[1:]] + [SELF.INDEXED_TO]   # Ende jedes Blocks
+        if SELF.SORTED:
+            # Erster Block, dessen MAX >= START ist (MAX-Werte sind bei sortierten Blöcken aufsteigend)
+            FIRST = bisect_left([B[2] for B in SELF.BLOCKS], S_ORD)
+            CANDIDATES = []
+            for I in range(FIRST, len(SELF.BLOCKS)):
+                if SELF.BLOCKS[I][1] > E_ORD:
+                    break   # Alle weiteren Blöcke liegen hinter END
+                CANDIDATES.append(I)
+        else:
+            CANDIDATES = [I for I, B in enumerate(SELF.BLOCKS) if B[1] <= E_ORD and B[2] >= S_ORD]
+        with SELF.DATA_PATH.open("rb") as F:
+            RANGES = [(SELF.BLOCKS[I][0], BOUNDS[I]) for I in CANDIDATES]
+            RANGES.append((SELF.INDEXED_TO, None))
+            for BEGIN, STOP in RANGES:
+                F.seek(BEGIN)
+                DATA = F.read() if STOP is None else F.read(STOP - BEGIN)
+                for LINE in DATA.splitlines():
+                    if not LINE.strip():
+                        continue
+                    E = DECODE_JSONL(LINE)
+                    if START <= E.DATE <= END:
+                        yield E
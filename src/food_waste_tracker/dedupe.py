@@ -0,0 +1,345 @@
+from __future__ import annotations
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from uuid import UUID
+from .aggregates import FINGERPRINT
+
+# Duplikaterkennung für wiederholte Importe.
+#
+# ID-Index neben der Datendatei:
+#   <DB>.ids        alle IDs der Datendatei, eine JSON-Zeichenkette pro Zeile (nur anhängen)
+#   <DB>.ids.bloom  Bloom-Filter über die IDs (Bitfeld)
+#   <DB>.ids.json   Metadaten: FINGERPRINT der Datendatei, Bloom-Parameter, BLOOM_TO (bis zu diesem Byte
+#                   von <DB>.ids sind die IDs im Bloom-Filter enthalten)
+#   <DB>.ids.sqlite Nachschlage-Tabelle über <DB>.ids (ID als Primärschlüssel, SYNCED_TO = bis zu diesem Byte
+#                   übernommen); nur ein Cache der ID-Liste, wird bei REBUILD verworfen
+#
+# Eine Abfrage prüft zuerst den Bloom-Filter im Speicher; nur bei einem Treffer (echtes Duplikat oder
+# seltener Fehlalarm) wird die ID in <DB>.ids.sqlite per Index gesucht. Vorher übernimmt die Tabelle die seit dem
+# letzten Abgleich angehängten Zeilen von <DB>.ids; Schreibvorgänge hängen also weiter nur an eine Textdatei an.
+# Neue Zeilen kosten keinen Plattenzugriff, Treffer eine Index-Suche; die ID-Liste wird nie ganz geladen.
+# STORAGE.APPEND_MANY hängt die IDs geschriebener Einträge an <DB>.ids an; passt der Fingerprint nicht
+# (Datei anders verändert), wird der Index beim nächsten OPEN mit einem Durchlauf neu aufgebaut.
+
+_SYNC_ROWS = 100_000     # Höchstens so viele IDs pro Abgleich-Transaktion im Speicher
+_RECENT_MAX = 250_000    # Höchstens so viele eigene, noch nicht abgeglichene IDs im Speicher (ID_INDEX._RECENT)
+
+# Fester Namensraum für inhaltsbasierte IDs: gleiche Zeile -> gleiche ID bei jedem Import
+CONTENT_NAMESPACE = UUID("6f1c1e0a-3b8e-5d8c-9a53-2f1f4b9a7c01")
+
+def CONTENT_ID(DATE: date, ITEM: str, GRAMS: int, REASON: str, OCCURRENCE: int = 0) -> str:
+    """
+    Gibt eine deterministische ID (UUID5) aus DATE, ITEM, GRAMS und REASON zurück (für Zeilen ohne ID-Spalte).
+    OCCURRENCE > 0: ID der weiteren gleichen Zeilen derselben Datei (die erste behält die ID ohne Zähler).
+    Gleiches Ergebnis wie str(uuid5(CONTENT_NAMESPACE, NAME)), aber ohne UUID-Objekt (läuft für jede Importzeile).
+    """
+    NAME = "\x1f".join((DATE.isoformat(), ITEM, str(GRAMS), REASON) + ((str(OCCURRENCE),) if OCCURRENCE else ()))
+    H = bytearray(hashlib.sha1(CONTENT_NAMESPACE.bytes + NAME.encode("utf-8")).digest()[:16])
+    H[6] = (H[6] & 0x0F) | 0x50     # Version 5
+    H[8] = (H[8] & 0x3F) | 0x80     # Variante RFC 4122
+    X = H.hex()
+    return f"{X[:8]}-{X[8:12]}-{X[12:16]}-{X[16:20]}-{X[20:]}"
+
+def _DECODE_ID(LINE: bytes) -> str:
+    """
+    Eine Zeile von <DB>.ids; ohne Backslash (z.B. UUIDs) genügt es, die Anführungszeichen abzuschneiden.
+    """
+    return LINE.strip()[1:-1].decode("utf-8") if b"\\" not in LINE else json.loads(LINE)
+
+class BLOOM_FILTER:
+    """
+    Bloom-Filter mit BITS Bits und HASHES Hashfunktionen (Double Hashing über einen BLAKE2b-Hash).
+    """
+
+    def __init__(SELF, BITS: int, HASHES: int, DATA: Optional[bytearray] = None) -> None:
+        SELF.BITS = max(8, BITS)
+        SELF.HASHES = max(1, HASHES)
+        SELF.DATA = DATA if DATA is not None else bytearray((SELF.BITS + 7) // 8)
+
+    @staticmethod
+    def FOR_CAPACITY(N: int, FP_RATE: float = 0.01) -> "BLOOM_FILTER":
+        """
+        Dimensioniert den Filter für N Schlüssel bei einer Fehlalarmrate von FP_RATE.
+        """
+        N = max(N, 1024)
+        BITS = int(math.ceil(-N * math.log(FP_RATE) / math.log(2) ** 2))
+        HASHES = max(1, round(BITS / N * math.log(2)))
+        return BLOOM_FILTER(BITS, HASHES)
+
+    def CAPACITY(SELF, FP_RATE: float = 0.01) -> int:
+        return int(SELF.BITS * math.log(2) ** 2 / -math.log(FP_RATE))
+
+    def _POSITIONS(SELF, KEY: str) -> List[int]:
+        # Ein Hash, HASHES Positionen: H1 + I * H2 (Kirsch/Mitzenmacher)
+        H = int.from_bytes(hashlib.blake2b(KEY.encode("utf-8"), digest_size=16).digest(), "little")
+        H1 = H & 0xFFFFFFFFFFFFFFFF
+        H2 = (H >> 64) | 1
+        BITS = SELF.BITS
+        return [(H1 + I * H2) % BITS for I in range(SELF.HASHES)]
+
+    def ADD(SELF, KEY: str) -> None:
+        DATA = SELF.DATA
+        for P in SELF._POSITIONS(KEY):
+            DATA[P >> 3] |= 1 << (P & 7)
+
+    def __contains__(SELF, KEY: str) -> bool:
+        DATA = SELF.DATA
+        for P in SELF._POSITIONS(KEY):
+            if not DATA[P >> 3] & (1 << (P & 7)):
+                return False
+        return True
+
+class ID_INDEX:
+    def __init__(SELF, DATA_PATH: Path, FINGERPRINT_PATH: Optional[Path] = None) -> None:
+        # FINGERPRINT_PATH wie bei AGGREGATE_SIDECAR: Datei (oder Verzeichnis), deren Größe/mtime jeden Schreibvorgang anzeigt
+        SELF.DATA_PATH = FINGERPRINT_PATH or DATA_PATH
+        SELF.PATH = DATA_PATH.with_name(DATA_PATH.name + ".ids")
+        SELF.BLOOM_PATH = DATA_PATH.with_name(DATA_PATH.name + ".ids.bloom")
+        SELF.META_PATH = DATA_PATH.with_name(DATA_PATH.name + ".ids.json")
+        SELF.LOOKUP_PATH = DATA_PATH.with_name(DATA_PATH.name + ".ids.sqlite")
+        SELF.BLOOM: Optional[BLOOM_FILTER] = None
+        SELF.COUNT = 0
+        SELF.DISK_READS = 0     # Suchen in <DB>.ids.sqlite nach einem Bloom-Treffer (für Tests/Diagnose)
+        SELF._CONN: Optional[sqlite3.Connection] = None   # Erst beim ersten Bloom-Treffer geöffnet
+        SELF._SYNCED_TO = 0
+        # Eigene, noch nicht abgeglichene IDs und ihr Bytebereich [ANFANG, ENDE) in <DB>.ids
+        SELF._RECENT: Set[str] = set()
+        SELF._RECENT_SPAN: Optional[Tuple[int, int]] = None
+        # GROUP_WRITER hängt IDs aus seinem Thread an, der Import fragt aus dem Hauptthread
+        SELF._LOCK = threading.Lock()
+
+    def EXISTS(SELF) -> bool:
+        return SELF.META_PATH.exists()
+
+    def _READ_META(SELF) -> Optional[Dict[str, Any]]:
+        try:
+            with SELF.META_PATH.open("r", encoding="utf-8") as F:
+                return json.load(F)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _WRITE_META(SELF, DATA: Dict[str, Any]) -> None:
+        TMP_PATH = SELF.META_PATH.with_name(SELF.META_PATH.name + ".tmp")
+        with TMP_PATH.open("w", encoding="utf-8") as F:
+            json.dump(DATA, F)
+        os.replace(TMP_PATH, SELF.META_PATH)
+
+    def IS_FRESH(SELF) -> bool:
+        META = SELF._READ_META()
+        return META is not None and META.get("FINGERPRINT") == FINGERPRINT(SELF.DATA_PATH)
+
+    # ---- AUFBAU ----
+
+    def OPEN(SELF, ENTRIES: Any) -> None:
+        """
+        Lädt den Bloom-Filter. ENTRIES ist eine Funktion, die alle Einträge der Datendatei liefert
+        (z.B. STORAGE.ITER_ENTRIES); sie wird nur aufgerufen, wenn der Index fehlt oder veraltet ist.
+        """
+        META = SELF._READ_META()
+        if META is None or META.get("FINGERPRINT") != FINGERPRINT(SELF.DATA_PATH):
+            SELF.REBUILD(E.ID for E in ENTRIES())
+            return
+        try:
+            SELF.COUNT = int(META["COUNT"])
+            with SELF.BLOOM_PATH.open("rb") as F:
+                SELF.BLOOM = BLOOM_FILTER(int(META["BITS"]), int(META["HASHES"]), bytearray(F.read()))
+            # IDs, die nach dem letzten Speichern des Filters angehängt wurden, nachtragen
+            with SELF.PATH.open("rb") as F:
+                F.seek(int(META["BLOOM_TO"]))
+                for LINE in F:
+                    SELF.BLOOM.ADD(_DECODE_ID(LINE))
+        except (FileNotFoundError, KeyError, TypeError, ValueError):
+            SELF.REBUILD(E.ID for E in ENTRIES())
+            return
+        if SELF.COUNT > SELF.BLOOM.CAPACITY():
+            SELF._FILL_BLOOM()  # Filter zu voll: Fehlalarmrate steigt, größer neu aufbauen
+            SELF.SAVE()
+
+    def REBUILD(SELF, IDS: Iterable[str]) -> None:
+        """
+        Schreibt die ID-Liste neu und baut den Bloom-Filter passend zur Anzahl auf.
+        """
+        SELF._DROP_LOOKUP()    # Vor dem Austausch: die Tabelle darf nie eine fremde ID-Liste beschreiben
+        TMP_PATH = SELF.PATH.with_name(SELF.PATH.name + ".tmp")
+        COUNT = 0
+        with TMP_PATH.open("w", encoding="utf-8") as F:
+            for ID in IDS:
+                F.write(json.dumps(ID, ensure_ascii=False) + "\n")
+                COUNT += 1
+        os.replace(TMP_PATH, SELF.PATH)
+        SELF.COUNT = COUNT
+        SELF._FILL_BLOOM()
+        SELF.SAVE()
+
+    def _FILL_BLOOM(SELF) -> None:
+        """
+        Baut den Bloom-Filter aus <DB>.ids neu auf, mit Reserve für die doppelte Anzahl (künftige Importe).
+        Der neue Filter ersetzt den alten erst, wenn er vollständig ist (Abfragen aus einem anderen Thread).
+        """
+        BLOOM = BLOOM_FILTER.FOR_CAPACITY(2 * SELF.COUNT)
+        for ID in SELF._READ_IDS():
+            BLOOM.ADD(ID)
+        SELF.BLOOM = BLOOM
+
+    def SAVE(SELF) -> None:
+        """
+        Speichert Bloom-Filter und Metadaten zum aktuellen Stand der Datendatei.
+        """
+        if SELF.BLOOM is None:
+            return
+        TMP_PATH = SELF.BLOOM_PATH.with_name(SELF.BLOOM_PATH.name + ".tmp")
+        with TMP_PATH.open("wb") as F:
+            F.write(SELF.BLOOM.DATA)
+        os.replace(TMP_PATH, SELF.BLOOM_PATH)
+        SELF._WRITE_META({
+            "FINGERPRINT": FINGERPRINT(SELF.DATA_PATH),
+            "COUNT": SELF.COUNT,
+            "BITS": SELF.BLOOM.BITS,
+            "HASHES": SELF.BLOOM.HASHES,
+            "BLOOM_TO": SELF.PATH.stat().st_size,
+        })
+
+    # ---- ABFRAGEN ----
+
+    def _READ_IDS(SELF) -> Iterator[str]:
+        with SELF.PATH.open("rb") as F:
+            for LINE in F:
+                yield _DECODE_ID(LINE)
+
+    def _OPEN_LOOKUP(SELF) -> sqlite3.Connection:
+        """
+        Öffnet <DB>.ids.sqlite (legt die Tabellen bei Bedarf an) und liest SYNCED_TO.
+        WAL mit synchronous=NORMAL: nach einem Absturz fehlen höchstens die letzten Abgleiche, SYNCED_TO passt dazu.
+        """
+        if SELF._CONN is None:
+            CONN = sqlite3.connect(str(SELF.LOOKUP_PATH), isolation_level=None, check_same_thread=False)
+            try:
+                CONN.execute("PRAGMA journal_mode=WAL")
+                CONN.execute("PRAGMA synchronous=NORMAL")
+                CONN.execute("CREATE TABLE IF NOT EXISTS IDS (ID TEXT PRIMARY KEY) WITHOUT ROWID")
+                CONN.execute("CREATE TABLE IF NOT EXISTS STATE (SYNCED_TO INTEGER NOT NULL)")
+                ROW = CONN.execute("SELECT SYNCED_TO FROM STATE").fetchone()
+                if ROW is None:
+                    CONN.execute("INSERT INTO STATE VALUES (0)")
+            except BaseException:
+                CONN.close()
+                raise
+            SELF._CONN = CONN
+            SELF._SYNCED_TO = ROW[0] if ROW is not None else 0
+        return SELF._CONN
+
+    def _SYNC(SELF, LIMIT: int) -> None:
+        """
+        Übernimmt die vollständigen Zeilen von <DB>.ids ab SYNCED_TO bis zum Byte LIMIT in die Tabelle.
+        """
+        CONN = SELF._OPEN_LOOKUP()
+        if SELF._SYNCED_TO >= LIMIT:
+            return
+        with SELF.PATH.open("rb") as F:
+            F.seek(SELF._SYNCED_TO)
+            while SELF._SYNCED_TO < LIMIT:
+                ROWS = []
+                SYNCED_TO = SELF._SYNCED_TO
+                for LINE in F:
+                    if not LINE.endswith(b"\n"):
+                        break   # Wird gerade geschrieben: beim nächsten Abgleich
+                    ROWS.append((_DECODE_ID(LINE),))
+                    SYNCED_TO += len(LINE)
+                    if len(ROWS) >= _SYNC_ROWS or SYNCED_TO >= LIMIT:
+                        break
+                if not ROWS:
+                    break
+                ROWS.sort()     # Sortiert einfügen: weniger zufällige Zugriffe auf den B-Baum
+                CONN.execute("BEGIN")
+                CONN.executemany("INSERT OR IGNORE INTO IDS VALUES (?)", ROWS)
+                CONN.execute("UPDATE STATE SET SYNCED_TO = ?", (SYNCED_TO,))
+                CONN.execute("COMMIT")
+                SELF._SYNCED_TO = SYNCED_TO
+
+    def _DROP_LOOKUP(SELF) -> None:
+        """
+        Verwirft <DB>.ids.sqlite; die Tabelle wird beim nächsten Nachschlagen aus <DB>.ids neu aufgebaut.
+        """
+        with SELF._LOCK:
+            if SELF._CONN is not None:
+                SELF._CONN.close()
+                SELF._CONN = None
+            SELF._SYNCED_TO = 0
+            SELF._RECENT.clear()
+            SELF._RECENT_SPAN = None
+            for SUFFIX in ("", "-wal", "-shm"):
+                Path(str(SELF.LOOKUP_PATH) + SUFFIX).unlink(missing_ok=True)
+
+    def _FIND(SELF, ID: str) -> bool:
+        if ID in SELF._RECENT:
+            return True
+        SIZE = SELF.PATH.stat().st_size
+        SPAN = SELF._RECENT_SPAN
+        if SPAN is not None and SPAN[1] == SIZE:
+            SELF._SYNC(SPAN[0])     # Dahinter stehen nur eigene IDs (in _RECENT)
+        else:
+            SELF._SYNC(SIZE)
+            SELF._RECENT.clear()
+            SELF._RECENT_SPAN = None
+        return SELF._OPEN_LOOKUP().execute("SELECT 1 FROM IDS WHERE ID = ?", (ID,)).fetchone() is not None
+
+    def __contains__(SELF, ID: str) -> bool:
+        if SELF.BLOOM is not None and ID not in SELF.BLOOM:
+            return False    # Sicher neu: kein Plattenzugriff
+        SELF.DISK_READS += 1
+        with SELF._LOCK:
+            try:
+                return SELF._FIND(ID)
+            except sqlite3.DatabaseError:
+                pass
+        SELF._DROP_LOOKUP()     # Beschädigte Tabelle: aus <DB>.ids neu aufbauen
+        with SELF._LOCK:
+            return SELF._FIND(ID)
+
+    # ---- FORTSCHREIBEN (STORAGE.APPEND_MANY) ----
+
+    def APPEND(SELF, IDS: Iterable[str]) -> None:
+        """
+        Hängt IDs neu geschriebener Einträge an; der Bloom-Filter im Speicher wird mitgeführt (falls geladen).
+        Die IDs merkt sich der Index außerdem bis zum nächsten Abgleich im Speicher (_RECENT): ein Bloom-Treffer
+        während eines großen Imports muss sie dann nicht erst in <DB>.ids.sqlite übernehmen.
+        """
+        NEW = list(IDS)
+        LINES = [json.dumps(ID, ensure_ascii=False) + "\n" for ID in NEW]
+        if SELF.BLOOM is not None:
+            for ID in NEW:
+                SELF.BLOOM.ADD(ID)
+        with SELF._LOCK:
+            BEFORE = SELF.PATH.stat().st_size if SELF.PATH.exists() else 0
+            with SELF.PATH.open("a", encoding="utf-8") as F:
+                F.writelines(LINES)
+            AFTER = SELF.PATH.stat().st_size
+            SPAN = SELF._RECENT_SPAN
+            if SPAN is None or SPAN[1] != BEFORE or len(SELF._RECENT) + len(NEW) > _RECENT_MAX:
+                # Fremde Zeilen dazwischen oder genug gemerkt: ältere eigene IDs kommen mit dem nächsten Abgleich
+                SELF._RECENT.clear()
+                SPAN = (BEFORE, BEFORE)
+            SELF._RECENT.update(NEW)
+            SELF._RECENT_SPAN = (SPAN[0], AFTER)
+        SELF.COUNT += len(LINES)
+        if SELF.BLOOM is not None and SELF.COUNT > SELF.BLOOM.CAPACITY():
+            SELF._FILL_BLOOM()  # Großer Import: Filter mitwachsen lassen (verdoppelt, also selten), sonst trifft fast jede Abfrage
+
+    def MARK_FRESH(SELF, ADDED: int) -> None:
+        """
+        Übernimmt nach ADDED angehängten IDs den aktuellen Fingerprint der Datendatei, ohne den Bloom-Filter
+        neu zu schreiben; BLOOM_TO bleibt stehen, OPEN trägt die neuen IDs aus <DB>.ids nach.
+        """
+        META = SELF._READ_META()
+        if META is None:
+            return
+        META["FINGERPRINT"] = FINGERPRINT(SELF.DATA_PATH)
+        META["COUNT"] = int(META.get("COUNT", 0)) + ADDED
+        SELF._WRITE_META(META)
@@ -1,11 +1,396 @@
 from __future__ import annotations
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+from contextlib import nullcontext
+from datetime import date
+from itertools import chain, islice
 from pathlib import Path
 import csv
+import io
+import queue
+import threading
 
 from .models import ENTRY
+from .codec import FIELDNAMES, BUILD_ENTRY
+from .dedupe import CONTENT_ID
 from .storage import STORAGE
-from .utils import PARSE_INT_NONNEGATIVE
+from .utils import DATE_PARSER, PARSE_INT_NONNEGATIVE
+from .writer import GROUP_WRITER
+
+# Dialekt-Attribute, die an Worker-Prozesse übergeben werden (die Sniffer-Klasse selbst ist nicht picklebar)
+_DIALECT_ATTRS = ["delimiter", "quotechar", "escapechar", "doublequote", "skipinitialspace", "quoting", "lineterminator"]
+
+# Verhalten bei bereits vorhandenen IDs (siehe dedupe.py)
+ON_DUPLICATE_CHOICES = ["skip", "replace", "error"]
+
+# Ein Block in Dateireihenfolge: (gültige Einträge, Fehler als (Zeile, Meldung, Rohwerte), Header der Datei)
+BLOCK = Tuple[List[ENTRY], List[Tuple[int, str, List[Any]]], List[str]]
+
+# Fehler, die beim Verzeichnisimport nur die betroffene Datei überspringen (Header fehlt, Kodierung, defekte CSV)
+_FILE_ERRORS = (OSError, ValueError, csv.Error)
+
+def _PARSE_ROW(row: Dict[str, Any], col: Dict[str, str], parse_date: DATE_PARSER, content_id: bool = False) -> ENTRY:
+    """
+    Prüft eine CSV-Zeile und baut daraus ein ENTRY; wirft bei ungültigen Werten eine Exception.
+    content_id=True: Zeilen ohne ID erhalten eine inhaltsbasierte ID (gleiche Zeile -> gleiche ID bei jedem Import).
+    """
+    date_str = str(row[col["DATE"]])
+    item = str(row[col["ITEM"]]).strip()
+    grams_str = str(row[col["GRAMS"]])
+    reason = str(row[col["REASON"]]).strip()
+    id_value = None
+    if "ID" in col and row.get(col["ID"]):
+        id_value = str(row[col["ID"]]).strip() or None
+
+    grams = PARSE_INT_NONNEGATIVE(grams_str)
+    if not id_value and not content_id:
+        # ENTRY erzeugen (parst Datum intern; normalisiert Strings, vergibt eine UUID4)
+        return ENTRY.CREATE(ITEM=item, GRAMS=grams, REASON=reason, DATE_STR=date_str, DATE_PARSER=parse_date)
+    # Mit ID: gleiche Prüfungen wie ENTRY.CREATE (GRAMS geprüft, Strings gestrippt), aber ohne die verworfene UUID4
+    date_obj = parse_date(date_str)
+    if not id_value:
+        id_value = CONTENT_ID(date_obj, item, grams, reason)
+    return BUILD_ENTRY(id_value, date_obj, item, grams, reason)
+
+def _PARSE_CHUNK(
+    csv_path: str,
+    begin: int,
+    end: int,
+    encoding: str,
+    dialect: Dict[str, Any],
+    header: List[str],
+    col: Dict[str, str],
+    content_id: bool = False,
+) -> Optional[Tuple[List[Tuple[Any, ...]], List[Tuple[int, str, List[Any]]], int]]:
+    """
+    Worker: parst die Bytes [begin, end) (beginnen und enden an Zeilengrenzen) der CSV-Datei.
+    Rückgabe: gültige Einträge als (ID, DATE-Ordinalzahl, ITEM, GRAMS, REASON),
+    Fehler als (Zeile relativ zum Chunk, Meldung, Rohwerte der Zeile), Anzahl Zeilenumbrüche im Chunk.
+    Tupel statt ENTRY-Objekten halten das Pickeln zwischen den Prozessen billig.
+    None, wenn der Chunk womöglich Felder mit Zeilenumbruch enthält (siehe _SPLIT_SAFE); er wird dann nicht geparst.
+    """
+    with open(csv_path, "rb") as f:
+        f.seek(begin)
+        data = f.read(end - begin)
+    if not _SPLIT_SAFE(data, dialect):
+        return None
+    reader = csv.DictReader(io.StringIO(data.decode(encoding), newline=""), fieldnames=header, **dialect)
+    parse_date = DATE_PARSER()
+    entries: List[Tuple[Any, ...]] = []
+    errors: List[Tuple[int, str, List[Any]]] = []
+    for row in reader:
+        try:
+            e = _PARSE_ROW(row, col, parse_date, content_id)
+            entries.append((e.ID, e.DATE.toordinal(), e.ITEM, e.GRAMS, e.REASON))
+        except Exception as e:
+            errors.append((reader.line_num, str(e), _RAW_VALUES(row, header)))
+    return entries, errors, data.count(b"\n")
+
+def _SPLIT_SAFE(data: bytes, dialect: Dict[str, Any]) -> bool:
+    """
+    True, wenn kein Feld in data einen Zeilenumbruch enthalten kann, Zeilen also unabhängig geparst werden dürfen.
+    Die erste Zeile eines Datensatzes mit mehrzeiligem Feld enthält eine ungerade Zahl von Anführungszeichen
+    (verdoppelte Anführungszeichen zählen zwei). Vorsichtig: auch ein einzelnes Anführungszeichen in einem
+    unquotierten Feld oder ein vorhandenes Escape-Zeichen gilt als unsicher.
+    """
+    escapechar = dialect.get("escapechar")
+    if escapechar and escapechar.encode("latin-1") in data:
+        return False
+    quotechar = dialect.get("quotechar")
+    if not quotechar or dialect.get("quoting") == csv.QUOTE_NONE:
+        return True
+    quote = quotechar.encode("latin-1")
+    if quote not in data:
+        return True
+    return not any(line.count(quote) % 2 for line in data.split(b"\n"))
+
+def _RAW_VALUES(row: Dict[Any, Any], header: List[str]) -> List[Any]:
+    """
+    Rohwerte einer DictReader-Zeile in Header-Reihenfolge, überzählige Felder (Schlüssel None) angehängt.
+    """
+    return [row.get(h) for h in header] + (row.get(None) or [])
+
+def _CHUNK_BOUNDS(path: Path, start: int, chunk_bytes: int) -> List[Tuple[int, int]]:
+    """
+    Teilt die Datei ab Byte start in Bereiche von etwa chunk_bytes, jeweils an einem Zeilenumbruch ausgerichtet.
+    """
+    size = path.stat().st_size
+    bounds: List[Tuple[int, int]] = []
+    with path.open("rb") as f:
+        begin = start
+        while begin < size:
+            f.seek(min(begin + chunk_bytes, size))
+            f.readline()    # bis zum Ende der angefangenen Zeile weiterlesen
+            end = min(f.tell(), size)
+            bounds.append((begin, end))
+            begin = end
+    return bounds
+
+def _OPEN_CSV(f: Any, DELIMITER: Optional[str], MAPPING: Optional[Dict[str, str]]) -> Tuple[Any, csv.DictReader, List[str], Dict[str, str]]:
+    """
+    Erkennt den Dialekt (ohne DELIMITER per Sniffer), liest den Header und ordnet die Spalten zu.
+    Rückgabe: (Dialekt, DictReader, Header, Spalten-Mapping).
+    """
+    sample = f.read(4096)
+    f.seek(0)
+
+    if DELIMITER is None:
+        try:
+            dialect = csv.Sniffer().sniff(sample)
+        except csv.Error:
+            dialect = csv.excel
+    else:
+        dialect = csv.excel
+        dialect.delimiter = DELIMITER  # type: ignore[attr-defined]
+
+    reader = csv.DictReader(f, dialect=dialect)
+
+    # Header-Mapping vorbereiten
+    def up(s: str) -> str: return s.strip().upper()
+    header = [h for h in (reader.fieldnames or [])]
+    header_up = {up(h): h for h in header}
+
+    if MAPPING:
+        col = {k.upper(): v for k, v in MAPPING.items()}
+    else:
+        required = ["DATE", "ITEM", "GRAMS", "REASON"]
+        missing = [r for r in required if r not in header_up]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}. Found: {header}")
+        col = {k: header_up[k] for k in required}
+        if "ID" in header_up:
+            col["ID"] = header_up["ID"]
+    return dialect, reader, header, col
+
+def _SERIAL_BLOCKS(
+    reader: csv.DictReader, header: List[str], col: Dict[str, str], content_id: bool, block_rows: int, line_offset: int = 0
+) -> Iterator[BLOCK]:
+    """
+    Parst die Zeilen des Readers und liefert sie in Blöcken zu höchstens block_rows Zeilen.
+    line_offset: Zeilen der Datei vor der Leseposition (wenn der Reader mitten in der Datei beginnt).
+    """
+    # Eigener Datumsparser für die DATE-Spalte: merkt sich das Format der ersten Zeilen
+    parse_date = DATE_PARSER()
+    entries: List[ENTRY] = []
+    errors: List[Tuple[int, str, List[Any]]] = []
+    for row in reader:
+        try:
+            entries.append(_PARSE_ROW(row, col, parse_date, content_id))
+        except Exception as e:
+            errors.append((line_offset + reader.line_num, str(e), _RAW_VALUES(row, header)))  # line_num = physische Zeile (Leerzeilen mitgezählt)
+        if len(entries) + len(errors) >= block_rows:
+            yield entries, errors, header
+            entries, errors = [], []
+    if entries or errors:
+        yield entries, errors, header
+
+def _PARALLEL_BLOCKS(
+    path: Path,
+    header_lines: int,
+    dialect: Any,
+    header: List[str],
+    col: Dict[str, str],
+    content_id: bool,
+    encoding: str,
+    workers: int,
+    chunk_bytes: int,
+    block_rows: int,
+) -> Iterator[BLOCK]:
+    """
+    Parst zeilenweise ausgerichtete Byte-Bereiche der Datei in einem ProcessPoolExecutor; ein Block pro Chunk,
+    in Dateireihenfolge und mit denselben Zeilennummern wie _SERIAL_BLOCKS.
+    Meldet ein Worker, dass sein Chunk mehrzeilige Felder enthalten kann (die Chunkgrenzen schneiden sie womöglich),
+    wird ab dessen Anfang seriell mit _SERIAL_BLOCKS weitergelesen; die Chunks davor sind davon nicht betroffen.
+    """
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import islice
+
+    # Byte-Offset hinter dem Header: so viele Zeilen binär überspringen, wie der Header belegt
+    with path.open("rb") as raw:
+        for _ in range(header_lines):
+            raw.readline()
+        start = raw.tell()
+    bounds = _CHUNK_BOUNDS(path, start, chunk_bytes)
+    dialect_args = {a: getattr(dialect, a) for a in _DIALECT_ATTRS}
+    line_offset = header_lines  # Zeilen vor dem aktuellen Chunk
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        def submit(bound: Tuple[int, int]) -> Tuple[int, Any]:
+            # Chunkanfang mitführen: dort beginnt ggf. der serielle Rückfall
+            return bound[0], pool.submit(_PARSE_CHUNK, str(path), bound[0], bound[1], encoding, dialect_args, header, col, content_id)
+
+        # Höchstens 2 * workers Chunks gleichzeitig unterwegs, damit der Speicher begrenzt bleibt
+        todo = iter(bounds)
+        pending = deque(submit(b) for b in islice(todo, 2 * workers))
+        try:
+            while pending:
+                begin, future = pending.popleft()
+                result = future.result()    # in Dateireihenfolge
+                if result is None:
+                    for _, rest in pending:
+                        rest.cancel()
+                    pending.clear()
+                    with io.TextIOWrapper(path.open("rb"), encoding=encoding, newline="") as f:
+                        f.buffer.seek(begin)
+                        reader = csv.DictReader(f, fieldnames=header, **dialect_args)
+                        yield from _SERIAL_BLOCKS(reader, header, col, content_id, block_rows, line_offset)
+                    return
+                entries, chunk_errors, newlines = result
+                nxt = next(todo, None)
+                if nxt is not None:
+                    pending.append(submit(nxt))
+                yield (
+                    [BUILD_ENTRY(i, date.fromordinal(o), item, grams, reason) for i, o, item, grams, reason in entries],  # Werte sind bereits geprüft
+                    [(line_offset + line, message, values) for line, message, values in chunk_errors],
+                    header,
+                )
+                line_offset += newlines
+        finally:
+            # Bei Abbruch noch nicht gestartete Chunks verwerfen; cancel_futures nimmt auch schon abgebrochene
+            # aus der Warteschlange (Python 3.9 wartet beim Beenden sonst ewig, wenn nur solche übrig sind)
+            pool.shutdown(cancel_futures=True)
+
+def _CLOSE(source: Any) -> None:
+    """
+    Schließt Generator-Quellen sofort statt erst beim Garbage Collector (ihre finally-Blöcke beenden Worker).
+    """
+    close = getattr(source, "close", None)
+    if close is not None:
+        close()
+
+def _CHECK_OPTIONS(ON_DUPLICATE: Optional[str], MAX_ERRORS: Optional[int]) -> None:
+    if ON_DUPLICATE is not None and ON_DUPLICATE not in ON_DUPLICATE_CHOICES:
+        raise ValueError("ON_DUPLICATE MUST BE ONE OF: " + ", ".join(ON_DUPLICATE_CHOICES))
+    if MAX_ERRORS is not None and MAX_ERRORS < 0:
+        raise ValueError("MAX_ERRORS MUST BE >= 0")
+
+def _RUN_IMPORT(
+    SOURCES: Iterator[Tuple[str, Iterator[BLOCK]]],
+    STORE: STORAGE,
+    DRY_RUN: bool,
+    BATCH_SIZE: int,
+    ON_DUPLICATE: Optional[str],
+    REJECTS_PATH: Optional[str],
+    MAX_ERRORS: Optional[int],
+    ERROR_SAMPLE: int,
+    WITH_FILE: bool,
+) -> Dict[str, Any]:
+    """
+    Gemeinsamer Schreibpfad für Datei- und Verzeichnisimport: Die Blöcke aller Quellen laufen in Reihenfolge durch
+    Fehlerbehandlung (Rejects, MAX_ERRORS) und Dublettenprüfung in einen einzigen GROUP_WRITER: Während dessen
+    Thread einen Block schreibt (und je nach DURABILITY synchronisiert), wird der nächste schon geparst.
+    WITH_FILE=True (Verzeichnisimport): Fehler und Rejects nennen die Datei; Lese- und Formatfehler einer Datei
+    werden in deren Zusammenfassung vermerkt, die übrigen Dateien laufen weiter.
+    """
+    files: List[Dict[str, Any]] = []
+    errors: List[str] = []   # Stichprobe, höchstens ERROR_SAMPLE Meldungen
+    skipped = 0
+    aborted = False
+    replacements: Dict[str, ENTRY] = {}
+    seen: set[str] = set()  # IDs aus diesem Import (noch nicht unbedingt geschrieben)
+    index: Any = None
+    if ON_DUPLICATE is not None:
+        # Probelauf: vorhandene IDs nur im Speicher, damit weder <DB>.ids noch der Bloom-Filter angelegt werden.
+        # Sonst den ID-Index vor dem Schreiben öffnen, damit STORAGE.APPEND_BATCHES ihn fortschreibt
+        index = {E.ID for E in STORE.ITER_ENTRIES()} if DRY_RUN else STORE.IDS()
+
+    rejects_file = open(REJECTS_PATH, "w", encoding="utf-8", newline="") if REJECTS_PATH else nullcontext()
+    with rejects_file as rf:
+        rejects_writer: Any = None
+
+        def REJECT(stats: Dict[str, Any], line: int, message: str, values: List[Any], header: List[str]) -> bool:
+            """
+            Zählt eine fehlerhafte Zeile, schreibt sie in die Rejects-Datei und gibt True zurück, wenn abgebrochen wird.
+            """
+            nonlocal skipped, aborted, rejects_writer
+            skipped += 1
+            stats["skipped"] += 1
+            prefix = [stats["file"]] if WITH_FILE else []
+            if len(errors) < ERROR_SAMPLE:
+                errors.append(f"{prefix[0]}: line {line}: {message}" if WITH_FILE else f"line {line}: {message}")
+            if rf is not None:
+                if rejects_writer is None:
+                    # Rohwert-Spalten unter dem Header der Quelle (Verzeichnisimport: FIELDNAMES, siehe _FIXED_HEADER)
+                    rejects_writer = csv.writer(rf)
+                    rejects_writer.writerow((["FILE"] if WITH_FILE else []) + ["LINE", "ERROR"] + header)
+                rejects_writer.writerow(prefix + [line, message] + values)
+            if MAX_ERRORS is not None and skipped > MAX_ERRORS:
+                aborted = True
+            return aborted
+
+        def ENTRIES() -> Iterator[ENTRY]:
+            for name, blocks in SOURCES:
+                stats: Dict[str, Any] = {"file": name, "added": 0, "skipped": 0, "duplicates": 0, "error": None}
+                files.append(stats)
+                file_ids: set[str] = set()      # IDs dieser Datei (auch Dubletten), erkennt gleiche Zeilen ohne ID
+                repeats: Dict[str, int] = {}    # inhaltsbasierte ID -> Anzahl weiterer gleicher Zeilen in dieser Datei
+                try:
+                    while True:
+                        try:
+                            block = next(blocks, None)
+                        except _FILE_ERRORS as e:
+                            if not WITH_FILE:
+                                raise
+                            stats["error"] = str(e)
+                            break
+                        if block is None:
+                            break
+                        entries, block_errors, header = block
+                        for line, message, values in block_errors:
+                            if REJECT(stats, line, message, values, header):
+                                return
+                        for entry in entries:
+                            if index is not None:
+                                content = False
+                                if entry.ID in file_ids:
+                                    # Gleiche Zeilen ohne ID in einer Datei sind eigene Einträge: die n-te Wiederholung
+                                    # bekommt CONTENT_ID(..., n), ein erneuter Import derselben Datei trifft dieselben IDs
+                                    content = entry.ID == CONTENT_ID(entry.DATE, entry.ITEM, entry.GRAMS, entry.REASON)
+                                    if content:
+                                        n = repeats[entry.ID] = repeats.get(entry.ID, 0) + 1
+                                        entry = BUILD_ENTRY(CONTENT_ID(entry.DATE, entry.ITEM, entry.GRAMS, entry.REASON, n), entry.DATE, entry.ITEM, entry.GRAMS, entry.REASON)
+                                else:
+                                    file_ids.add(entry.ID)
+                                if entry.ID in seen or entry.ID in index:
+                                    stats["duplicates"] += 1
+                                    if ON_DUPLICATE == "error":
+                                        raise ValueError(f"DUPLICATE ID {entry.ID}")
+                                    if ON_DUPLICATE == "replace" and not content and entry.ID != CONTENT_ID(entry.DATE, entry.ITEM, entry.GRAMS, entry.REASON):
+                                        replacements[entry.ID] = entry     # Letzte Zeile gewinnt; inhaltsbasierte IDs sind identisch, nichts zu ersetzen
+                                    continue
+                                seen.add(entry.ID)
+                            stats["added"] += 1
+                            yield entry
+                finally:
+                    _CLOSE(blocks)  # Auch bei Abbruch: Worker der Quelle beenden
+
+        try:
+            if DRY_RUN:
+                for _ in ENTRIES():
+                    pass
+            else:
+                source = ENTRIES()
+                # Erster Eintrag vor dem Schreib-Thread: WORKERS > 1 startet dabei die Parser-Prozesse (fork ohne weitere Threads)
+                first = list(islice(source, 1))
+                # Zwei Blöcke Puffer: einer wird geschrieben, der nächste geparst
+                with GROUP_WRITER(STORE, MAX_QUEUE=2 * BATCH_SIZE, MAX_BATCH=BATCH_SIZE) as writer:
+                    writer.APPEND_MANY(chain(first, source))
+                if replacements:
+                    STORE.SAVE_ALL(replacements.get(E.ID, E) for E in STORE.ITER_ENTRIES())
+                elif index is not None:
+                    index.SAVE()     # Bloom-Filter mit den neuen IDs sichern
+        finally:
+            _CLOSE(SOURCES)     # Quellen sofort schließen (auch bei Abbruch): beendet Worker und gibt Dateien frei
+
+    return {
+        "added": sum(f["added"] for f in files),
+        "skipped": skipped,
+        "duplicates": sum(f["duplicates"] for f in files),
+        "errors": errors,
+        "aborted": aborted,
+        "rejects": REJECTS_PATH,
+        "files": files,
+        "db": str(STORE.PATH),
+    }
 
 def IMPORT_CSV_TO_STORAGE(
     CSV_PATH: str,
@@ -14,6 +399,13 @@ def IMPORT_CSV_TO_STORAGE(
     ENCODING: str = "utf-8",
     DELIMITER: Optional[str] = None,
     DRY_RUN: bool = False,
+    BATCH_SIZE: int = 1000,
+    WORKERS: int = 1,
+    CHUNK_BYTES: int = 8 * 2**20,
+    ON_DUPLICATE: Optional[str] = None,
+    REJECTS_PATH: Optional[str] = None,
+    MAX_ERRORS: Optional[int] = None,
+    ERROR_SAMPLE: int = 100,
 ) -> Dict[str, Any]:
     """
     Lies Einträge aus einer CSV-Datei ein und füge sie der aktuellen STORAGE hinzu.
@@ -21,77 +413,187 @@ def IMPORT_CSV_TO_STORAGE(
     Erwartete Standard-Header (case-insensitive): DATE, ITEM, GRAMS, REASON, optional ID.
     Alternativ MAPPING übergeben, z.B. {"DATE": "Datum", "ITEM": "Artikel", "GRAMS": "Menge", "REASON": "Grund", "ID": "ID"}.
 
-    Rückgabe: {"added": int, "skipped": int, "errors": [str], "db": str}
+    Gültige Zeilen werden über writer.GROUP_WRITER in Blöcken zu höchstens BATCH_SIZE geschrieben (fsync gemäß
+    STORE.DURABILITY); Parsen und Schreiben laufen dabei überlappend.
+
+    WORKERS > 1: Die Datei wird in zeilenweise ausgerichtete Byte-Bereiche (ca. CHUNK_BYTES) geteilt, die in einem
+    ProcessPoolExecutor geparst und geprüft werden. Die Ergebnisse werden in Dateireihenfolge zusammengeführt und
+    wie im seriellen Fall geschrieben; Zeilennummern in Fehlermeldungen sind identisch.
+    Voraussetzung: eine ASCII-kompatible Kodierung (z.B. utf-8, latin-1). Kann ein Chunk Felder mit Zeilenumbruch
+    enthalten (ungerade Zahl von Anführungszeichen in einer Zeile), wird ab dort seriell weitergelesen.
+
+    ON_DUPLICATE ("skip", "replace" oder "error"): wiederholter Import ohne Dubletten. Jede ID (bzw. für Zeilen ohne ID
+    ein Hash aus DATE, ITEM, GRAMS, REASON) wird gegen den ID-Index der STORAGE geprüft; ein Bloom-Filter davor sorgt dafür,
+    dass neue Zeilen keinen Plattenzugriff kosten (siehe dedupe.py). Dubletten innerhalb der Datei zählen ebenfalls;
+    gleiche Zeilen ohne ID sind dagegen eigene Einträge (die n-te Wiederholung bekommt einen Hash mit Zähler n, ein
+    erneuter Import derselben Datei erkennt sie also wieder).
+    - "skip": Dublette verwerfen.
+    - "replace": vorhandenen Eintrag durch die Zeile ersetzen (am Ende ein STORE.SAVE_ALL, nur wenn es Dubletten gab).
+    - "error": ValueError bei der ersten Dublette; bereits geschriebene Blöcke bleiben erhalten.
+
+    Fehlerhafte Zeilen: Der Speicherbedarf bleibt unabhängig von ihrer Anzahl. "skipped" zählt sie, "errors" enthält
+    nur die ersten ERROR_SAMPLE Meldungen. REJECTS_PATH schreibt jede fehlerhafte Zeile gestreamt als CSV
+    (LINE, ERROR, danach die Rohwerte unter den Original-Headern). Mehr als MAX_ERRORS fehlerhafte Zeilen brechen den
+    Import ab ("aborted": True); gültige Zeilen aus den Blöcken davor (BATCH_SIZE Zeilen bzw. ein Chunk) sind geschrieben.
+
+    Rückgabe: {"added": int, "skipped": int, "duplicates": int, "errors": [str], "aborted": bool, "rejects": str | None,
+    "files": [dict], "db": str}
     """
     path = Path(CSV_PATH)
     if not path.exists():
         raise FileNotFoundError(f"CSV not found: {CSV_PATH}")
-
-    added = 0
-    skipped = 0
-    errors: list[str] = []
+    if WORKERS < 1:
+        raise ValueError("WORKERS MUST BE >= 1")
+    _CHECK_OPTIONS(ON_DUPLICATE, MAX_ERRORS)
+    content_id = ON_DUPLICATE is not None
 
     with path.open("r", encoding=ENCODING, newline="") as f:
-        sample = f.read(4096)
-        f.seek(0)
+        dialect, reader, header, col = _OPEN_CSV(f, DELIMITER, MAPPING)
+        if WORKERS > 1:
+            header_lines = reader.line_num  # Zeilen, die der Header belegt (in der Regel 1)
+            blocks = _PARALLEL_BLOCKS(path, header_lines, dialect, header, col, content_id, ENCODING, WORKERS, CHUNK_BYTES, BATCH_SIZE)
+        else:
+            blocks = _SERIAL_BLOCKS(reader, header, col, content_id, BATCH_SIZE)
+        return _RUN_IMPORT(
+            iter([(str(path), blocks)]), STORE, DRY_RUN, BATCH_SIZE, ON_DUPLICATE, REJECTS_PATH, MAX_ERRORS, ERROR_SAMPLE, WITH_FILE=False
+        )
 
-        if DELIMITER is None:
+def _FIXED_HEADER(blocks: Iterator[BLOCK], header: List[str], col: Dict[str, str]) -> Iterator[BLOCK]:
+    """
+    Verzeichnisimport: Rohwerte fehlerhafter Zeilen unter dem festen Header FIELDNAMES (über das Spalten-Mapping der
+    Datei) statt unter dem eigenen Header, damit Dateien mit verschiedenen Spalten in eine Rejects-Datei passen.
+    """
+    position = {name: i for i, name in enumerate(header)}
+    take = [position.get(col.get(name, "")) for name in FIELDNAMES]
+    for entries, errors, _ in blocks:
+        yield entries, [(line, message, [None if i is None else values[i] for i in take]) for line, message, values in errors], FIELDNAMES
+
+def _PRODUCE_FILE(
+    path: Path,
+    out: queue.Queue,
+    stop: threading.Event,
+    encoding: str,
+    delimiter: Optional[str],
+    mapping: Optional[Dict[str, str]],
+    content_id: bool,
+    block_rows: int,
+) -> None:
+    """
+    Thread: liest eine Datei blockweise und legt (Block, neu gelesene Bytes) in out ab, am Ende (None, restliche Bytes),
+    bei einem Fehler (Exception, restliche Bytes). Endet vorzeitig, sobald stop gesetzt ist.
+    """
+    def put(item: Any) -> bool:
+        # Volle Queue: warten, aber regelmäßig auf Abbruch prüfen (der Leser holt diese Datei evtl. nie mehr ab)
+        while not stop.is_set():
             try:
-                dialect = csv.Sniffer().sniff(sample)
-            except csv.Error:
-                dialect = csv.excel
-        else:
-            dialect = csv.excel
-            dialect.delimiter = DELIMITER  # type: ignore[attr-defined]
+                out.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
 
-        reader = csv.DictReader(f, dialect=dialect)
+    if stop.is_set():
+        return
+    size = done = 0
+    try:
+        size = path.stat().st_size
+        with io.TextIOWrapper(path.open("rb"), encoding=encoding, newline="") as f:
+            _, reader, header, col = _OPEN_CSV(f, delimiter, mapping)
+            for block in _FIXED_HEADER(_SERIAL_BLOCKS(reader, header, col, content_id, block_rows), header, col):
+                position = f.buffer.tell()  # Bytes, die der Textpuffer bisher gelesen hat
+                if not put((block, position - done)):
+                    return
+                done = position
+        put((None, size - done))
+    except Exception as e:
+        put((e, size - done))
 
-        # Header-Mapping vorbereiten
-        def up(s: str) -> str: return s.strip().upper()
-        header = [h for h in (reader.fieldnames or [])]
-        header_up = {up(h): h for h in header}
+def _THREADED_SOURCES(
+    paths: List[Path],
+    names: List[str],
+    jobs: int,
+    progress: Optional[Callable[[int, int], None]],
+    **file_args: Any,
+) -> Iterator[Tuple[str, Iterator[BLOCK]]]:
+    """
+    Liest bis zu jobs Dateien gleichzeitig in einem ThreadPoolExecutor und gibt sie in der Reihenfolge von paths
+    als Blockquellen zurück. Je Datei puffert eine kleine Queue wenige Blöcke, der Speicher bleibt begrenzt.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-        if MAPPING:
-            col = {k.upper(): v for k, v in MAPPING.items()}
-        else:
-            required = ["DATE", "ITEM", "GRAMS", "REASON"]
-            missing = [r for r in required if r not in header_up]
-            if missing:
-                raise ValueError(f"Missing required columns: {', '.join(missing)}. Found: {header}")
-            col = {k: header_up[k] for k in required}
-            if "ID" in header_up:
-                col["ID"] = header_up["ID"]
-
-        # Zeilen importieren
-        for i, row in enumerate(reader, start=2):  # 2 = erste Datenzeile nach Header
-            try:
-                date_str = str(row[col["DATE"]])
-                item = str(row[col["ITEM"]]).strip()
-                grams_str = str(row[col["GRAMS"]])
-                reason = str(row[col["REASON"]]).strip()
-                id_value = None
-                if "ID" in col and row.get(col["ID"]):
-                    id_value = str(row[col["ID"]]).strip() or None
-
-                grams = PARSE_INT_NONNEGATIVE(grams_str)
-                # ENTRY erzeugen (parst Datum intern; normalisiert Strings)
-                entry = ENTRY.CREATE(ITEM=item, GRAMS=grams, REASON=reason, DATE_STR=date_str)
-
-                # Falls CSV eine ID mitbringt, diese verwenden (ENTRY ist frozen, daher neu konstruieren)
-                if id_value:
-                    entry = ENTRY(
-                        ID=id_value,
-                        DATE=entry.DATE,
-                        ITEM=entry.ITEM,
-                        GRAMS=entry.GRAMS,
-                        REASON=entry.REASON,
-                    )
-
-                if not DRY_RUN:
-                    STORE.APPEND(entry)
-                added += 1
-            except Exception as e:
-                errors.append(f"line {i}: {e}")
-                skipped += 1
-
-    return {"added": added, "skipped": skipped, "errors": errors, "db": str(STORE.PATH)}
+    stop = threading.Event()
+    queues: List[queue.Queue] = [queue.Queue(maxsize=2) for _ in paths]
+    total = sum(p.stat().st_size for p in paths)
+    done = 0
+
+    def drain(q: queue.Queue) -> Iterator[BLOCK]:
+        nonlocal done
+        while True:
+            block, nbytes = q.get()
+            done += nbytes
+            if progress is not None:
+                progress(done, total)
+            if isinstance(block, Exception):
+                raise block
+            if block is None:
+                return
+            yield block
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for p, q in zip(paths, queues):
+            pool.submit(_PRODUCE_FILE, p, q, stop, **file_args)
+        try:
+            for name, q in zip(names, queues):
+                yield name, drain(q)
+        finally:
+            stop.set()  # Bei Abbruch wartende Threads beenden, bevor der Pool auf sie wartet
+
+def IMPORT_CSV_DIR_TO_STORAGE(
+    DIR_PATH: str,
+    STORE: STORAGE,
+    GLOB: str = "*.csv",
+    JOBS: int = 4,
+    MAPPING: Optional[Dict[str, str]] = None,
+    ENCODING: str = "utf-8",
+    DELIMITER: Optional[str] = None,
+    DRY_RUN: bool = False,
+    BATCH_SIZE: int = 1000,
+    ON_DUPLICATE: Optional[str] = None,
+    REJECTS_PATH: Optional[str] = None,
+    MAX_ERRORS: Optional[int] = None,
+    ERROR_SAMPLE: int = 100,
+    PROGRESS: Optional[Callable[[int, int], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Importiert alle Dateien in DIR_PATH, die auf GLOB passen (z.B. "*.csv" oder "**/*.csv"), in einem Lauf.
+
+    Bis zu JOBS Dateien werden gleichzeitig in Threads dekodiert und geprüft; ihre Einträge laufen nach Dateinamen
+    sortiert in einen einzigen Schreiber (ein GROUP_WRITER, eine Dublettenprüfung über alle Dateien).
+    PROGRESS(BYTES_DONE, BYTES_TOTAL) wird nach jedem Block aufgerufen.
+    Eine Datei mit fehlenden Spalten oder falscher Kodierung wird übersprungen ("error" in ihrer Zusammenfassung).
+
+    Übrige Optionen und Rückgabe wie IMPORT_CSV_TO_STORAGE; "files" enthält je Datei
+    {"file", "added", "skipped", "duplicates", "error"}, Fehler und Rejects (Spalte FILE) nennen die Datei.
+    Die Rejects-Datei hat für alle Dateien denselben Header: FILE, LINE, ERROR, ID, DATE, ITEM, GRAMS, REASON.
+    """
+    root = Path(DIR_PATH)
+    if not root.is_dir():
+        raise FileNotFoundError(f"Directory not found: {DIR_PATH}")
+    if JOBS < 1:
+        raise ValueError("JOBS MUST BE >= 1")
+    _CHECK_OPTIONS(ON_DUPLICATE, MAX_ERRORS)
+
+    rejects = Path(REJECTS_PATH).resolve() if REJECTS_PATH else None
+    paths = sorted(p for p in root.glob(GLOB) if p.is_file() and p.resolve() != rejects)
+    sources = _THREADED_SOURCES(
+        paths,
+        [str(p.relative_to(root)) for p in paths],
+        JOBS,
+        PROGRESS,
+        encoding=ENCODING,
+        delimiter=DELIMITER,
+        mapping=MAPPING,
+        content_id=ON_DUPLICATE is not None,
+        block_rows=BATCH_SIZE,
+    )
+    return _RUN_IMPORT(sources, STORE, DRY_RUN, BATCH_SIZE, ON_DUPLICATE, REJECTS_PATH, MAX_ERRORS, ERROR_SAMPLE, WITH_FILE=True)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+from .models import ENTRY
+from .utils import PARSE_INT_NONNEGATIVE
+from .writer import GROUP_WRITER
+
+if TYPE_CHECKING:
+    from .storage import STORAGE
+
+# HTTP-Annahme von Einträgen (nur Standardbibliothek, asyncio): "serve-http --host 0.0.0.0 --port 8080".
+#
+#   POST /entries   Content-Type application/json:      ein Objekt {"ITEM", "GRAMS", "REASON", "DATE"?} oder eine Liste davon
+#                   Content-Type application/x-ndjson:  ein Objekt pro Zeile
+#                   -> 201 {"added": N, "ids": [...]}, erst wenn die Einträge geschrieben sind (gemäß --durability)
+#                   -> 400 {"errors": [{"line": N, "error": "..."}]}: keine Zeile wird geschrieben
+#                   -> 503 + Retry-After, wenn die Schreib-Warteschlange voll ist (Rückstau)
+#   GET /health     -> 200 {"ok": true, "pending": N, "commits": N}
+#
+# Feldnamen sind gross-/kleinschreibungsunabhängig; geprüft wird über ENTRY.CREATE (wie "add").
+# Geschrieben wird über writer.GROUP_WRITER: Jede Anfrage reiht ihre Einträge mit APPEND ein und wartet per
+# FLUSH (in einem Hilfsthread), bis sie geschrieben sind. Während der Schreib-Thread einen Block schreibt,
+# sammeln sich die nächsten Anfragen: gleichzeitige Anfragen teilen sich einen write() und - je nach
+# DURABILITY - einen fsync. Hier wird nur die Zahl der wartenden Einträge auf MAX_QUEUE begrenzt (sonst 503).
+
+_NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+_MAX_ERRORS = 100   # Höchstens so viele Fehler in einer 400-Antwort
+_FLUSH_THREADS = 32 # Gleichzeitig wartende FLUSH-Aufrufe; weitere warten im Executor (ihre Einträge sind schon eingereiht)
+
+def PARSE_ENTRY(OBJ: Any) -> ENTRY:
+    """
+    Prüft ein JSON-Objekt und baut daraus ein ENTRY (DATE optional, sonst heute).
+    """
+    if not isinstance(OBJ, dict):
+        raise ValueError("ENTRY MUST BE A JSON OBJECT")
+    FIELDS = {str(K).upper(): V for K, V in OBJ.items()}
+    for NAME in ("ITEM", "GRAMS", "REASON"):
+        if FIELDS.get(NAME) is None:
+            raise ValueError(f"MISSING FIELD: {NAME}")
+    ITEM, GRAMS, REASON, DATE = FIELDS["ITEM"], FIELDS["GRAMS"], FIELDS["REASON"], FIELDS.get("DATE")
+    if not isinstance(ITEM, str) or not isinstance(REASON, str) or not (DATE is None or isinstance(DATE, str)):
+        raise ValueError("ITEM, REASON AND DATE MUST BE STRINGS")
+    if isinstance(GRAMS, bool) or not isinstance(GRAMS, (int, str)):
+        raise ValueError("GRAMS MUST BE AN INTEGER")
+    return ENTRY.CREATE(ITEM=ITEM, GRAMS=PARSE_INT_NONNEGATIVE(str(GRAMS)), REASON=REASON, DATE_STR=DATE)
+
+def PARSE_BODY(BODY: bytes, CONTENT_TYPE: str) -> Tuple[List[ENTRY], List[Dict[str, Any]]]:
+    """
+    Zerlegt den Anfrageinhalt in Einträge. Rückgabe: (Einträge, Fehler mit 1-basierter Zeile bzw. Listenposition).
+    """
+    TEXT = BODY.decode("utf-8")
+    if CONTENT_TYPE.split(";")[0].strip().lower() in _NDJSON_TYPES:
+        OBJECTS: List[Tuple[int, Any]] = []
+        for NUMBER, LINE in enumerate(TEXT.splitlines(), start=1):
+            if LINE.strip():
+                try:
+                    OBJECTS.append((NUMBER, json.loads(LINE)))
+                except ValueError as E:
+                    OBJECTS.append((NUMBER, E))
+    else:
+        DATA = json.loads(TEXT)
+        OBJECTS = list(enumerate(DATA if isinstance(DATA, list) else [DATA], start=1))
+    ENTRIES: List[ENTRY] = []
+    ERRORS: List[Dict[str, Any]] = []
+    for NUMBER, OBJ in OBJECTS:
+        try:
+            if isinstance(OBJ, ValueError):
+                raise OBJ
+            ENTRIES.append(PARSE_ENTRY(OBJ))
+        except (ValueError, TypeError) as E:
+            if len(ERRORS) < _MAX_ERRORS:
+                ERRORS.append({"line": NUMBER, "error": str(E)})
+    if not OBJECTS:
+        ERRORS.append({"line": 0, "error": "NO ENTRIES IN REQUEST"})
+    return ENTRIES, ERRORS
+
+class INGEST_SERVER:
+    def __init__(SELF, STORE: STORAGE, MAX_QUEUE: int = 10_000, MAX_BATCH: int = 1000, MAX_BODY: int = 1 << 20) -> None:
+        """
+        MAX_QUEUE: höchstens so viele angenommene, noch nicht geschriebene Einträge; darüber 503.
+        MAX_BATCH: höchstens so viele Einträge pro Group Commit (GROUP_WRITER).
+        MAX_BODY:  größter Anfrageinhalt in Bytes; darüber 413.
+        """
+        if MAX_QUEUE < 1 or MAX_BATCH < 1:
+            raise ValueError("MAX_QUEUE AND MAX_BATCH MUST BE >= 1")
+        SELF.STORE = STORE
+        SELF.MAX_QUEUE = MAX_QUEUE
+        SELF.MAX_BATCH = MAX_BATCH
+        SELF.MAX_BODY = MAX_BODY
+        SELF.PENDING = 0    # Angenommen, aber noch nicht geschrieben (nur im Event-Loop verändert)
+        SELF.REJECTED = 0   # Wegen voller Warteschlange abgewiesene Anfragen
+        SELF._WRITER: Optional[GROUP_WRITER] = None
+        SELF._FLUSHES: Set["asyncio.Future[bool]"] = set()    # Laufende FLUSH-Aufrufe (werden beim Beenden abgewartet)
+        SELF._CLOSING = False
+        SELF._EXECUTOR = ThreadPoolExecutor(max_workers=_FLUSH_THREADS, thread_name_prefix="food-waste-ingest")
+        SELF._LOOP: Optional[asyncio.AbstractEventLoop] = None
+        SELF._STOP: Optional[asyncio.Event] = None
+
+    @property
+    def COMMITS(SELF) -> int:
+        return SELF._WRITER.COMMITS if SELF._WRITER is not None else 0
+
+    @property
+    def WRITTEN(SELF) -> int:
+        return SELF._WRITER.WRITTEN if SELF._WRITER is not None else 0
+
+    # ---- SCHREIBEN ----
+
+    async def SUBMIT(SELF, ENTRIES: List[ENTRY]) -> bool:
+        """
+        Reiht ENTRIES ein und wartet, bis sie geschrieben sind. False, wenn die Warteschlange dafür zu voll ist.
+        """
+        assert SELF._WRITER is not None
+        if SELF._CLOSING or SELF.PENDING + len(ENTRIES) > SELF.MAX_QUEUE:
+            SELF.REJECTED += 1
+            return False
+        SELF._WRITER.APPEND_MANY(ENTRIES)     # Blockiert nicht: beim Schreiber warten höchstens PENDING <= MAX_QUEUE Einträge
+        SELF.PENDING += len(ENTRIES)
+        DONE = asyncio.get_running_loop().run_in_executor(SELF._EXECUTOR, SELF._WRITER.FLUSH)
+        SELF._FLUSHES.add(DONE)
+
+        def FINISHED(_: "asyncio.Future[bool]") -> None:
+            SELF.PENDING -= len(ENTRIES)
+            SELF._FLUSHES.discard(DONE)
+
+        DONE.add_done_callback(FINISHED)
+        # shield: bricht der Client ab, wird die Anfrage trotzdem geschrieben (sie ist schon eingereiht)
+        await asyncio.shield(DONE)
+        return True
+
+    # ---- HTTP ----
+
+    async def _ROUTE(SELF, METHOD: str, PATH: str, HEADERS: Dict[str, str], BODY: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        if PATH == "/health":
+            if METHOD != "GET":
+                return 405, {"error": "METHOD NOT ALLOWED"}, {"Allow": "GET"}
+            return 200, {"ok": True, "pending": SELF.PENDING, "commits": SELF.COMMITS}, {}
+        if PATH != "/entries":
+            return 404, {"error": "NOT FOUND"}, {}
+        if METHOD != "POST":
+            return 405, {"error": "METHOD NOT ALLOWED"}, {"Allow": "POST"}
+        try:
+            ENTRIES, ERRORS = PARSE_BODY(BODY, HEADERS.get("content-type", "application/json"))
+        except ValueError as E:    # Kein gültiges JSON/UTF-8
+            return 400, {"errors": [{"line": 0, "error": str(E)}]}, {}
+        if ERRORS:
+            return 400, {"errors": ERRORS}, {}
+        if len(ENTRIES) > SELF.MAX_QUEUE:
+            return 413, {"error": f"AT MOST {SELF.MAX_QUEUE} ENTRIES PER REQUEST"}, {}
+        try:
+            if not await SELF.SUBMIT(ENTRIES):
+                return 503, {"error": "WRITE QUEUE FULL"}, {"Retry-After": "1"}
+        except Exception as E:     # Schreibfehler (z.B. Platte voll); der GROUP_WRITER nimmt danach nichts mehr an
+            return 500, {"error": f"WRITE FAILED: {E.__cause__ or E}"}, {}
+        return 201, {"added": len(ENTRIES), "ids": [E.ID for E in ENTRIES]}, {}
+
+    async def _HANDLE(SELF, READER: asyncio.StreamReader, WRITER: asyncio.StreamWriter) -> None:
+        """
+        Eine Verbindung; mehrere Anfragen nacheinander (HTTP/1.1 Keep-Alive). Inhalt nur mit Content-Length.
+        """
+        try:
+            while True:
+                REQUEST_LINE = await READER.readline()
+                if not REQUEST_LINE:
+                    break
+                PARTS = REQUEST_LINE.decode("latin-1").split()
+                HEADERS: Dict[str, str] = {}
+                while True:
+                    LINE = await READER.readline()
+                    if LINE in (b"\r\n", b"\n", b""):
+                        break
+                    NAME, _, VALUE = LINE.decode("latin-1").partition(":")
+                    HEADERS[NAME.strip().lower()] = VALUE.strip()
+                if len(PARTS) != 3:
+                    await SELF._RESPOND(WRITER, 400, {"error": "BAD REQUEST LINE"}, {}, False)
+                    break
+                METHOD, TARGET, VERSION = PARTS
+                CONNECTION = HEADERS.get("connection", "").lower()
+                KEEP_ALIVE = CONNECTION == "keep-alive" if VERSION == "HTTP/1.0" else CONNECTION != "close"
+                if "transfer-encoding" in HEADERS:
+                    await SELF._RESPOND(WRITER, 411, {"error": "CONTENT-LENGTH REQUIRED"}, {}, False)
+                    break
+                try:
+                    LENGTH = int(HEADERS.get("content-length", "0"))
+                except ValueError:
+                    LENGTH = -1
+                if not 0 <= LENGTH <= SELF.MAX_BODY:
+                    # Inhalt wird nicht gelesen, die Verbindung ist danach nicht mehr verwendbar
+                    await SELF._RESPOND(WRITER, 413 if LENGTH > 0 else 400, {"error": f"BODY MUST BE 0..{SELF.MAX_BODY} BYTES"}, {}, False)
+                    break
+                BODY = await READER.readexactly(LENGTH) if LENGTH else b""
+                STATUS, PAYLOAD, EXTRA = await SELF._ROUTE(METHOD.upper(), TARGET.split("?", 1)[0], HEADERS, BODY)
+                await SELF._RESPOND(WRITER, STATUS, PAYLOAD, EXTRA, KEEP_ALIVE)
+                if not KEEP_ALIVE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass    # Client hat abgebrochen oder zu lange Kopfzeilen geschickt (readline: ValueError)
+        finally:
+            WRITER.close()
+            try:
+                await WRITER.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _RESPOND(WRITER: asyncio.StreamWriter, STATUS: int, PAYLOAD: Any, EXTRA: Dict[str, str], KEEP_ALIVE: bool) -> None:
+        BODY = (json.dumps(PAYLOAD, ensure_ascii=False) + "\n").encode("utf-8")
+        LINES = [f"HTTP/1.1 {STATUS} {HTTPStatus(STATUS).phrase}", "Content-Type: application/json", f"Content-Length: {len(BODY)}"]
+        if not KEEP_ALIVE:
+            LINES.append("Connection: close")
+        LINES += [f"{NAME}: {VALUE}" for NAME, VALUE in EXTRA.items()]
+        WRITER.write(("\r\n".join(LINES) + "\r\n\r\n").encode("latin-1") + BODY)
+        await WRITER.drain()
+
+    # ---- START/STOPP ----
+
+    async def RUN(SELF, HOST: str, PORT: int, READY: Optional[Callable[["INGEST_SERVER", int], None]] = None) -> None:
+        """
+        Nimmt Verbindungen an, bis STOP() aufgerufen wird; danach werden alle angenommenen Einträge noch geschrieben.
+        READY(SERVER, PORT) meldet den tatsächlichen Port (PORT=0: frei gewählt).
+        """
+        SELF._LOOP = asyncio.get_running_loop()
+        SELF._STOP = asyncio.Event()
+        SELF._WRITER = GROUP_WRITER(SELF.STORE, MAX_QUEUE=SELF.MAX_QUEUE, MAX_BATCH=SELF.MAX_BATCH)
+        SERVER = await asyncio.start_server(SELF._HANDLE, HOST, PORT)
+        try:
+            if READY is not None:
+                READY(SELF, SERVER.sockets[0].getsockname()[1])
+            await SELF._STOP.wait()
+        finally:
+            SERVER.close()
+            await SERVER.wait_closed()
+            SELF._CLOSING = True    # Späte Anfragen noch offener Verbindungen bekommen 503
+            if SELF._FLUSHES:
+                await asyncio.wait(list(SELF._FLUSHES))   # Angenommene Anfragen noch schreiben
+            try:
+                await SELF._LOOP.run_in_executor(SELF._EXECUTOR, SELF._WRITER.CLOSE)
+            finally:
+                SELF._EXECUTOR.shutdown()
+
+    def STOP(SELF) -> None:
+        """
+        Beendet RUN; darf aus einem anderen Thread aufgerufen werden.
+        """
+        if SELF._LOOP is not None and SELF._STOP is not None:
+            SELF._LOOP.call_soon_threadsafe(SELF._STOP.set)
+
+def SERVE_HTTP(STORE: STORAGE, HOST: str = "127.0.0.1", PORT: int = 8080, READY: Optional[Callable[[INGEST_SERVER, int], None]] = None, **OPTIONS: Any) -> None:
+    """
+    Startet den HTTP-Server und blockiert bis Strg+C bzw. INGEST_SERVER.STOP(). OPTIONS: MAX_QUEUE, MAX_BATCH, MAX_BODY.
+    """
+    SERVER = INGEST_SERVER(STORE, **OPTIONS)
+    try:
+        asyncio.run(SERVER.RUN(HOST, PORT, READY))
+    except KeyboardInterrupt:
+        pass
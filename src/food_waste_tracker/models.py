@@ -1,8 +1,9 @@
 from __future__ import annotations
-from dataclasses import dataclass
+import sys
+from dataclasses import FrozenInstanceError, dataclass
 from datetime import date, datetime
-from typing import Dict, Any
-from uuid import uuid4
+from typing import Callable, Dict, Any, Tuple
+from .utils import PARSE_DATE
 
 
 # Kurzschreibweise für
@@ -29,16 +30,28 @@ class ENTRY:
     REASON: str
 
     @staticmethod
-    def CREATE(ITEM: str, GRAMS: int, REASON: str, DATE_STR: str | None = None) -> "ENTRY":
+    def CREATE(
+        ITEM: str,
+        GRAMS: int,
+        REASON: str,
+        DATE_STR: str | None = None,
+        DATE_PARSER: Callable[[str], date] | None = None,
+    ) -> "ENTRY":
         """
         CONVENIENCE CONSTRUCTOR:
         - PARSES DATE FROM STRING OR USES TODAY IF NONE IS PROVIDED.
+        - DATE_PARSER: OPTIONAL PARSER (E.G. utils.DATE_PARSER PER CSV COLUMN) INSTEAD OF _PARSE_DATE.
         - NORMALIZES STRING FIELDS (STRIP).
         - VALIDATES GRAMS.
         """
+        from uuid import uuid4  # Erst hier importiert: Lesebefehle brauchen uuid nicht (CLI-Startzeit)
+
         if GRAMS < 0:
             raise ValueError("GRAMS MUST BE >= 0")
-        DATE_OBJ: date = datetime.today().date() if DATE_STR is None else ENTRY._PARSE_DATE(DATE_STR)
+        if DATE_STR is None:
+            DATE_OBJ: date = datetime.today().date()
+        else:
+            DATE_OBJ = (DATE_PARSER or ENTRY._PARSE_DATE)(DATE_STR)
         return ENTRY(
             ID=str(uuid4()),
             DATE=DATE_OBJ,
@@ -61,15 +74,8 @@ class ENTRY:
         - DD.MM.YYYY
         - YYYY/MM/DD
         """
-        FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%Y/%m/%d"]
-        LAST_ERROR: Exception | None = None # Initialisierung der Variable für den letzten Fehler
-        for F in FORMATS:
-            try:
-                return datetime.strptime(DATE_STR.strip(), F).date()    # Versucht, das Datum zu parsen
-            except Exception as E:  # noqa: BLE001
-                LAST_ERROR = E  # Speichert den letzten Fehler, falls das Parsen fehlschlägt
-        # Wenn kein Format passt, wird ein ValueError mit dem letzten Fehler ausgelöst
-        raise ValueError(f"UNSUPPORTED DATE FORMAT: {DATE_STR}") from LAST_ERROR
+        # Schneller Weg (date.fromisoformat, Format-Merker, LRU-Cache) steckt in utils.PARSE_DATE
+        return PARSE_DATE(DATE_STR)
 
     def TO_DICT(self) -> Dict[str, Any]:
         """
@@ -89,10 +95,96 @@ class ENTRY:
         """
         Deserialisiert ein Dictionary-Format zurück in ein ENTRY-Objekt.
         """
+        DATE_STR = DATA["DATE"]
         return ENTRY(
+            ID=str(DATA["ID"]),
+            # "YYYY-MM-DD" direkt über date.fromisoformat, längere ISO-Werte (mit Uhrzeit) über datetime
+            DATE=date.fromisoformat(DATE_STR) if len(DATE_STR) == 10 else datetime.fromisoformat(DATE_STR).date(),
+            ITEM=str(DATA["ITEM"]),
+            GRAMS=int(DATA["GRAMS"]),
+            REASON=str(DATA["REASON"]),
+        )
+
+
+class COMPACT_ENTRY:
+    """
+    Speichersparende Darstellung eines ENTRY für große Datenmengen (gleiche API wie ENTRY).
+
+    - __slots__ statt __dict__ pro Instanz.
+    - ITEM/REASON werden über sys.intern aus einem gemeinsamen Pool geteilt.
+    - DATE wird als int-Ordinalzahl gespeichert und erst beim Zugriff in ein date umgewandelt.
+    - ID wird als 16 Bytes gespeichert, wenn sie eine kanonische UUID ist, sonst als String.
+    """
+    __slots__ = ("_ID", "_ORDINAL", "ITEM", "GRAMS", "REASON")
+
+    def __init__(SELF, ID: str, DATE: date, ITEM: str, GRAMS: int, REASON: str) -> None:
+        # object.__setattr__ umgeht die Sperre in __setattr__ (unveränderlich wie ENTRY)
+        object.__setattr__(SELF, "_ID", COMPACT_ENTRY._PACK_ID(ID))
+        object.__setattr__(SELF, "_ORDINAL", DATE.toordinal())
+        object.__setattr__(SELF, "ITEM", sys.intern(ITEM))
+        object.__setattr__(SELF, "GRAMS", GRAMS)
+        object.__setattr__(SELF, "REASON", sys.intern(REASON))
+
+    @staticmethod
+    def _PACK_ID(ID: str) -> bytes | str:
+        from uuid import UUID
+
+        try:
+            U = UUID(ID)
+        except (ValueError, AttributeError, TypeError):
+            return ID
+        return U.bytes if str(U) == ID else ID  # Nur kanonische Schreibweise, damit ID exakt erhalten bleibt
+
+    @property
+    def ID(SELF) -> str:
+        if isinstance(SELF._ID, bytes):
+            from uuid import UUID
+            return str(UUID(bytes=SELF._ID))
+        return SELF._ID
+
+    @property
+    def DATE(SELF) -> date:
+        return date.fromordinal(SELF._ORDINAL)
+
+    def __setattr__(SELF, NAME: str, VALUE: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{NAME}'")
+
+    def _KEY(SELF) -> Tuple[str, date, str, int, str]:
+        return (SELF.ID, SELF.DATE, SELF.ITEM, SELF.GRAMS, SELF.REASON)
+
+    def __eq__(SELF, OTHER: object) -> bool:
+        if isinstance(OTHER, (COMPACT_ENTRY, ENTRY)):
+            return SELF._KEY() == (OTHER.ID, OTHER.DATE, OTHER.ITEM, OTHER.GRAMS, OTHER.REASON)
+        return NotImplemented
+
+    def __hash__(SELF) -> int:
+        return hash(SELF._KEY())
+
+    def __repr__(SELF) -> str:
+        return f"COMPACT_ENTRY(ID={SELF.ID!r}, DATE={SELF.DATE!r}, ITEM={SELF.ITEM!r}, GRAMS={SELF.GRAMS!r}, REASON={SELF.REASON!r})"
+
+    def TO_DICT(SELF) -> Dict[str, Any]:
+        return {
+            "ID": SELF.ID,
+            "DATE": SELF.DATE.isoformat(),
+            "ITEM": SELF.ITEM,
+            "GRAMS": SELF.GRAMS,
+            "REASON": SELF.REASON,
+        }
+
+    @staticmethod
+    def FROM_DICT(DATA: Dict[str, Any]) -> "COMPACT_ENTRY":
+        return COMPACT_ENTRY(
             ID=str(DATA["ID"]),
             DATE=datetime.fromisoformat(DATA["DATE"]).date(),
             ITEM=str(DATA["ITEM"]),
             GRAMS=int(DATA["GRAMS"]),
             REASON=str(DATA["REASON"]),
         )
+
+    @staticmethod
+    def FROM_ENTRY(E: ENTRY) -> "COMPACT_ENTRY":
+        return COMPACT_ENTRY(ID=E.ID, DATE=E.DATE, ITEM=E.ITEM, GRAMS=E.GRAMS, REASON=E.REASON)
+
+    def TO_ENTRY(SELF) -> ENTRY:
+        return ENTRY(ID=SELF.ID, DATE=SELF.DATE, ITEM=SELF.ITEM, GRAMS=SELF.GRAMS, REASON=SELF.REASON)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+from .storage import STORAGE
+from .codec import SCAN_JSONL_SUM
+from .analytics import TOTAL_WASTE, TOP_THREE_ITEMS, WASTE_IN_PERIOD, MOST_COMMON_REASON, REPORT, TOP_N_ITEMS, TOP_N_REASONS
+
+# QUERIES beantworten die Analytics-Befehle direkt gegen eine STORAGE.
+# Jeder Befehl deklariert seinen Datenbedarf (NEEDS), PLAN wählt daraus die günstigste Quelle:
+#
+#   NONE        add, import-csv     -> NONE        (es wird nichts gelesen)
+#   SUM         total, average      -> SQL > SIDECAR > COLUMNS > BYTES > SCAN
+#   AGGREGATES  top3, top, common-reason, report -> SQL > SIDECAR > SCAN
+#   RANGE       period              -> SQL > SIDECAR > COLUMNS > DATE_INDEX > SEGMENTS > BYTES > SCAN
+#   ROWS        list                -> SCAN
+#
+# SQL:        Aggregate direkt in SQLite (SUM, GROUP BY ... LIMIT, Bereichsabfrage über den DATE-Index; sqlstore.py)
+# SIDECAR:    laufende Summen aus "<DB>.agg.json" (aggregates.py)
+# COLUMNS:    Summen direkt auf den gemappten Spalten des COLUMNAR-Formats
+# DATE_INDEX: nur Kandidatenblöcke über den Datumsindex (dateindex.py)
+# SEGMENTS:   nur die Monatssegmente, die den Zeitraum überlappen (segments.py)
+# BYTES:      JSONL in großen Blöcken lesen, DATE/GRAMS per Bytes-Regex ohne json.loads (codec.SCAN_JSONL_SUM)
+# SCAN:       Einträge per STORAGE.ITER_ENTRIES streamen und mit analytics.py auswerten
+
+NEEDS = ["NONE", "SUM", "AGGREGATES", "RANGE", "ROWS"]
+
+def PLAN(STORE: STORAGE, NEED: str) -> str:
+    """
+    Gibt die günstigste Datenquelle für den Bedarf NEED zurück (siehe Tabelle oben).
+    """
+    if NEED not in NEEDS:
+        raise ValueError("NEED MUST BE ONE OF: " + ", ".join(NEEDS))
+    if NEED == "NONE":
+        return "NONE"
+    if NEED == "ROWS":
+        return "SCAN"
+    if STORE.FORMAT == "SQLITE":
+        return "SQL"
+    if STORE.SIDECAR is not None:
+        return "SIDECAR"
+    if NEED in ("SUM", "RANGE") and STORE.FORMAT == "COLUMNAR":
+        return "COLUMNS"
+    if NEED == "RANGE":
+        if STORE.DATE_INDEX is not None:
+            return "DATE_INDEX"
+        if STORE.FORMAT == "SEGMENTED":
+            return "SEGMENTS"
+    if NEED in ("SUM", "RANGE") and STORE.FORMAT == "JSONL":
+        return "BYTES"
+    return "SCAN"
+
+def _SUMMARY(STORE: STORAGE, SOURCE: str) -> Any:
+    """
+    Objekt mit den Aggregat-Methoden (TOTAL_WASTE, TOP_ITEMS, ...): SQLite-Backend bzw. Sidecar-Index.
+    """
+    return STORE.BACKEND if SOURCE == "SQL" else STORE.AGGREGATES()
+
+def QUERY_TOTAL(STORE: STORAGE) -> int:
+    SOURCE = PLAN(STORE, "SUM")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).TOTAL_WASTE()
+    if SOURCE == "COLUMNS":
+        return STORE.BACKEND.SUM_GRAMS()
+    if SOURCE == "BYTES":
+        return SCAN_JSONL_SUM(STORE.PATH)[0]
+    return TOTAL_WASTE(STORE.ITER_ENTRIES())
+
+def QUERY_TOP_THREE(STORE: STORAGE) -> List[Tuple[str, int]]:
+    SOURCE = PLAN(STORE, "AGGREGATES")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).TOP_ITEMS(3)
+    return TOP_THREE_ITEMS(STORE.ITER_ENTRIES())
+
+def QUERY_TOP(STORE: STORAGE, N: int, GROUP: str = "ITEM", BY: str = "GRAMS") -> List[Tuple[str, int]]:
+    GROUP = GROUP.upper()
+    BY = BY.upper()
+    SOURCE = PLAN(STORE, "AGGREGATES")
+    if SOURCE == "SQL":
+        if GROUP == "ITEM":
+            return STORE.BACKEND.TOP_ITEMS(N, BY)
+        return STORE.BACKEND.TOP_REASONS(N, BY)
+    if SOURCE == "SIDECAR":
+        if GROUP == "ITEM":
+            return STORE.AGGREGATES().TOP_ITEMS(N, BY)
+        if BY == "COUNT":
+            return STORE.AGGREGATES().TOP_REASONS(N)
+    if GROUP == "ITEM":
+        return TOP_N_ITEMS(STORE.ITER_ENTRIES(), N, BY)
+    return TOP_N_REASONS(STORE.ITER_ENTRIES(), N, BY)
+
+def QUERY_PERIOD(STORE: STORAGE, START: date, END: date) -> int:
+    SOURCE = PLAN(STORE, "RANGE")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).WASTE_IN_PERIOD(START, END)
+    if SOURCE == "COLUMNS":
+        return STORE.BACKEND.SUM_GRAMS(START, END)
+    if SOURCE == "BYTES":
+        return SCAN_JSONL_SUM(STORE.PATH, START, END)[0]
+    if SOURCE == "SCAN":
+        return WASTE_IN_PERIOD(STORE.ITER_ENTRIES(), START, END)
+    # DATE_INDEX / SEGMENTS: STORAGE.ITER_RANGE liest nur die betroffenen Blöcke bzw. Segmente
+    return WASTE_IN_PERIOD(STORE.ITER_RANGE(START, END), START, END)
+
+def QUERY_COMMON_REASON(STORE: STORAGE) -> str | None:
+    SOURCE = PLAN(STORE, "AGGREGATES")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).MOST_COMMON_REASON()
+    return MOST_COMMON_REASON(STORE.ITER_ENTRIES())
+
+def QUERY_AVERAGE(STORE: STORAGE) -> float:
+    SOURCE = PLAN(STORE, "SUM")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).AVERAGE()
+    if SOURCE == "COLUMNS":
+        ROWS = STORE.BACKEND.ROW_COUNT()
+        return STORE.BACKEND.SUM_GRAMS() / ROWS if ROWS else 0
+    if SOURCE == "BYTES":
+        TOTAL, COUNT = SCAN_JSONL_SUM(STORE.PATH)
+        return TOTAL / COUNT if COUNT else 0
+    # Ein Durchlauf: Summe und Anzahl gemeinsam, ohne die Einträge zu sammeln
+    TOTAL = 0
+    COUNT = 0
+    for E in STORE.ITER_ENTRIES():
+        TOTAL += E.GRAMS
+        COUNT += 1
+    return TOTAL / COUNT if COUNT else 0
+
+def QUERY_REPORT(STORE: STORAGE, START: Optional[date] = None, END: Optional[date] = None) -> Dict[str, Any]:
+    SOURCE = PLAN(STORE, "AGGREGATES")
+    if SOURCE in ("SQL", "SIDECAR"):
+        return _SUMMARY(STORE, SOURCE).REPORT(START, END)
+    # Ein Durchlauf über alle Einträge statt fünf getrennter Befehle
+    return REPORT(STORE.ITER_ENTRIES(), START, END)
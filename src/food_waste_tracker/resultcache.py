@@ -0,0 +1,119 @@
+from __future__ import annotations
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Persistenter Ergebnis-Cache für Auswertungen ("<DB>.cache.json" neben der Datenbank).
+#
+# Schlüssel: Befehl, normalisierte Argumente (z.B. Datum als ISO, --by/--metric aufgelöst) und der Zustand der
+# Datendatei (Inode, Größe, mtime_ns). Ein Treffer braucht nur os.stat und die kleine Cache-Datei; die
+# Datendatei wird weder geöffnet noch geparst. Ändert sich die Datei, passt kein alter Schlüssel mehr; Einträge
+# zu anderen Dateiständen werden beim nächsten Speichern entfernt.
+# Verdrängung: LRU (Reihenfolge im JSON-Objekt, zuletzt benutzt am Ende), begrenzt auf MAX_ENTRIES Einträge
+# und MAX_BYTES serialisierte Ergebnisse. HITS/MISSES werden mitgezählt ("cache-stats").
+#
+# Die CLI lädt dieses Modul ohne storage.py; "--no-cache" umgeht den Cache.
+
+CACHED_COMMANDS = ["total", "top3", "top", "period", "common-reason", "average", "report"]
+
+def _STAT_KEY(PATH: str) -> Optional[List[int]]:
+    try:
+        ST = os.stat(PATH)
+    except FileNotFoundError:
+        return None
+    return [ST.st_ino, ST.st_size, ST.st_mtime_ns]
+
+def DATA_KEY(PATH: str, FORMAT: str) -> Optional[List[int]]:
+    """
+    Zustand der Daten als (Inode, Größe, mtime_ns); None, wenn es die Datenbank noch nicht gibt.
+    Verzeichnisse (COLUMNAR, SEGMENTED): Inode des Verzeichnisses, Summe der Größen, neueste mtime, Anzahl Dateien.
+    SQLITE: zusätzlich die WAL-Datei, in der noch nicht übertragene Schreibvorgänge liegen können.
+    """
+    KEY = _STAT_KEY(PATH)
+    if KEY is None:
+        return None
+    if os.path.isdir(PATH):
+        STATS = [E.stat() for E in os.scandir(PATH) if E.is_file()]
+        return [KEY[0], sum(S.st_size for S in STATS), max((S.st_mtime_ns for S in STATS), default=0), len(STATS)]
+    if FORMAT == "SQLITE":
+        return KEY + (_STAT_KEY(PATH + "-wal") or [])
+    return KEY
+
+class RESULT_CACHE:
+    def __init__(SELF, DATA_PATH: str, MAX_ENTRIES: int = 256, MAX_BYTES: int = 256 * 1024) -> None:
+        SELF.PATH = DATA_PATH + ".cache.json"
+        SELF.MAX_ENTRIES = MAX_ENTRIES
+        SELF.MAX_BYTES = MAX_BYTES
+        SELF._DATA: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def KEY(COMMAND: str, ARGS: List[Any], DATA_KEY: List[int]) -> str:
+        return json.dumps([COMMAND, ARGS, DATA_KEY], ensure_ascii=False)
+
+    def _LOAD(SELF) -> Dict[str, Any]:
+        if SELF._DATA is None:
+            try:
+                with open(SELF.PATH, "r", encoding="utf-8") as F:
+                    SELF._DATA = json.load(F)
+                if not isinstance(SELF._DATA, dict) or not isinstance(SELF._DATA.get("ENTRIES"), dict):
+                    raise ValueError("CACHE FORMAT")
+            except (FileNotFoundError, ValueError):
+                SELF._DATA = {"HITS": 0, "MISSES": 0, "ENTRIES": {}}   # Fehlt oder kaputt: leer anfangen
+        return SELF._DATA
+
+    def _SAVE(SELF) -> None:
+        TMP_PATH = SELF.PATH + ".tmp"
+        try:
+            with open(TMP_PATH, "w", encoding="utf-8") as F:
+                json.dump(SELF._LOAD(), F, ensure_ascii=False)
+            os.replace(TMP_PATH, SELF.PATH)
+        except OSError:
+            pass    # Ein Cache, der nicht geschrieben werden kann (z.B. schreibgeschütztes Verzeichnis), stört die Abfrage nicht
+
+    def GET(SELF, KEY: str) -> Tuple[bool, Any]:
+        """
+        Rückgabe: (Treffer, Ergebnis). Ein Treffer wird als zuletzt benutzt markiert.
+        """
+        DATA = SELF._LOAD()
+        ENTRIES = DATA["ENTRIES"]
+        if KEY not in ENTRIES:
+            DATA["MISSES"] = DATA.get("MISSES", 0) + 1     # Gespeichert zusammen mit dem folgenden PUT
+            return False, None
+        ENTRIES[KEY] = ENTRIES.pop(KEY)     # Ans Ende: zuletzt benutzt
+        DATA["HITS"] = DATA.get("HITS", 0) + 1
+        SELF._SAVE()
+        return True, ENTRIES[KEY]
+
+    def PUT(SELF, KEY: str, DATA_KEY: List[int], VALUE: Any) -> None:
+        """
+        Speichert VALUE (JSON-fähig); entfernt Einträge anderer Dateistände und verdrängt die ältesten
+        Einträge, bis MAX_ENTRIES und MAX_BYTES eingehalten sind.
+        """
+        DATA = SELF._LOAD()
+        SUFFIX = json.dumps(DATA_KEY) + "]"
+        ENTRIES = {K: V for K, V in DATA["ENTRIES"].items() if K.endswith(SUFFIX) and K != KEY}
+        ENTRIES[KEY] = VALUE
+        SIZES = {K: len(json.dumps(V, ensure_ascii=False)) for K, V in ENTRIES.items()}
+        TOTAL = sum(SIZES.values())
+        for K in list(ENTRIES):
+            if len(ENTRIES) <= SELF.MAX_ENTRIES and TOTAL <= SELF.MAX_BYTES:
+                break
+            if K == KEY:
+                continue    # Das neue Ergebnis bleibt, auch wenn es allein größer als MAX_BYTES ist
+            TOTAL -= SIZES[K]
+            del ENTRIES[K]
+        DATA["ENTRIES"] = ENTRIES
+        SELF._SAVE()
+
+    def STATS(SELF) -> Dict[str, int]:
+        DATA = SELF._LOAD()
+        return {
+            "HITS": DATA.get("HITS", 0),
+            "MISSES": DATA.get("MISSES", 0),
+            "ENTRIES": len(DATA["ENTRIES"]),
+            "BYTES": sum(len(json.dumps(V, ensure_ascii=False)) for V in DATA["ENTRIES"].values()),
+        }
+
+    def CLEAR(SELF) -> None:
+        SELF._DATA = {"HITS": 0, "MISSES": 0, "ENTRIES": {}}
+        SELF._SAVE()
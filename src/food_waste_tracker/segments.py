@@ -0,0 +1,139 @@
+from __future__ import annotations
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List
+from .models import ENTRY
+from .codec import DECODE_JSONL, DECODE_JSONL_COLUMNS, ENCODE_JSONL
+from .utils import FSYNC_DIRECTORY, RECOVER_DIRECTORY, REPLACE_DIRECTORY
+from .vectorized import COLUMN_BUILDER, COLUMNS
+
+# Segmentiertes Format (FORMAT="SEGMENTED"): Der DB-Pfad ist ein Verzeichnis mit einer JSONL-Datei pro Monat,
+# z.B. "2024-08.jsonl". APPEND wählt das Segment über ENTRY.DATE; Zeitraum-Abfragen öffnen nur die
+# Segmente, deren Monat den Zeitraum überlappt (Partition Pruning).
+
+SEGMENT_PATTERN = re.compile(r"^(\d{4})-(\d{2})\.jsonl$")
+
+def SEGMENT_NAME(D: date) -> str:
+    return f"{D.year:04d}-{D.month:02d}.jsonl"
+
+class SEGMENT_STORE:
+    def __init__(SELF, PATH: Path) -> None:
+        SELF.PATH = PATH
+        RECOVER_DIRECTORY(SELF.PATH)    # Vor mkdir: ein abgebrochenes SAVE_ALL hat PATH womöglich nach PATH.old verschoben
+        SELF.PATH.mkdir(parents=True, exist_ok=True)
+        # Fingerprint über das ganze Verzeichnis (Summe der Größen, neueste mtime), siehe aggregates.FINGERPRINT
+        SELF.FINGERPRINT_PATH = SELF.PATH
+
+    def SEGMENTS(SELF) -> List[Path]:
+        """
+        Gibt alle Segmentdateien chronologisch sortiert zurück.
+        """
+        return sorted(P for P in SELF.PATH.iterdir() if SEGMENT_PATTERN.match(P.name))
+
+    def IS_EMPTY(SELF) -> bool:
+        return all(P.stat().st_size == 0 for P in SELF.SEGMENTS())
+
+    # ---- LESEN ----
+
+    @staticmethod
+    def _ITER_SEGMENT(PATH: Path) -> Iterator[ENTRY]:
+        with PATH.open("r", encoding="utf-8") as F:
+            for LINE in F:
+                LINE = LINE.strip()
+                if not LINE:
+                    continue
+                yield DECODE_JSONL(LINE)
+
+    def ITER_ENTRIES(SELF) -> Iterator[ENTRY]:
+        for P in SELF.SEGMENTS():
+            yield from SELF._ITER_SEGMENT(P)
+
+    def ITER_RANGE(SELF, START: date, END: date) -> Iterator[ENTRY]:
+        """
+        Liefert nur Einträge mit START <= DATE <= END und öffnet dabei nur überlappende Segmente.
+        """
+        FIRST = (START.year, START.month)
+        LAST = (END.year, END.month)
+        for P in SELF.SEGMENTS():
+            M = SEGMENT_PATTERN.match(P.name)
+            if not FIRST <= (int(M.group(1)), int(M.group(2))) <= LAST:
+                continue
+            for E in SELF._ITER_SEGMENT(P):
+                if START <= E.DATE <= END:
+                    yield E
+
+    def TO_COLUMNS(SELF) -> COLUMNS:
+        """
+        Liest alle Segmente direkt in array.array-Spalten (ohne ENTRY-Objekte).
+        """
+        BUILDER = COLUMN_BUILDER()
+        for P in SELF.SEGMENTS():
+            with P.open("r", encoding="utf-8") as F:
+                for LINE in F:
+                    LINE = LINE.strip()
+                    if LINE:
+                        BUILDER.ADD(*DECODE_JSONL_COLUMNS(LINE))
+        return BUILDER.BUILD()
+
+    # ---- SCHREIBEN ----
+
+    @contextmanager
+    def OPEN_WRITER(SELF, SYNC: bool = False) -> Iterator[Callable[[List[ENTRY]], None]]:
+        """
+        Hält pro berührtem Segment ein Dateihandle offen und liefert eine Funktion WRITE(BATCH).
+        Schlägt ein Block fehl, werden alle Segmente auf den Stand vor dem Block gekürzt.
+        SYNC=True: fsync der berührten Segmente (und des Verzeichnisses, wenn ein Segment neu angelegt wurde).
+        """
+        FILES: Dict[str, BinaryIO] = {}
+        try:
+            def WRITE(BATCH: List[ENTRY]) -> None:
+                LINES: Dict[str, List[str]] = {}
+                for E in BATCH:
+                    LINES.setdefault(SEGMENT_NAME(E.DATE), []).append(ENCODE_JSONL(E))
+                CREATED = False
+                for NAME in LINES:
+                    if NAME not in FILES:
+                        CREATED = CREATED or not (SELF.PATH / NAME).exists()
+                        FILES[NAME] = (SELF.PATH / NAME).open("ab", buffering=0)
+                OFFSETS = {NAME: FILES[NAME].tell() for NAME in LINES}
+                try:
+                    for NAME, SEGMENT_LINES in LINES.items():
+                        DATA = memoryview("".join(SEGMENT_LINES).encode("utf-8"))
+                        while DATA:
+                            DATA = DATA[FILES[NAME].write(DATA):]   # write() kann weniger Bytes schreiben als übergeben
+                except BaseException:
+                    for NAME, OFFSET in OFFSETS.items():
+                        FILES[NAME].truncate(OFFSET)
+                    raise
+                if SYNC:
+                    for NAME in LINES:
+                        os.fsync(FILES[NAME].fileno())
+                    if CREATED:
+                        FSYNC_DIRECTORY(SELF.PATH)
+
+            yield WRITE
+        finally:
+            for F in FILES.values():
+                F.close()
+
+    def SAVE_ALL(SELF, ENTRIES: Iterable[ENTRY], BATCH_SIZE: int = 1000) -> None:
+        """
+        Schreibt alle Segmente in ein temporäres Verzeichnis und tauscht es anschließend aus (REPLACE_DIRECTORY).
+        """
+        TMP_PATH = SELF.PATH.with_name(SELF.PATH.name + ".tmp")
+        shutil.rmtree(TMP_PATH, ignore_errors=True)     # Reste eines abgebrochenen Laufs entfernen
+        TMP = SEGMENT_STORE(TMP_PATH)
+        with TMP.OPEN_WRITER() as WRITE:
+            BATCH: List[ENTRY] = []
+            for E in ENTRIES:
+                BATCH.append(E)
+                if len(BATCH) >= BATCH_SIZE:
+                    WRITE(BATCH)
+                    BATCH = []
+            if BATCH:
+                WRITE(BATCH)
+        REPLACE_DIRECTORY(TMP.PATH, SELF.PATH)
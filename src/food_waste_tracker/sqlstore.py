@@ -0,0 +1,218 @@
+from __future__ import annotations
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .models import ENTRY
+from .codec import BUILD_ENTRY, PARSE_ISO_DATE
+from .vectorized import COLUMN_BUILDER, COLUMNS
+
+# SQLite-Format (FORMAT="SQLITE"): Der DB-Pfad ist eine SQLite-Datei (Standardbibliothek sqlite3).
+#
+#   ENTRIES(ID, DATE, ITEM, GRAMS, REASON)   DATE als ISO-Text "YYYY-MM-DD" (sortiert wie das Datum)
+#   IDX_ENTRIES_DATE    (DATE, GRAMS)     Zeitraum-Summen nur aus dem Index
+#   IDX_ENTRIES_ITEM    (ITEM, GRAMS)     GROUP BY ITEM nur aus dem Index
+#   IDX_ENTRIES_REASON  (REASON)
+#
+# WAL-Modus: Leser blockieren den Schreiber nicht und sehen jeweils einen konsistenten Stand.
+# Die Analytics werden als SQL-Aggregate ausgeführt (gleiche Methoden wie aggregates.AGGREGATE_INDEX,
+# siehe queries.PLAN, Quelle "SQL"); ENTRY-Objekte entstehen nur für list und vollständige Durchläufe.
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ENTRIES (
+    ID TEXT NOT NULL,
+    DATE TEXT NOT NULL,
+    ITEM TEXT NOT NULL,
+    GRAMS INTEGER NOT NULL,
+    REASON TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS IDX_ENTRIES_DATE ON ENTRIES (DATE, GRAMS);
+CREATE INDEX IF NOT EXISTS IDX_ENTRIES_ITEM ON ENTRIES (ITEM, GRAMS);
+CREATE INDEX IF NOT EXISTS IDX_ENTRIES_REASON ON ENTRIES (REASON);
+"""
+
+_INSERT = "INSERT INTO ENTRIES (ID, DATE, ITEM, GRAMS, REASON) VALUES (?, ?, ?, ?, ?)"
+_SELECT = "SELECT ID, DATE, ITEM, GRAMS, REASON FROM ENTRIES"
+
+# Wert je Gruppe für TOP_ITEMS/TOP_REASONS (Spaltennamen sind fest, nur die Auswahl ist variabel)
+_METRICS = {"GRAMS": "SUM(GRAMS)", "COUNT": "COUNT(*)"}
+
+def _ROW(E: ENTRY) -> Tuple[str, str, str, int, str]:
+    return (E.ID, E.DATE.isoformat(), E.ITEM, E.GRAMS, E.REASON)
+
+class SQLITE_STORE:
+    def __init__(SELF, PATH: Path) -> None:
+        SELF.PATH = PATH
+        SELF._CONN: Optional[sqlite3.Connection] = None
+        SELF.CONN()     # Legt Datei, Tabelle und Indizes an
+        # Jeder Schreibvorgang endet mit einem Checkpoint in die Hauptdatei (für Sidecar-Fingerprints)
+        SELF.FINGERPRINT_PATH = SELF.PATH
+
+    def _CONNECT(SELF) -> sqlite3.Connection:
+        CONN = sqlite3.connect(str(SELF.PATH), isolation_level=None)    # Transaktionen explizit per BEGIN/COMMIT
+        CONN.execute("PRAGMA journal_mode=WAL")
+        CONN.execute("PRAGMA synchronous=NORMAL")   # Im WAL-Modus trotzdem konsistent nach einem Absturz
+        return CONN
+
+    def CONN(SELF) -> sqlite3.Connection:
+        """
+        Verbindung für Abfragen und Schreibvorgänge (einmal geöffnet; sqlite3 hält die vorbereiteten Statements im Cache).
+        """
+        if SELF._CONN is None:
+            SELF._CONN = SELF._CONNECT()
+            SELF._CONN.executescript(_SCHEMA)
+        return SELF._CONN
+
+    def CLOSE(SELF) -> None:
+        if SELF._CONN is not None:
+            SELF._CONN.close()
+            SELF._CONN = None
+
+    def _VALUE(SELF, SQL: str, PARAMS: Tuple[Any, ...] = ()) -> Any:
+        return SELF.CONN().execute(SQL, PARAMS).fetchone()[0]
+
+    def ROW_COUNT(SELF) -> int:
+        return SELF._VALUE("SELECT COUNT(*) FROM ENTRIES")
+
+    def IS_EMPTY(SELF) -> bool:
+        return SELF.CONN().execute("SELECT 1 FROM ENTRIES LIMIT 1").fetchone() is None
+
+    # ---- LESEN ----
+
+    def _ITER(SELF, SQL: str, PARAMS: Tuple[Any, ...] = ()) -> Iterator[ENTRY]:
+        # Eigene Verbindung: ein laufender Durchlauf sieht einen festen Stand, auch wenn SAVE_ALL währenddessen schreibt
+        CONN = SELF._CONNECT()
+        try:
+            for ID, DATE, ITEM, GRAMS, REASON in CONN.execute(SQL, PARAMS):
+                yield BUILD_ENTRY(ID, PARSE_ISO_DATE(DATE), ITEM, GRAMS, REASON)
+        finally:
+            CONN.close()
+
+    def ITER_ENTRIES(SELF) -> Iterator[ENTRY]:
+        return SELF._ITER(_SELECT + " ORDER BY ROWID")
+
+    def ITER_RANGE(SELF, START: date, END: date) -> Iterator[ENTRY]:
+        # Bereich über IDX_ENTRIES_DATE, danach in Einfügereihenfolge wie die anderen Formate
+        return SELF._ITER(_SELECT + " WHERE DATE BETWEEN ? AND ? ORDER BY ROWID", (START.isoformat(), END.isoformat()))
+
+    def TO_COLUMNS(SELF) -> COLUMNS:
+        BUILDER = COLUMN_BUILDER()
+        for DATE, GRAMS, ITEM, REASON in SELF.CONN().execute("SELECT DATE, GRAMS, ITEM, REASON FROM ENTRIES ORDER BY ROWID"):
+            BUILDER.ADD(PARSE_ISO_DATE(DATE).toordinal(), GRAMS, ITEM, REASON)
+        return BUILDER.BUILD()
+
+    # ---- ANALYTICS ALS SQL (gleiche Schnittstelle wie AGGREGATE_INDEX) ----
+
+    def TOTAL_WASTE(SELF) -> int:
+        return SELF._VALUE("SELECT COALESCE(SUM(GRAMS), 0) FROM ENTRIES")
+
+    def _TOP(SELF, FIELD: str, N: int, BY: str) -> List[Tuple[str, int]]:
+        BY = BY.upper()
+        if BY not in _METRICS:
+            raise ValueError("BY MUST BE 'GRAMS' OR 'COUNT'")
+        if N <= 0:
+            return []
+        # Gleichstand wie analytics.TOP_N: alphabetisch (BINARY-Vergleich der UTF-8-Bytes = Codepoint-Reihenfolge)
+        SQL = f"SELECT {FIELD}, {_METRICS[BY]} AS V FROM ENTRIES GROUP BY {FIELD} ORDER BY V DESC, {FIELD} ASC LIMIT ?"
+        return [(NAME, VALUE) for NAME, VALUE in SELF.CONN().execute(SQL, (N,))]
+
+    def TOP_ITEMS(SELF, N: int = 3, BY: str = "GRAMS") -> List[Tuple[str, int]]:
+        return SELF._TOP("ITEM", N, BY)
+
+    def TOP_REASONS(SELF, N: int = 3, BY: str = "COUNT") -> List[Tuple[str, int]]:
+        return SELF._TOP("REASON", N, BY)
+
+    def WASTE_IN_PERIOD(SELF, START: date, END: date) -> int:
+        return SELF._VALUE("SELECT COALESCE(SUM(GRAMS), 0) FROM ENTRIES WHERE DATE BETWEEN ? AND ?", (START.isoformat(), END.isoformat()))
+
+    def MOST_COMMON_REASON(SELF) -> str | None:
+        # Gleichstand wie _TOP: alphabetisch
+        ROW = SELF.CONN().execute(
+            "SELECT REASON FROM ENTRIES GROUP BY REASON ORDER BY COUNT(*) DESC, REASON ASC LIMIT 1"
+        ).fetchone()
+        return ROW[0] if ROW else None
+
+    def AVERAGE(SELF) -> float:
+        TOTAL, ROWS = SELF.CONN().execute("SELECT COALESCE(SUM(GRAMS), 0), COUNT(*) FROM ENTRIES").fetchone()
+        return TOTAL / ROWS if ROWS else 0
+
+    def REPORT(SELF, START: Optional[date] = None, END: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Alle Kennzahlen wie analytics.REPORT; ein Lesevorgang (eine Transaktion) für einen konsistenten Stand.
+        """
+        CONN = SELF.CONN()
+        CONN.execute("BEGIN")
+        try:
+            TOTAL, ROWS = CONN.execute("SELECT COALESCE(SUM(GRAMS), 0), COUNT(*) FROM ENTRIES").fetchone()
+            PERIOD = None
+            if START is not None or END is not None:
+                S_ISO = START.isoformat() if START is not None else ""
+                E_ISO = END.isoformat() if END is not None else "9999-12-31"
+                PERIOD = SELF._VALUE("SELECT COALESCE(SUM(GRAMS), 0) FROM ENTRIES WHERE DATE BETWEEN ? AND ?", (S_ISO, E_ISO))
+            return {
+                "TOTAL": TOTAL,
+                "COUNT": ROWS,
+                "AVERAGE": TOTAL / ROWS if ROWS else 0,
+                "TOP3": SELF.TOP_ITEMS(3),
+                "MOST_COMMON_REASON": SELF.MOST_COMMON_REASON(),
+                "PERIOD": PERIOD,
+            }
+        finally:
+            CONN.execute("COMMIT")
+
+    # ---- SCHREIBEN ----
+
+    @staticmethod
+    def _CHECKPOINT(CONN: sqlite3.Connection) -> None:
+        # Überträgt das WAL in die Hauptdatei, damit Größe/mtime der Datei jeden Schreibvorgang anzeigen
+        CONN.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    @contextmanager
+    def OPEN_WRITER(SELF, SYNC: bool = False) -> Iterator[Callable[[List[ENTRY]], None]]:
+        """
+        Liefert eine Funktion WRITE(BATCH): ein executemany pro Block in einer eigenen Transaktion.
+        Schlägt ein Block fehl, wird nur dieser Block zurückgerollt.
+        SYNC=True: synchronous=FULL, jedes COMMIT synchronisiert das WAL per fsync.
+        Eigene Verbindung: der Schreiber darf in einem anderen Thread laufen (writer.GROUP_WRITER).
+        """
+        CONN = SELF._CONNECT()
+        if SYNC:
+            CONN.execute("PRAGMA synchronous=FULL")
+
+        def WRITE(BATCH: List[ENTRY]) -> None:
+            CONN.execute("BEGIN")
+            try:
+                CONN.executemany(_INSERT, map(_ROW, BATCH))
+            except BaseException:
+                CONN.execute("ROLLBACK")
+                raise
+            CONN.execute("COMMIT")
+
+        try:
+            yield WRITE
+        finally:
+            SELF._CHECKPOINT(CONN)
+            CONN.close()
+
+    def SAVE_ALL(SELF, ENTRIES: Iterable[ENTRY], BATCH_SIZE: int = 1000) -> None:
+        """
+        Ersetzt alle Einträge in einer einzigen Transaktion (atomar; Leser sehen bis zum COMMIT den alten Stand).
+        ENTRIES darf aus ITER_ENTRIES derselben Datenbank stammen (eigene Leseverbindung).
+        """
+        CONN = SELF.CONN()
+        ROWS = map(_ROW, ENTRIES)
+        CONN.execute("BEGIN IMMEDIATE")
+        try:
+            CONN.execute("DELETE FROM ENTRIES")
+            while True:
+                BATCH = list(islice(ROWS, BATCH_SIZE))
+                if not BATCH:
+                    break
+                CONN.executemany(_INSERT, BATCH)
+        except BaseException:
+            CONN.execute("ROLLBACK")
+            raise
+        CONN.execute("COMMIT")
+        SELF._CHECKPOINT(CONN)
@@ -1,96 +1,381 @@
 from __future__ import annotations
 import csv
-import json
+import io
 import os
+from contextlib import contextmanager
+from datetime import date
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, List
-from .models import ENTRY
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, List
+from .models import COMPACT_ENTRY, ENTRY
+from .codec import CSV_ROW, DECODE_CSV_COLUMNS, DECODE_CSV_ROW, DECODE_JSONL, DECODE_JSONL_COLUMNS, ENCODE_JSONL, FIELDNAMES
 
-# Die Datei speichert und liest Einträge in verschiedenen Formaten (JSONL und CSV).
+if TYPE_CHECKING:
+    from .aggregates import AGGREGATE_INDEX
+    from .dedupe import ID_INDEX
+    from .vectorized import COLUMNS
+
+# Die Datei speichert und liest Einträge in verschiedenen Formaten (JSONL, CSV, COLUMNAR, SEGMENTED und SQLITE).
+# JSONL/CSV werden hier direkt behandelt, weitere Formate über ein BACKEND-Objekt
+# (ITER_ENTRIES, OPEN_WRITER(SYNC), SAVE_ALL, IS_EMPTY, FINGERPRINT_PATH, TO_COLUMNS).
+# Backends, Sidecars und Indizes werden erst importiert, wenn sie gebraucht werden (kurze CLI-Startzeit).
+
+FORMATS = ["JSONL", "CSV", "COLUMNAR", "SEGMENTED", "SQLITE"]
+
+# Wann geschriebene Einträge per fsync auf die Platte gezwungen werden:
+#   none    nie (das Betriebssystem entscheidet; übersteht ein Prozessende, aber keinen Stromausfall)
+#   batch   einmal pro geschriebenem Block (Group Commit)
+#   always  nach jedem einzelnen Eintrag
+DURABILITY_MODES = ["none", "batch", "always"]
 
 class STORAGE:
-    def __init__(SELF, PATH_STR: str | None = None, FORMAT: str = "JSONL") -> None:
+    def __init__(
+        SELF,
+        PATH_STR: str | None = None,
+        FORMAT: str = "JSONL",
+        USE_AGGREGATES: bool = False,
+        USE_DATE_INDEX: bool = False,
+        DURABILITY: str = "none",
+    ) -> None:
         """
         PATH_STR:
             - FILE PATH WHERE DATA IS STORED.
             - IF NONE, USES DEFAULT UNDER USER HOME: ~/.food_waste/data.jsonl
         FORMAT:
-            - "JSONL" OR "CSV" (CASE-INSENSITIVE).
+            - "JSONL", "CSV", "COLUMNAR", "SEGMENTED" OR "SQLITE" (CASE-INSENSITIVE).
         PATH_STR:
             - Dateipfad, an dem die Daten gespeichert sind
             - Wenn keiner angegeben ist, wird der Standardpfad unter dem Benutzerverzeichnis verwendet: ~/.food_waste/data.jsonl
         FORMAT:
-            - "JSONL" oder "CSV" (gross-/kleinschreibung unabhängig).
+            - "JSONL", "CSV", "COLUMNAR", "SEGMENTED" oder "SQLITE" (gross-/kleinschreibung unabhängig).
+            - Bei "COLUMNAR" ist der Pfad ein Verzeichnis mit einer Datei pro Spalte (siehe columnar.py).
+            - Bei "SEGMENTED" ist der Pfad ein Verzeichnis mit einer JSONL-Datei pro Monat (siehe segments.py).
+            - Bei "SQLITE" ist der Pfad eine SQLite-Datenbank mit Indizes auf DATE, ITEM und REASON (siehe sqlstore.py).
+        USE_AGGREGATES:
+            - Pflegt einen Sidecar-Index "<DATEI>.agg.json" mit laufenden Summen (siehe aggregates.py).
+        USE_DATE_INDEX:
+            - Nur JSONL: dünner Datum->Byte-Offset-Index "<DATEI>.dateidx.json" für Zeitraum-Abfragen (siehe dateindex.py).
+        DURABILITY:
+            - "none", "batch" oder "always": fsync nie, pro Block oder pro Eintrag (siehe DURABILITY_MODES).
+        Ein vorhandener ID-Index "<DATEI>.ids.json" (siehe dedupe.py) wird automatisch fortgeschrieben.
         """
-        HOME = Path.home()
-        DEFAULT_DIR = HOME / ".food_waste"
-        DEFAULT_DIR.mkdir(parents=True, exist_ok=True)  # Die Zeile stellt sicher, dass das Verzeichnis existiert, falls nicht, wird es erstellt.
-        DEFAULT_FILE = DEFAULT_DIR / "data.jsonl"
-        SELF.PATH = Path(PATH_STR).expanduser() if PATH_STR else DEFAULT_FILE   # expanduser() ersetzt ~ durch das Benutzerverzeichnis
+        if PATH_STR:
+            SELF.PATH = Path(PATH_STR).expanduser()     # expanduser() ersetzt ~ durch das Benutzerverzeichnis
+        else:
+            # Standardpfad nur berechnen, wenn kein Pfad angegeben ist (Path.home() ist nicht kostenlos)
+            SELF.PATH = Path.home() / ".food_waste" / "data.jsonl"
         SELF.FORMAT = FORMAT.upper()
-        if SELF.FORMAT not in {"JSONL", "CSV"}:
-            raise ValueError("FORMAT MUST BE 'JSONL' OR 'CSV'")
+        if SELF.FORMAT not in FORMATS:
+            raise ValueError("FORMAT MUST BE ONE OF: " + ", ".join(FORMATS))
+        if DURABILITY not in DURABILITY_MODES:
+            raise ValueError("DURABILITY MUST BE ONE OF: " + ", ".join(DURABILITY_MODES))
+        SELF.DURABILITY = DURABILITY
         # Prüftt, ob das Verzeichnis existiert, und erstellt es bei Bedarf
         SELF.PATH.parent.mkdir(parents=True, exist_ok=True)
+        SELF.BACKEND: Any = None
+        if SELF.FORMAT == "COLUMNAR":
+            from .columnar import COLUMNAR_STORE
+            SELF.BACKEND = COLUMNAR_STORE(SELF.PATH)
+        elif SELF.FORMAT == "SEGMENTED":
+            from .segments import SEGMENT_STORE
+            SELF.BACKEND = SEGMENT_STORE(SELF.PATH)
+        elif SELF.FORMAT == "SQLITE":
+            from .sqlstore import SQLITE_STORE
+            SELF.BACKEND = SQLITE_STORE(SELF.PATH)
+        if SELF.BACKEND is not None:
+            IS_NEW = SELF.BACKEND.IS_EMPTY()
+            FINGERPRINT_PATH = SELF.BACKEND.FINGERPRINT_PATH
+        else:
+            IS_NEW = not SELF.PATH.exists() or SELF.PATH.stat().st_size == 0
+            FINGERPRINT_PATH = None
+        SELF._FINGERPRINT_PATH = FINGERPRINT_PATH
+        SELF.SIDECAR: Any = None
+        if USE_AGGREGATES:
+            from .aggregates import AGGREGATE_SIDECAR
+            SELF.SIDECAR = AGGREGATE_SIDECAR(SELF.PATH, FINGERPRINT_PATH)
+        if USE_DATE_INDEX and SELF.FORMAT != "JSONL":
+            raise ValueError("DATE INDEX REQUIRES FORMAT 'JSONL'")
+        SELF.DATE_INDEX: Any = None
+        if USE_DATE_INDEX:
+            from .dateindex import DATE_INDEX
+            SELF.DATE_INDEX = DATE_INDEX(SELF.PATH)
+        SELF.ID_INDEX: Any = None
+        if SELF.PATH.with_name(SELF.PATH.name + ".ids.json").exists():
+            from .dedupe import ID_INDEX
+            SELF.ID_INDEX = ID_INDEX(SELF.PATH, FINGERPRINT_PATH)
         # Prüft, ob die Datei existiert, und erstellt sie bei Bedarf mit dem richtigen Header
-        if not SELF.PATH.exists():
+        if SELF.BACKEND is None and not SELF.PATH.exists():
             if SELF.FORMAT == "JSONL":
                 SELF.PATH.touch()   # Erstellt eine leere Datei
             else:
                 with SELF.PATH.open("w", newline="", encoding="utf-8") as F:    # newline="" verhindert zusätzliche Leerzeilen in Windows
-                    WRITER = csv.DictWriter(F, fieldnames=["ID", "DATE", "ITEM", "GRAMS", "REASON"])
-                    WRITER.writeheader()
+                    csv.writer(F).writerow(FIELDNAMES)
+        # Neue/leere Datei: leeren Index anlegen, damit APPEND ihn direkt fortschreiben kann
+        if SELF.SIDECAR is not None and IS_NEW:
+            from .aggregates import AGGREGATE_INDEX
+            SELF.SIDECAR.SAVE(AGGREGATE_INDEX())
 
     def APPEND(SELF, ENTRY_OBJ: ENTRY) -> None:
         """
         Fügt einen einzelnen Eintrag zum Speicher hinzu.
         """
+        SELF.APPEND_MANY([ENTRY_OBJ])
+
+    def APPEND_MANY(SELF, ENTRIES: Iterable[ENTRY], BATCH_SIZE: int = 1000) -> int:
+        """
+        Hängt viele Einträge über ein einziges, offen gehaltenes Dateihandle an.
+        Jeweils BATCH_SIZE Einträge werden vollständig im Speicher serialisiert und mit einem write() geschrieben.
+        Schlägt das Schreiben eines Blocks fehl, wird die Datei auf den Stand vor dem Block zurückgeschnitten,
+        damit keine halbe Zeile zurückbleibt. Je nach SELF.DURABILITY folgt pro Block bzw. pro Eintrag ein fsync.
+        Rückgabe: Anzahl der geschriebenen Einträge.
+        """
+        if BATCH_SIZE < 1:
+            raise ValueError("BATCH_SIZE MUST BE >= 1")
+        SOURCE = iter(ENTRIES)
+        return SELF.APPEND_BATCHES(iter(lambda: list(islice(SOURCE, BATCH_SIZE)), []))
+
+    def APPEND_BATCHES(SELF, BATCHES: Iterable[List[ENTRY]], DURABILITY: str | None = None) -> int:
+        """
+        Wie APPEND_MANY, aber für bereits gebildete Blöcke (z.B. vom Gruppen-Schreiber in writer.py).
+        Wird BATCHES weitergeschaltet, ist der vorige Block geschrieben und gemäß DURABILITY (Standard: SELF.DURABILITY)
+        synchronisiert. Sidecar-Summen und ID-Index werden am Ende einmal gespeichert.
+        Rückgabe: Anzahl der geschriebenen Einträge.
+        """
+        DURABILITY = DURABILITY or SELF.DURABILITY
+        if DURABILITY not in DURABILITY_MODES:
+            raise ValueError("DURABILITY MUST BE ONE OF: " + ", ".join(DURABILITY_MODES))
+        # Index vor dem Schreiben laden, solange sein Fingerprint noch zur Datei passt
+        AGG = SELF.SIDECAR.LOAD_FRESH() if SELF.SIDECAR is not None else None
+        # ID-Index nur fortschreiben, wenn er zum Stand vor dem Schreiben passt; sonst baut OPEN ihn später neu auf
+        IDS_FRESH = SELF.ID_INDEX is not None and SELF.ID_INDEX.IS_FRESH()
+        WRITTEN = 0
+        try:
+            with SELF._OPEN_WRITER(SYNC=DURABILITY != "none") as WRITE:
+                for BATCH in BATCHES:
+                    if not BATCH:
+                        continue
+                    if DURABILITY == "always":
+                        for E in BATCH:
+                            WRITE([E])  # Ein fsync pro Eintrag
+                    else:
+                        WRITE(BATCH)
+                    WRITTEN += len(BATCH)
+                    SELF._AFTER_WRITE(BATCH, AGG, IDS_FRESH)
+        finally:
+            if SELF.SIDECAR is not None:
+                if AGG is None:
+                    SELF.SIDECAR.INVALIDATE()   # Veralteter Index wird beim nächsten Lesen neu aufgebaut
+                else:
+                    SELF.SIDECAR.SAVE(AGG)
+            if IDS_FRESH:
+                SELF.ID_INDEX.MARK_FRESH(WRITTEN)
+        return WRITTEN
+
+    def _AFTER_WRITE(SELF, BATCH: List[ENTRY], AGG: AGGREGATE_INDEX | None, IDS_FRESH: bool) -> None:
+        """
+        Trägt einen geschriebenen Block in Sidecar-Summen und ID-Index nach.
+        """
+        if AGG is not None:
+            for B in BATCH:
+                AGG.ADD(B)
+        if IDS_FRESH:
+            SELF.ID_INDEX.APPEND(B.ID for B in BATCH)
+
+    @contextmanager
+    def _OPEN_WRITER(SELF, SYNC: bool = False) -> Iterator[Callable[[List[ENTRY]], None]]:
+        """
+        Öffnet das Ziel einmal und liefert eine Funktion WRITE(BATCH), die einen Block vollständig schreibt.
+        SYNC=True: WRITE kehrt erst zurück, wenn der Block per fsync auf der Platte ist.
+        """
+        if SELF.BACKEND is not None:
+            with SELF.BACKEND.OPEN_WRITER(SYNC) as WRITE:
+                yield WRITE
+            return
+        # Binär und ohne zweiten Puffer: der Block selbst ist der Puffer, F.tell()/truncate() sind exakte Byte-Offsets
+        with SELF.PATH.open("ab", buffering=0) as F:
+            NEEDS_HEADER = [SELF.FORMAT == "CSV" and F.tell() == 0]
+
+            def WRITE(BATCH: List[ENTRY]) -> None:
+                SELF._WRITE_BATCH(F, BATCH, NEEDS_HEADER[0])
+                NEEDS_HEADER[0] = False
+                if SYNC:
+                    os.fsync(F.fileno())
+
+            yield WRITE
+
+    def _WRITE_BATCH(SELF, F: Any, BATCH: List[ENTRY], WITH_HEADER: bool) -> None:
+        """
+        Serialisiert einen Block und schreibt ihn in einem Stück; bei Fehlern wird der Block wieder abgeschnitten.
+        """
         if SELF.FORMAT == "JSONL":
-            with SELF.PATH.open("a", encoding="utf-8") as F:    # mode "a" steht für append (anhängen)
-                F.write(json.dumps(ENTRY_OBJ.TO_DICT(), ensure_ascii=False) + "\n")
+            DATA = "".join(map(ENCODE_JSONL, BATCH))
         else:
-            FILE_EXISTS = SELF.PATH.exists() and SELF.PATH.stat().st_size > 0   # Prüft, ob die Datei existiert und nicht leer ist
-            with SELF.PATH.open("a", newline="", encoding="utf-8") as F:
-                WRITER = csv.DictWriter(F, fieldnames=["ID", "DATE", "ITEM", "GRAMS", "REASON"])
-                if not FILE_EXISTS:
-                    WRITER.writeheader()    # Schreibt den Header (WRITER), wenn die Datei neu ist
-                WRITER.writerow(ENTRY_OBJ.TO_DICT())    # writerow schreibt eine einzelne Zeile in die CSV-Datei
+            BUF = io.StringIO()
+            WRITER = csv.writer(BUF)    # Gleiche Ausgabe wie csv.DictWriter, aber ohne Zwischen-Dict pro Zeile
+            if WITH_HEADER:
+                WRITER.writerow(FIELDNAMES)    # Schreibt den Header, wenn die Datei neu ist
+            WRITER.writerows(map(CSV_ROW, BATCH))
+            DATA = BUF.getvalue()
+        PAYLOAD = memoryview(DATA.encode("utf-8"))
+        OFFSET = F.tell()
+        try:
+            while PAYLOAD:
+                PAYLOAD = PAYLOAD[F.write(PAYLOAD):]    # write() kann weniger Bytes schreiben als übergeben
+        except BaseException:
+            F.truncate(OFFSET)
+            raise
 
     def SAVE_ALL(SELF, ENTRIES: Iterable[ENTRY]) -> None:
         """
         Schreibt den gesamten Datensatz atomar neu, um Datenverlust zu vermeiden, weil APPEND nicht für alle Einträge geeignet ist.
         """
+        from .aggregates import AGGREGATE_INDEX
+
         TMP_PATH = SELF.PATH.with_suffix(SELF.PATH.suffix + ".tmp")
-        if SELF.FORMAT == "JSONL":
+        AGG = AGGREGATE_INDEX()
+        ENTRIES = SELF._TRACK(ENTRIES, AGG) if SELF.SIDECAR is not None else ENTRIES
+        if SELF.BACKEND is not None:
+            SELF.BACKEND.SAVE_ALL(ENTRIES)
+        elif SELF.FORMAT == "JSONL":
             with TMP_PATH.open("w", encoding="utf-8") as F:
-                for E in ENTRIES:
-                    F.write(json.dumps(E.TO_DICT(), ensure_ascii=False) + "\n")
+                F.writelines(map(ENCODE_JSONL, ENTRIES))
+                SELF._SYNC_BEFORE_REPLACE(F)
         else:
             with TMP_PATH.open("w", newline="", encoding="utf-8") as F:
-                WRITER = csv.DictWriter(F, fieldnames=["ID", "DATE", "ITEM", "GRAMS", "REASON"])
-                WRITER.writeheader()
-                for E in ENTRIES:
-                    WRITER.writerow(E.TO_DICT())
-        os.replace(TMP_PATH, SELF.PATH)
+                WRITER = csv.writer(F)
+                WRITER.writerow(FIELDNAMES)
+                WRITER.writerows(map(CSV_ROW, ENTRIES))
+                SELF._SYNC_BEFORE_REPLACE(F)
+        if SELF.BACKEND is None:
+            os.replace(TMP_PATH, SELF.PATH)
+        if SELF.SIDECAR is not None:
+            SELF.SIDECAR.SAVE(AGG)
+        if SELF.DATE_INDEX is not None:
+            SELF.DATE_INDEX.INVALIDATE()    # Offsets passen nach dem Umschreiben nicht mehr
+        if SELF.ID_INDEX is not None:
+            SELF.ID_INDEX.REBUILD(E.ID for E in SELF.ITER_ENTRIES())
+
+    def _SYNC_BEFORE_REPLACE(SELF, F: Any) -> None:
+        # Ohne fsync vor os.replace kann nach einem Absturz eine leere Datei an der Stelle der alten stehen
+        if SELF.DURABILITY != "none":
+            F.flush()
+            os.fsync(F.fileno())
 
-    def READ_ALL(SELF) -> List[ENTRY]:
+    @staticmethod
+    def _TRACK(ENTRIES: Iterable[ENTRY], AGG: AGGREGATE_INDEX) -> Iterable[ENTRY]:
         """
-        Liest alle Einträge aus dem Speicher.
+        Reicht die Einträge durch und zählt sie dabei in AGG mit.
         """
-        RESULT: List[ENTRY] = []
+        for E in ENTRIES:
+            AGG.ADD(E)
+            yield E
+
+    def AGGREGATES(SELF) -> AGGREGATE_INDEX:
+        """
+        Gibt die laufenden Summen zurück. Ist der Sidecar-Index veraltet oder fehlt er,
+        wird er einmal aus der Datendatei neu aufgebaut und gespeichert.
+        Ohne USE_AGGREGATES wird der Index nur im Speicher berechnet.
+        """
+        from .aggregates import AGGREGATE_INDEX
+
+        if SELF.SIDECAR is None:
+            return AGGREGATE_INDEX.BUILD(SELF.ITER_ENTRIES())
+        AGG = SELF.SIDECAR.LOAD_FRESH()
+        if AGG is None:
+            AGG = AGGREGATE_INDEX.BUILD(SELF.ITER_ENTRIES())
+            SELF.SIDECAR.SAVE(AGG)
+        return AGG
+
+    def IDS(SELF) -> ID_INDEX:
+        """
+        Gibt den ID-Index für Duplikatprüfungen zurück. Beim ersten Aufruf wird er angelegt bzw. geladen;
+        fehlt er oder ist er veraltet, wird er einmal aus der Datendatei aufgebaut (siehe dedupe.py).
+        """
+        if SELF.ID_INDEX is None:
+            from .dedupe import ID_INDEX
+            SELF.ID_INDEX = ID_INDEX(SELF.PATH, SELF._FINGERPRINT_PATH)
+        if SELF.ID_INDEX.BLOOM is None:
+            SELF.ID_INDEX.OPEN(SELF.ITER_ENTRIES)
+        return SELF.ID_INDEX
+
+    def ITER_ENTRIES(SELF) -> Iterator[ENTRY]:
+        """
+        Liefert die Einträge einzeln als Generator (konstanter Speicherbedarf).
+        Wird die Schleife des Aufrufers abgebrochen, wird die Datei sofort geschlossen.
+        """
+        if SELF.BACKEND is not None:
+            yield from SELF.BACKEND.ITER_ENTRIES()
+            return
         if not SELF.PATH.exists():
-            return RESULT
+            return
         if SELF.FORMAT == "JSONL":
             with SELF.PATH.open("r", encoding="utf-8") as F:
                 for LINE in F:
                     LINE = LINE.strip()
                     if not LINE:
                         continue
-                    DATA = json.loads(LINE)
-                    RESULT.append(ENTRY.FROM_DICT(DATA))
+                    yield DECODE_JSONL(LINE)
         else:
             with SELF.PATH.open("r", newline="", encoding="utf-8") as F:
-                READER = csv.DictReader(F)
+                READER = csv.reader(F)
+                HEADER = next(READER, None)
+                if HEADER is None:
+                    return
+                POSITIONS = [HEADER.index(NAME) for NAME in FIELDNAMES]    # Spaltenreihenfolge aus dem Header
                 for ROW in READER:
-                    RESULT.append(ENTRY.FROM_DICT(ROW))
-        return RESULT
+                    if ROW:     # Leerzeilen überspringen wie csv.DictReader
+                        yield DECODE_CSV_ROW(ROW, POSITIONS)
+
+    def ITER_RANGE(SELF, START: date, END: date) -> Iterator[ENTRY]:
+        """
+        Liefert nur Einträge mit START <= DATE <= END.
+        Backends mit eigener Zeitraum-Suche (z.B. SEGMENTED) und der Datumsindex lesen dabei nur die betroffenen Teile.
+        """
+        if SELF.DATE_INDEX is not None:
+            yield from SELF.DATE_INDEX.ITER_RANGE(START, END)
+            return
+        if SELF.BACKEND is not None and hasattr(SELF.BACKEND, "ITER_RANGE"):
+            yield from SELF.BACKEND.ITER_RANGE(START, END)
+            return
+        for E in SELF.ITER_ENTRIES():
+            if START <= E.DATE <= END:
+                yield E
+
+    def TO_COLUMNS(SELF) -> COLUMNS:
+        """
+        Gibt alle Einträge spaltenweise zurück (Buffer-Protokoll, z.B. für np.asarray), ohne ENTRY-Objekte zu erzeugen.
+        Bei COLUMNAR sind die Spalten memoryviews auf die Dateien selbst; nach Gebrauch COLUMNS.CLOSE() aufrufen
+        oder COLUMNS als Kontextmanager verwenden (siehe vectorized.py).
+        """
+        if SELF.BACKEND is not None:
+            return SELF.BACKEND.TO_COLUMNS()
+        from .vectorized import COLUMN_BUILDER
+
+        BUILDER = COLUMN_BUILDER()
+        if not SELF.PATH.exists():
+            return BUILDER.BUILD()
+        if SELF.FORMAT == "JSONL":
+            with SELF.PATH.open("r", encoding="utf-8") as F:
+                for LINE in F:
+                    LINE = LINE.strip()
+                    if LINE:
+                        BUILDER.ADD(*DECODE_JSONL_COLUMNS(LINE))
+        else:
+            with SELF.PATH.open("r", newline="", encoding="utf-8") as F:
+                READER = csv.reader(F)
+                HEADER = next(READER, None)
+                if HEADER is not None:
+                    POSITIONS = [HEADER.index(NAME) for NAME in FIELDNAMES]
+                    for ROW in READER:
+                        if ROW:
+                            BUILDER.ADD(*DECODE_CSV_COLUMNS(ROW, POSITIONS))
+        return BUILDER.BUILD()
+
+    def READ_ALL(SELF, COMPACT: bool = False) -> List[ENTRY]:
+        """
+        Liest alle Einträge aus dem Speicher.
+        COMPACT=True liefert speichersparende COMPACT_ENTRY-Objekte (gleiche API, siehe models.py).
+        """
+        if COMPACT:
+            return [COMPACT_ENTRY.FROM_ENTRY(E) for E in SELF.ITER_ENTRIES()]  # type: ignore[misc]
+        return list(SELF.ITER_ENTRIES())
@@ -1,9 +1,67 @@
 from __future__ import annotations
+import os
 from datetime import datetime, date
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
 
 # UTILS FOR DATE PARSING AND VALIDATION.
 
+DATE_FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%Y/%m/%d"]
+
+def _PARSE_WITH_FORMAT(VAL: str, FMT: str) -> date:
+    """
+    Parst VAL (bereits gestrippt) mit genau einem Format.
+    Für die üblichen 10-Zeichen-Schreibweisen gibt es einen schnellen Weg ohne strptime,
+    alles andere (z.B. "1.2.2025") geht weiterhin über datetime.strptime.
+    """
+    if len(VAL) == 10 and VAL.isascii():
+        if FMT == "%Y-%m-%d" and VAL[4] == "-" and VAL[7] == "-":
+            return date.fromisoformat(VAL)
+        if FMT == "%d.%m.%Y" and VAL[2] == "." and VAL[5] == "." and (VAL[:2] + VAL[3:5] + VAL[6:]).isdigit():
+            return date(int(VAL[6:]), int(VAL[3:5]), int(VAL[:2]))
+        if FMT == "%Y/%m/%d" and VAL[4] == "/" and VAL[7] == "/" and (VAL[:4] + VAL[5:7] + VAL[8:]).isdigit():
+            return date(int(VAL[:4]), int(VAL[5:7]), int(VAL[8:]))
+    return datetime.strptime(VAL, FMT).date()
+
+class DATE_PARSER:
+    """
+    Datumsparser für viele Werte desselben Ursprungs (z.B. eine CSV-Spalte).
+    - Das erste erfolgreich erkannte Format wird festgehalten (LOCKED) und bei allen weiteren Werten zuerst probiert.
+    - Wiederholte Datums-Strings werden in einem begrenzten LRU-Cache gemerkt (Importe haben nur wenige tausend verschiedene Daten).
+    """
+
+    def __init__(SELF, FORMATS: Optional[List[str]] = None, CACHE_SIZE: int = 4096) -> None:
+        SELF.FORMATS = list(FORMATS or DATE_FORMATS)
+        SELF.LOCKED: Optional[str] = None
+        SELF._CACHED = lru_cache(maxsize=CACHE_SIZE)(SELF._PARSE)
+
+    def __call__(SELF, VAL: str) -> date:
+        return SELF._CACHED(VAL.strip())
+
+    def _PARSE(SELF, VAL: str) -> date:
+        if SELF.LOCKED is not None:
+            try:
+                return _PARSE_WITH_FORMAT(VAL, SELF.LOCKED)
+            except ValueError:
+                pass    # Einzelne Abweichler dürfen ein anderes Format haben
+        LAST_ERROR: Exception | None = None
+        for F in SELF.FORMATS:
+            if F == SELF.LOCKED:
+                continue
+            try:
+                RESULT = _PARSE_WITH_FORMAT(VAL, F)
+            except ValueError as E:
+                LAST_ERROR = E
+                continue
+            if SELF.LOCKED is None:
+                SELF.LOCKED = F
+            return RESULT
+        raise ValueError(f"UNSUPPORTED DATE FORMAT: {VAL}") from LAST_ERROR
+
+# Gemeinsamer Parser für Einzelwerte (CLI-Argumente, ENTRY.CREATE)
+_DEFAULT_PARSER = DATE_PARSER()
+
 def PARSE_DATE(VAL: str) -> date:
     """
     Formattiere einen datums-string in einige gängige formate:
@@ -11,14 +69,7 @@ def PARSE_DATE(VAL: str) -> date:
         - DD.MM.YYYY
         - YYYY/MM/DD
     """
-    FORMATS = ["%Y-%m-%d", "%d.%m.%Y", "%Y/%m/%d"]
-    LAST_ERROR: Exception | None = None
-    for F in FORMATS:
-        try:
-            return datetime.strptime(VAL.strip(), F).date()     # Versucht, das Datum zu parsen
-        except Exception as E:  # noqa: BLE001
-            LAST_ERROR = E
-    raise ValueError(f"UNSUPPORTED DATE FORMAT: {VAL}") from LAST_ERROR
+    return _DEFAULT_PARSER(VAL)
 
 def PARSE_INT_NONNEGATIVE(VAL: str) -> int:
     """
@@ -29,6 +80,60 @@ def PARSE_INT_NONNEGATIVE(VAL: str) -> int:
         raise ValueError("VALUE MUST BE NON-NEGATIVE")
     return X
 
+def PARSE_INT_POSITIVE(VAL: str) -> int:
+    """
+    Formatiert einen positiven Integer (>= 1) aus einem String.
+    """
+    X = int(VAL)
+    if X < 1:
+        raise ValueError("VALUE MUST BE POSITIVE")
+    return X
+
+def FSYNC_DIRECTORY(PATH: str | os.PathLike[str]) -> None:
+    """
+    Macht neu angelegte, umbenannte oder gelöschte Dateinamen im Verzeichnis PATH dauerhaft
+    (unter Windows lassen sich Verzeichnisse nicht öffnen, dort ohne Wirkung).
+    """
+    if os.name == "nt":
+        return
+    FD = os.open(PATH, os.O_RDONLY)
+    try:
+        os.fsync(FD)
+    finally:
+        os.close(FD)
+
+def REPLACE_DIRECTORY(TMP: Path, PATH: Path) -> None:
+    """
+    Ersetzt das Verzeichnis PATH durch TMP. os.replace kann kein nicht leeres Verzeichnis überschreiben, daher
+    PATH -> PATH.old, TMP -> PATH, dann PATH.old löschen. Zwischen den beiden Umbenennungen fehlt PATH;
+    bricht der Prozess dort ab, holt RECOVER_DIRECTORY beim nächsten Öffnen den alten Stand zurück.
+    """
+    import shutil
+
+    OLD = PATH.with_name(PATH.name + ".old")
+    os.replace(PATH, OLD)
+    os.replace(TMP, PATH)
+    FSYNC_DIRECTORY(PATH.parent)
+    shutil.rmtree(OLD, ignore_errors=True)  # Reste löscht RECOVER_DIRECTORY beim nächsten Öffnen
+
+def RECOVER_DIRECTORY(PATH: Path) -> None:
+    """
+    Räumt die Reste eines abgebrochenen REPLACE_DIRECTORY auf (vor dem Öffnen von PATH aufrufen):
+    - PATH fehlt, PATH.old existiert: Abbruch zwischen den Umbenennungen, der alte Stand wird zurückbenannt
+      (das unterbrochene Neuschreiben gilt als nicht erfolgt).
+    - PATH und PATH.old existieren: der Austausch war fertig, PATH.old wird gelöscht.
+    """
+    OLD = PATH.with_name(PATH.name + ".old")
+    if not OLD.is_dir():
+        return
+    if not PATH.exists():
+        os.replace(OLD, PATH)
+        FSYNC_DIRECTORY(PATH.parent)
+    else:
+        import shutil
+
+        shutil.rmtree(OLD)
+
 def OPTIONAL_STRIP(VAL: Optional[str]) -> Optional[str]:
     """
     Stript den String oder gibt None zurück.
@@ -0,0 +1,177 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date
+from itertools import islice
+from operator import le
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .analytics import TOP_N
+
+# Vektorisierte Analytics auf Spalten (COLUMNS) statt auf ENTRY-Objekten.
+# Ist NumPy installiert, rechnen die Funktionen mit np.sum / np.add.at / np.bincount / searchsorted,
+# sonst mit reinem Python auf den array.array-Spalten. analytics.py bleibt die Referenz.
+# NumPy wird erst beim ersten Aufruf importiert (optional und teuer beim Start).
+
+_NUMPY: List[Any] = []     # [] = noch nicht versucht, [None] = nicht installiert, [MODUL] = geladen
+
+class COLUMNS:
+    """
+    Spaltenweise Sicht auf alle Einträge (Buffer-Protokoll: array.array oder memoryview).
+
+    Felder:
+    - DATES: Datum als int-Ordinalzahl (date.toordinal()).
+    - GRAMS: Gramm.
+    - ITEM_CODES / ITEMS: Code je Zeile und Wörterbuch (Code -> ITEM), Codes in Reihenfolge des ersten Auftretens.
+    - REASON_CODES / REASONS: entsprechend für REASON.
+
+    Spalten aus dem COLUMNAR-Format sind memoryviews direkt auf die gemappten Dateien (ohne Kopie);
+    CLOSE() bzw. der Kontextmanager gibt die Mappings wieder frei.
+
+    SORTED: ob DATES aufsteigend sortiert ist. COLUMN_BUILDER setzt es beim Bauen; fehlt es (None), prüft IS_SORTED()
+    es beim ersten Aufruf und merkt es sich, statt die Spalte bei jeder Abfrage erneut zu durchlaufen.
+    """
+
+    def __init__(
+        SELF,
+        DATES: Sequence[int],
+        GRAMS: Sequence[int],
+        ITEM_CODES: Sequence[int],
+        ITEMS: List[str],
+        REASON_CODES: Sequence[int],
+        REASONS: List[str],
+        RESOURCES: Optional[List[Any]] = None,
+        SORTED: Optional[bool] = None,
+    ) -> None:
+        SELF.DATES = DATES
+        SELF.GRAMS = GRAMS
+        SELF.ITEM_CODES = ITEM_CODES
+        SELF.ITEMS = ITEMS
+        SELF.REASON_CODES = REASON_CODES
+        SELF.REASONS = REASONS
+        SELF._RESOURCES = RESOURCES or []
+        SELF.SORTED = SORTED
+
+    def __len__(SELF) -> int:
+        return len(SELF.GRAMS)
+
+    def IS_SORTED(SELF, USE_NUMPY: Optional[bool] = None) -> bool:
+        if SELF.SORTED is None:
+            np = _NP(USE_NUMPY)
+            if np is not None:
+                DATES = np.asarray(SELF.DATES)
+                SELF.SORTED = bool(np.all(DATES[1:] >= DATES[:-1]))
+            else:
+                SELF.SORTED = _ASCENDING(SELF.DATES)
+        return SELF.SORTED
+
+    def CLOSE(SELF) -> None:
+        for COLUMN in (SELF.DATES, SELF.GRAMS, SELF.ITEM_CODES, SELF.REASON_CODES):
+            if isinstance(COLUMN, memoryview):
+                COLUMN.release()
+        for RESOURCE in SELF._RESOURCES:
+            try:
+                RESOURCE.close()
+            except BufferError:
+                pass    # Noch exportierte Puffer (z.B. NumPy-Arrays): Freigabe übernimmt der Garbage Collector
+        SELF._RESOURCES = []
+
+    def __enter__(SELF) -> "COLUMNS":
+        return SELF
+
+    def __exit__(SELF, *EXC: Any) -> None:
+        SELF.CLOSE()
+
+class COLUMN_BUILDER:
+    """
+    Sammelt Rohwerte zeilenweise in array.array-Spalten und vergibt Wörterbuch-Codes.
+    """
+
+    def __init__(SELF) -> None:
+        SELF.DATES = array("i")
+        SELF.GRAMS = array("q")
+        SELF.ITEM_CODES = array("i")
+        SELF.REASON_CODES = array("i")
+        SELF._ITEMS: Dict[str, int] = {}
+        SELF._REASONS: Dict[str, int] = {}
+
+    def ADD(SELF, ORDINAL: int, GRAMS: int, ITEM: str, REASON: str) -> None:
+        SELF.DATES.append(ORDINAL)
+        SELF.GRAMS.append(GRAMS)
+        SELF.ITEM_CODES.append(SELF._ITEMS.setdefault(ITEM, len(SELF._ITEMS)))
+        SELF.REASON_CODES.append(SELF._REASONS.setdefault(REASON, len(SELF._REASONS)))
+
+    def BUILD(SELF) -> COLUMNS:
+        return COLUMNS(
+            SELF.DATES, SELF.GRAMS, SELF.ITEM_CODES, list(SELF._ITEMS), SELF.REASON_CODES, list(SELF._REASONS),
+            SORTED=_ASCENDING(SELF.DATES),
+        )
+
+def _ASCENDING(VALUES: Sequence[int]) -> bool:
+    return all(map(le, VALUES, islice(VALUES, 1, None)))
+
+def _NP(USE_NUMPY: Optional[bool]) -> Any:
+    """
+    Gibt das NumPy-Modul zurück, wenn es verwendet werden soll und installiert ist, sonst None.
+    """
+    if USE_NUMPY is not None and not USE_NUMPY:
+        return None
+    if not _NUMPY:
+        try:
+            import numpy
+            _NUMPY.append(numpy)
+        except ImportError:  # NumPy ist optional
+            _NUMPY.append(None)
+    return _NUMPY[0]
+
+def TOTAL_WASTE(COLS: COLUMNS, USE_NUMPY: Optional[bool] = None) -> int:
+    np = _NP(USE_NUMPY)
+    if np is not None:
+        return int(np.sum(np.asarray(COLS.GRAMS), dtype=np.int64))
+    return sum(COLS.GRAMS)
+
+def TOP_THREE_ITEMS(COLS: COLUMNS, USE_NUMPY: Optional[bool] = None) -> List[Tuple[str, int]]:
+    np = _NP(USE_NUMPY)
+    if np is not None:
+        CODES = np.asarray(COLS.ITEM_CODES)
+        # Summen in int64 (bincount mit weights rechnet in float64 und rundet oberhalb von 2**53)
+        SUMS = np.zeros(len(COLS.ITEMS), dtype=np.int64)
+        np.add.at(SUMS, CODES, np.asarray(COLS.GRAMS, dtype=np.int64))
+        PRESENT = np.flatnonzero(np.bincount(CODES, minlength=len(COLS.ITEMS)) > 0)
+        # Gleichstand wie analytics.TOP_N: alphabetisch nach Name (Rang des Namens als zweiter Sortierschlüssel)
+        NAME_RANK = np.empty(len(COLS.ITEMS), dtype=np.int64)
+        NAME_RANK[sorted(range(len(COLS.ITEMS)), key=COLS.ITEMS.__getitem__)] = np.arange(len(COLS.ITEMS))
+        ORDER = PRESENT[np.lexsort((NAME_RANK[PRESENT], -SUMS[PRESENT]))]
+        return [(COLS.ITEMS[int(C)], int(SUMS[C])) for C in ORDER[:3]]
+    TOTALS: Dict[int, int] = {}
+    for C, G in zip(COLS.ITEM_CODES, COLS.GRAMS):
+        TOTALS[C] = TOTALS.get(C, 0) + G
+    return TOP_N({COLS.ITEMS[C]: G for C, G in TOTALS.items()}, 3)
+
+def WASTE_IN_PERIOD(COLS: COLUMNS, START: date, END: date, USE_NUMPY: Optional[bool] = None) -> int:
+    S_ORD = START.toordinal()
+    E_ORD = END.toordinal()
+    np = _NP(USE_NUMPY)
+    if np is not None:
+        DATES = np.asarray(COLS.DATES)
+        GRAMS = np.asarray(COLS.GRAMS)
+        if DATES.size and COLS.IS_SORTED(USE_NUMPY):
+            # Sortierte Daten: Grenzen per Binärsuche, dann Summe über den zusammenhängenden Ausschnitt
+            LO = int(np.searchsorted(DATES, S_ORD, side="left"))
+            HI = int(np.searchsorted(DATES, E_ORD, side="right"))
+            return int(np.sum(GRAMS[LO:HI], dtype=np.int64))
+        return int(np.sum(GRAMS[(DATES >= S_ORD) & (DATES <= E_ORD)], dtype=np.int64))
+    if COLS.IS_SORTED(USE_NUMPY):
+        LO = bisect_left(COLS.DATES, S_ORD)
+        return sum(islice(COLS.GRAMS, LO, bisect_right(COLS.DATES, E_ORD, LO)))
+    return sum(G for D, G in zip(COLS.DATES, COLS.GRAMS) if S_ORD <= D <= E_ORD)
+
+def MOST_COMMON_REASON(COLS: COLUMNS, USE_NUMPY: Optional[bool] = None) -> str | None:
+    if len(COLS) == 0:
+        return None
+    np = _NP(USE_NUMPY)
+    if np is not None:
+        COUNTS = np.bincount(np.asarray(COLS.REASON_CODES), minlength=len(COLS.REASONS))
+        # Gleichstand wie analytics.TOP_N: alphabetisch nach Name
+        return min(COLS.REASONS[int(C)] for C in np.flatnonzero(COUNTS == COUNTS.max()))
+    return TOP_N({COLS.REASONS[C]: N for C, N in Counter(COLS.REASON_CODES).items()}, 1)[0][0]
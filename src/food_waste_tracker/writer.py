@@ -0,0 +1,189 @@
+from __future__ import annotations
+import atexit
+import queue
+import threading
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
+from .models import ENTRY
+from .storage import DURABILITY_MODES, STORAGE
+
+# Gruppen-Schreiber (Write-Behind mit Group Commit).
+#
+# APPEND legt Einträge in eine begrenzte Warteschlange und kehrt sofort zurück; ist sie voll, wartet der
+# Aufrufer (Rückstau statt unbegrenztem Speicher). APPEND_MANY reiht Teilblöcke statt einzelner Einträge ein
+# (ein Warteschlangen-Zugriff pro Teilblock); die Grenze MAX_QUEUE zählt trotzdem Einträge. Ein einzelner
+# Hintergrund-Thread nimmt jeweils alles, was gerade ansteht (höchstens MAX_BATCH Einträge), und schreibt es als
+# einen Block über STORAGE.APPEND_BATCHES: ein offenes Dateihandle, ein write() und - je nach DURABILITY - ein fsync pro Block.
+# Unter Last werden die Blöcke von selbst größer, die Kosten eines fsync verteilen sich auf viele Einträge.
+#
+# FLUSH wartet, bis alle vorher angenommenen Einträge geschrieben (und synchronisiert) sind. CLOSE bzw. das
+# Verlassen des with-Blocks schreibt den Rest und speichert Sidecar-Summen/ID-Index; beim Interpreter-Ende
+# geschieht das über atexit auch ohne ausdrückliches CLOSE.
+
+class _STOP:
+    """
+    Markiert das Ende der Warteschlange.
+    """
+
+class GROUP_WRITER:
+    def __init__(
+        SELF,
+        STORE: STORAGE,
+        DURABILITY: Optional[str] = None,
+        MAX_QUEUE: int = 10_000,
+        MAX_BATCH: int = 1000,
+    ) -> None:
+        """
+        STORE:      Ziel der Einträge; während der Schreiber läuft, schreibt nur er in STORE.
+        DURABILITY: "none", "batch" oder "always" (Standard: STORE.DURABILITY, siehe storage.DURABILITY_MODES).
+        MAX_QUEUE:  höchstens so viele Einträge warten; APPEND blockiert, bis wieder Platz ist.
+        MAX_BATCH:  höchstens so viele Einträge pro Group Commit.
+        """
+        DURABILITY = DURABILITY or STORE.DURABILITY
+        if DURABILITY not in DURABILITY_MODES:
+            raise ValueError("DURABILITY MUST BE ONE OF: " + ", ".join(DURABILITY_MODES))
+        if MAX_QUEUE < 1 or MAX_BATCH < 1:
+            raise ValueError("MAX_QUEUE AND MAX_BATCH MUST BE >= 1")
+        SELF.STORE = STORE
+        SELF.DURABILITY = DURABILITY
+        SELF.MAX_QUEUE = MAX_QUEUE
+        SELF.MAX_BATCH = MAX_BATCH
+        SELF.WRITTEN = 0    # Geschriebene Einträge
+        SELF.COMMITS = 0    # Geschriebene Blöcke (Group Commits)
+        SELF._QUEUE: "queue.Queue[Any]" = queue.Queue()   # Begrenzt über _QUEUED (Einträge), FLUSH-Marken zählen nicht
+        SELF._QUEUED = 0
+        SELF._SPACE = threading.Condition()
+        SELF._WAITING: List[threading.Event] = []   # FLUSH-Marken des Blocks, der gerade geschrieben wird
+        SELF._ERROR: Optional[BaseException] = None
+        SELF._CLOSED = False
+        SELF._LOCK = threading.Lock()
+        # Daemon-Thread: läuft bis nach den atexit-Funktionen weiter, CLOSE dort schreibt also noch alles
+        SELF._THREAD = threading.Thread(target=SELF._RUN, name="food-waste-writer", daemon=True)
+        SELF._THREAD.start()
+        atexit.register(SELF.CLOSE)
+
+    def __enter__(SELF) -> "GROUP_WRITER":
+        return SELF
+
+    def __exit__(SELF, *EXC: Any) -> None:
+        SELF.CLOSE()
+
+    # ---- AUFRUFER ----
+
+    def _CHECK(SELF) -> None:
+        if SELF._ERROR is not None:
+            raise RuntimeError("GROUP WRITER FAILED") from SELF._ERROR
+        if SELF._CLOSED:
+            raise RuntimeError("GROUP WRITER IS CLOSED")
+
+    def APPEND(SELF, ENTRY_OBJ: ENTRY) -> None:
+        """
+        Nimmt einen Eintrag an; blockiert nur, wenn die Warteschlange voll ist.
+        """
+        SELF.APPEND_MANY((ENTRY_OBJ,))
+
+    def APPEND_MANY(SELF, ENTRIES: Iterable[ENTRY]) -> None:
+        """
+        Nimmt Einträge an und reiht sie in Teilblöcken zu höchstens MAX_BATCH (bzw. MAX_QUEUE) Einträgen ein.
+        Ein Teilblock wird erst eingereiht, wenn er vollständig ist und in die Warteschlange passt.
+        """
+        SOURCE = iter(ENTRIES)
+        SIZE = min(SELF.MAX_BATCH, SELF.MAX_QUEUE)
+        for CHUNK in iter(lambda: list(islice(SOURCE, SIZE)), []):
+            SELF._CHECK()
+            with SELF._SPACE:
+                while SELF._QUEUED + len(CHUNK) > SELF.MAX_QUEUE:
+                    SELF._SPACE.wait()
+                SELF._QUEUED += len(CHUNK)
+            SELF._QUEUE.put(CHUNK)
+
+    def FLUSH(SELF, TIMEOUT: Optional[float] = None) -> bool:
+        """
+        Wartet, bis alle vorher angenommenen Einträge geschrieben und gemäß DURABILITY synchronisiert sind.
+        Rückgabe: False, wenn TIMEOUT (Sekunden) abgelaufen ist.
+        """
+        SELF._CHECK()
+        DONE = threading.Event()
+        SELF._QUEUE.put(DONE)
+        FINISHED = DONE.wait(TIMEOUT)
+        if SELF._ERROR is not None:
+            raise RuntimeError("GROUP WRITER FAILED") from SELF._ERROR
+        return FINISHED
+
+    def CLOSE(SELF) -> None:
+        """
+        Schreibt alle wartenden Einträge, speichert Sidecar-Summen/ID-Index und beendet den Thread.
+        Mehrfacher Aufruf ist erlaubt.
+        """
+        with SELF._LOCK:
+            if SELF._CLOSED:
+                return
+            SELF._CLOSED = True
+        atexit.unregister(SELF.CLOSE)
+        SELF._QUEUE.put(_STOP)
+        SELF._THREAD.join()
+        if SELF._ERROR is not None:
+            raise RuntimeError("GROUP WRITER FAILED") from SELF._ERROR
+
+    # ---- HINTERGRUND-THREAD ----
+
+    def _BATCHES(SELF) -> Iterator[List[ENTRY]]:
+        """
+        Liefert die Blöcke für STORE.APPEND_BATCHES. Wird der Generator weitergeschaltet, ist der vorige Block
+        geschrieben; erst dann werden die FLUSH-Marken dahinter freigegeben.
+        """
+        CARRY: List[ENTRY] = []     # Rest eines Teilblocks, der nicht mehr in den vorigen Block gepasst hat
+        while True:
+            BATCH, CARRY = CARRY, []
+            STOP = False
+            # Alles mitnehmen, was schon ansteht; eine FLUSH-Marke oder das Ende schließt den Block ab.
+            # Ein Rest (CARRY) füllt den Block immer ganz: Marken dahinter werden erst im nächsten Durchlauf gelesen.
+            while len(BATCH) < SELF.MAX_BATCH:
+                try:
+                    ITEM = SELF._QUEUE.get_nowait() if BATCH else SELF._QUEUE.get()   # Wartet nur mit leerem Block
+                except queue.Empty:
+                    break
+                if ITEM is _STOP:
+                    STOP = True
+                    break
+                if isinstance(ITEM, threading.Event):
+                    SELF._WAITING.append(ITEM)
+                    break
+                SELF._TAKEN(len(ITEM))
+                ROOM = SELF.MAX_BATCH - len(BATCH)
+                BATCH.extend(ITEM[:ROOM])
+                CARRY = ITEM[ROOM:]
+            if BATCH:
+                yield BATCH
+                SELF.WRITTEN += len(BATCH)
+                SELF.COMMITS += 1
+            for DONE in SELF._WAITING:
+                DONE.set()
+            SELF._WAITING.clear()
+            if STOP:
+                return
+
+    def _TAKEN(SELF, COUNT: int) -> None:
+        """
+        Gibt Platz für COUNT Einträge frei und weckt wartende APPEND-Aufrufe.
+        """
+        with SELF._SPACE:
+            SELF._QUEUED -= COUNT
+            SELF._SPACE.notify_all()
+
+    def _RUN(SELF) -> None:
+        try:
+            SELF.STORE.APPEND_BATCHES(SELF._BATCHES(), SELF.DURABILITY)
+        except BaseException as EXC:
+            SELF._ERROR = EXC
+            # Wartende nicht hängen lassen: Marken freigeben und die Warteschlange bis zum Ende leeren
+            for DONE in SELF._WAITING:
+                DONE.set()
+            while True:
+                ITEM = SELF._QUEUE.get()
+                if isinstance(ITEM, threading.Event):
+                    ITEM.set()
+                elif ITEM is _STOP:
+                    return
+                else:
+                    SELF._TAKEN(len(ITEM))
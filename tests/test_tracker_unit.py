@@ -1,4 +1,6 @@
 from __future__ import annotations
+import glob
+import importlib.util
 import os
 import tempfile
 import unittest
@@ -8,6 +10,7 @@ from food_waste_tracker.models import ENTRY
 from food_waste_tracker.storage import STORAGE
 from food_waste_tracker.analytics import TOTAL_WASTE, TOP_THREE_ITEMS, WASTE_IN_PERIOD, MOST_COMMON_REASON
 from food_waste_tracker.cli import BUILD_PARSER, RUN_FROM_ARGS
+from food_waste_tracker.aggregates import AGGREGATE_SIDECAR
 
 class TEST_FOOD_WASTE_TRACKER(unittest.TestCase):
     """
@@ -22,10 +25,12 @@ class TEST_FOOD_WASTE_TRACKER(unittest.TestCase):
         SELF.STORE = STORAGE(SELF.DB_PATH, "JSONL")
 
     def tearDown(SELF) -> None:  # noqa: N802
-        try:
-            os.remove(SELF.DB_PATH)
-        except FileNotFoundError:
-            pass
+        # DATENDATEI UND ALLE SIDECARS (<DB>.agg.json, ...) ENTFERNEN
+        for PATH in [SELF.DB_PATH] + glob.glob(SELF.DB_PATH + ".*"):
+            try:
+                os.remove(PATH)
+            except FileNotFoundError:
+                pass
 
     def _SEED(SELF) -> List[ENTRY]:
         E1 = ENTRY.CREATE(ITEM="BROT", GRAMS=120, REASON="VERDORBEN", DATE_STR="2025-10-01")
@@ -108,5 +113,957 @@ class TEST_FOOD_WASTE_TRACKER(unittest.TestCase):
         SELF.assertEqual(len(LOADED), 1)
         SELF.assertEqual(LOADED[0].ITEM, "KÄSE")
 
+    def test_aggregates_sidecar_matches_analytics(SELF) -> None:
+        SELF.STORE = STORAGE(SELF.DB_PATH, "JSONL", USE_AGGREGATES=True)
+        ENTRIES = SELF._SEED()
+        AGG = AGGREGATE_SIDECAR(SELF.STORE.PATH).LOAD_FRESH()
+        SELF.assertIsNotNone(AGG)
+        SELF.assertEqual(AGG.ROWS, 4)
+        SELF.assertEqual(AGG.TOTAL_WASTE(), TOTAL_WASTE(ENTRIES))
+        SELF.assertEqual(AGG.TOP_ITEMS(3), TOP_THREE_ITEMS(ENTRIES))
+        SELF.assertEqual(AGG.WASTE_IN_PERIOD(date(2025, 10, 2), date(2025, 10, 3)), 200 + 80)
+        SELF.assertEqual(AGG.MOST_COMMON_REASON(), MOST_COMMON_REASON(ENTRIES))
+
+    def test_aggregates_rebuild_when_stale(SELF) -> None:
+        SELF.STORE = STORAGE(SELF.DB_PATH, "JSONL", USE_AGGREGATES=True)
+        SELF._SEED()
+        # DATEI AM INDEX VORBEI ERWEITERN -> FINGERPRINT PASST NICHT MEHR
+        STORAGE(SELF.DB_PATH, "JSONL").APPEND(ENTRY.CREATE(ITEM="EI", GRAMS=60, REASON="RESTE", DATE_STR="2025-10-07"))
+        SELF.assertIsNone(AGGREGATE_SIDECAR(SELF.STORE.PATH).LOAD_FRESH())
+        SELF.assertEqual(SELF.STORE.AGGREGATES().TOTAL_WASTE(), 120 + 200 + 80 + 500 + 60)
+        SELF.assertIsNotNone(AGGREGATE_SIDECAR(SELF.STORE.PATH).LOAD_FRESH())
+
+    def test_append_many_batches_and_csv_header(SELF) -> None:
+        SELF.STORE = STORAGE(SELF.DB_PATH, "CSV")
+        ENTRIES = [ENTRY.CREATE(ITEM=f"ITEM{I}", GRAMS=I, REASON="RESTE", DATE_STR="2025-10-01") for I in range(5)]
+        SELF.assertEqual(SELF.STORE.APPEND_MANY(ENTRIES, BATCH_SIZE=2), 5)
+        SELF.assertEqual([E.ID for E in SELF.STORE.READ_ALL()], [E.ID for E in ENTRIES])
+
+    def test_append_many_failed_batch_leaves_complete_lines(SELF) -> None:
+        def BROKEN():
+            for I in range(3):
+                yield ENTRY.CREATE(ITEM=f"ITEM{I}", GRAMS=I, REASON="RESTE", DATE_STR="2025-10-01")
+            raise RuntimeError("SOURCE FAILED")
+        with SELF.assertRaises(RuntimeError):
+            SELF.STORE.APPEND_MANY(BROKEN(), BATCH_SIZE=2)
+        # ERSTER BLOCK (2 EINTRÄGE) IST GESCHRIEBEN, DER ANGEFANGENE ZWEITE NICHT
+        with open(SELF.DB_PATH, "r", encoding="utf-8") as F:
+            CONTENT = F.read()
+        SELF.assertTrue(CONTENT.endswith("\n"))
+        SELF.assertEqual(len(SELF.STORE.READ_ALL()), 2)
+
+    def test_cli_list_limit_stops_reading(SELF) -> None:
+        SELF._SEED()
+        # KAPUTTE ZEILE AM ENDE: WÜRDE BEIM VOLLSTÄNDIGEN LESEN EINEN FEHLER AUSLÖSEN
+        with open(SELF.DB_PATH, "a", encoding="utf-8") as F:
+            F.write("{NOT JSON\n")
+        import io
+        import sys
+
+        ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "list", "--limit", "2"])
+        BUF = io.StringIO()
+        OLD = sys.stdout
+        try:
+            sys.stdout = BUF
+            SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+        finally:
+            sys.stdout = OLD
+        SELF.assertEqual(len(BUF.getvalue().splitlines()), 2)
+        with SELF.assertRaises(ValueError):
+            SELF.STORE.READ_ALL()
+
+    def test_columnar_roundtrip_and_sums(SELF) -> None:
+        import shutil
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            SELF.STORE = STORAGE(os.path.join(TMP_DIR, "data.col"), "COLUMNAR")
+            ENTRIES = SELF._SEED()
+            LOADED = SELF.STORE.READ_ALL()
+            SELF.assertEqual(LOADED, ENTRIES)
+            SELF.assertEqual(SELF.STORE.BACKEND.SUM_GRAMS(), TOTAL_WASTE(ENTRIES))
+            SELF.assertEqual(SELF.STORE.BACKEND.SUM_GRAMS(date(2025, 10, 2), date(2025, 10, 3)), 200 + 80)
+            # SAVE_ALL TAUSCHT DAS VERZEICHNIS AUS
+            SELF.STORE.SAVE_ALL(ENTRIES[:2])
+            SELF.assertEqual(SELF.STORE.READ_ALL(), ENTRIES[:2])
+            with SELF.assertRaises(ValueError):
+                SELF.STORE.APPEND(ENTRY.CREATE(ITEM="X", GRAMS=2**31, REASON="Y", DATE_STR="2025-10-05"))
+            SELF.assertEqual(SELF.STORE.READ_ALL(), ENTRIES[:2])
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_columnar_writer_repairs_a_torn_tail(SELF) -> None:
+        import shutil
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            SELF.STORE = STORAGE(os.path.join(TMP_DIR, "data.col"), "COLUMNAR")
+            ENTRIES = SELF._SEED()
+            # ABBRUCH MITTEN IM BLOCK (SIGKILL): WÖRTERBUCH, IDS UND ZWEI SPALTEN TEILWEISE GESCHRIEBEN, DATE.i32 NICHT
+            COL_DIR = SELF.STORE.BACKEND.PATH
+            for NAME, TAIL in [("ITEMS.jsonl", b'"QUARK"\n"HA'), ("ID.jsonl", b'"LOST-1"\n"LOST-2"\n'),
+                               ("GRAMS.i32", b"\x07\x00\x00\x00\x08\x00"), ("ITEM.i32", b"\x04\x00\x00\x00"), ("DATE.i32", b"\x01\x02")]:
+                with open(os.path.join(COL_DIR, NAME), "ab") as F:
+                    F.write(TAIL)
+            open(os.path.join(COL_DIR, "WRITING"), "w").close()
+            SELF.assertEqual(SELF.STORE.READ_ALL(), ENTRIES)
+            # DER NÄCHSTE SCHREIBER KÜRZT ERST AUF DEN STAND VON DATE.i32, DANACH PASSEN ALLE SPALTEN UND IDS ZUSAMMEN
+            NEW = ENTRY.CREATE(ITEM="KÄSE", GRAMS=100, REASON="RESTE", DATE_STR="2025-10-05")
+            SELF.STORE.APPEND(NEW)
+            SELF.assertEqual(SELF.STORE.READ_ALL(), ENTRIES + [NEW])
+            SELF.assertEqual(os.path.getsize(os.path.join(COL_DIR, "GRAMS.i32")), 5 * 4)
+            SELF.assertFalse(os.path.exists(os.path.join(COL_DIR, "WRITING")))
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_directory_save_all_recovers_from_an_interrupted_swap(SELF) -> None:
+        import shutil
+        from unittest import mock
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            for FORMAT in ["COLUMNAR", "SEGMENTED"]:
+                PATH = os.path.join(TMP_DIR, FORMAT.lower())
+                SELF.STORE = STORAGE(PATH, FORMAT)
+                ENTRIES = SELF._SEED()
+                # ABSTURZ ZWISCHEN PATH -> PATH.old UND PATH.tmp -> PATH: DER ALTE STAND KOMMT ZURÜCK
+                REPLACE = os.replace
+                CALLS = []
+
+                def CRASH(SRC: str, DST: str) -> None:
+                    CALLS.append(SRC)
+                    if len(CALLS) == 2:
+                        raise KeyboardInterrupt
+                    REPLACE(SRC, DST)
+
+                with mock.patch("food_waste_tracker.utils.os.replace", CRASH), SELF.assertRaises(KeyboardInterrupt):
+                    SELF.STORE.SAVE_ALL(ENTRIES[:1])
+                SELF.assertFalse(os.path.exists(PATH))
+                SELF.assertEqual(STORAGE(PATH, FORMAT).READ_ALL(), ENTRIES)
+                SELF.assertFalse(os.path.exists(PATH + ".old"))
+                # ABSTURZ NACH DEM AUSTAUSCH, VOR DEM LÖSCHEN: PATH.old WIRD BEIM ÖFFNEN ENTFERNT
+                STORAGE(PATH, FORMAT).SAVE_ALL(ENTRIES[:1])
+                shutil.copytree(PATH, PATH + ".old")
+                SELF.assertEqual(STORAGE(PATH, FORMAT).READ_ALL(), ENTRIES[:1])
+                SELF.assertFalse(os.path.exists(PATH + ".old"))
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_segmented_partition_pruning(SELF) -> None:
+        import shutil
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            DB_DIR = os.path.join(TMP_DIR, "segments")
+            SELF.STORE = STORAGE(DB_DIR, "SEGMENTED")
+            ENTRIES = SELF._SEED()
+            SEPTEMBER = ENTRY.CREATE(ITEM="APFEL", GRAMS=30, REASON="RESTE", DATE_STR="2025-09-30")
+            SELF.STORE.APPEND(SEPTEMBER)
+            SELF.assertEqual(sorted(os.listdir(DB_DIR)), ["2025-09.jsonl", "2025-10.jsonl"])
+            SELF.assertEqual(TOTAL_WASTE(SELF.STORE.ITER_ENTRIES()), TOTAL_WASTE(ENTRIES) + 30)
+            # SEGMENT AUSSERHALB DES ZEITRAUMS WIRD NICHT GEÖFFNET (KAPUTTE ZEILE STÖRT NICHT)
+            with open(os.path.join(DB_DIR, "2025-09.jsonl"), "a", encoding="utf-8") as F:
+                F.write("{NOT JSON\n")
+            IN_RANGE = list(SELF.STORE.ITER_RANGE(date(2025, 10, 2), date(2025, 10, 3)))
+            SELF.assertEqual([E.ID for E in IN_RANGE], [ENTRIES[1].ID, ENTRIES[2].ID])
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_date_index_range_matches_scan(SELF) -> None:
+        from food_waste_tracker.dateindex import DATE_INDEX
+
+        ENTRIES = [
+            ENTRY.CREATE(ITEM=f"ITEM{I}", GRAMS=I, REASON="RESTE", DATE_STR=f"2025-10-{I // 2 + 1:02d}") for I in range(20)
+        ]
+        SELF.STORE.APPEND_MANY(ENTRIES[:15])
+        INDEX = DATE_INDEX(SELF.STORE.PATH, EVERY=4)
+        SELF.assertEqual([E.ID for E in INDEX.ITER_RANGE(date(2025, 10, 3), date(2025, 10, 5))], [E.ID for E in ENTRIES[4:10]])
+        SELF.assertTrue(INDEX.SORTED)
+        SELF.assertEqual(len(INDEX.BLOCKS), 3)
+        # INKREMENTELL: NEUE ZEILEN WERDEN AB INDEXED_TO NACHGETRAGEN
+        SELF.STORE.APPEND_MANY(ENTRIES[15:])
+        SELF.assertEqual([E.ID for E in INDEX.ITER_RANGE(date(2025, 10, 8), date(2025, 10, 31))], [E.ID for E in ENTRIES[14:]])
+        SELF.assertEqual(len(INDEX.BLOCKS), 5)
+
+    def test_compact_entry_is_api_compatible(SELF) -> None:
+        from dataclasses import FrozenInstanceError
+        from food_waste_tracker.models import COMPACT_ENTRY
+
+        ENTRIES = SELF._SEED()
+        COMPACT = SELF.STORE.READ_ALL(COMPACT=True)
+        SELF.assertEqual(COMPACT, ENTRIES)
+        SELF.assertEqual([C.TO_DICT() for C in COMPACT], [E.TO_DICT() for E in ENTRIES])
+        SELF.assertEqual(COMPACT_ENTRY.FROM_DICT(ENTRIES[0].TO_DICT()).TO_ENTRY(), ENTRIES[0])
+        SELF.assertEqual(TOP_THREE_ITEMS(COMPACT), TOP_THREE_ITEMS(ENTRIES))
+        SELF.assertEqual(WASTE_IN_PERIOD(COMPACT, date(2025, 10, 2), date(2025, 10, 3)), 200 + 80)
+        SELF.assertIs(COMPACT[0].ITEM, COMPACT[2].ITEM)     # INTERNED
+        SELF.assertFalse(hasattr(COMPACT[0], "__dict__"))
+        with SELF.assertRaises(FrozenInstanceError):
+            COMPACT[0].GRAMS = 1  # type: ignore[misc]
+        # NICHT-UUID-IDS BLEIBEN UNVERÄNDERT
+        SELF.assertEqual(COMPACT_ENTRY(ID="ROW-7", DATE=date(2025, 1, 1), ITEM="A", GRAMS=1, REASON="B").ID, "ROW-7")
+
+    def test_date_parser_locks_format_and_matches_strptime(SELF) -> None:
+        from datetime import datetime
+        from food_waste_tracker.utils import DATE_PARSER, PARSE_DATE
+
+        PARSER = DATE_PARSER()
+        SELF.assertEqual(PARSER("03.11.2025"), date(2025, 11, 3))
+        SELF.assertEqual(PARSER.LOCKED, "%d.%m.%Y")
+        # ABWEICHLER UND KURZE SCHREIBWEISEN FUNKTIONIEREN WEITERHIN
+        SELF.assertEqual(PARSER("2025-11-04"), date(2025, 11, 4))
+        SELF.assertEqual(PARSER("5.1.2025"), datetime.strptime("5.1.2025", "%d.%m.%Y").date())
+        SELF.assertEqual(PARSE_DATE(" 2025/02/28 "), date(2025, 2, 28))
+        for BAD in ["31.02.2025", "2025-13-01", "20251001", ""]:
+            with SELF.assertRaises(ValueError):
+                PARSER(BAD)
+
+    def test_codec_output_is_byte_identical(SELF) -> None:
+        import json
+        from food_waste_tracker.codec import DECODE_JSONL, ENCODE_JSONL
+
+        E = ENTRY.CREATE(ITEM='KÄSE "ALT"\n\x01', GRAMS=7, REASON="ZU\\VIEL 😀", DATE_STR="2025-10-06")
+        LINE = ENCODE_JSONL(E)
+        SELF.assertEqual(LINE, json.dumps(E.TO_DICT(), ensure_ascii=False) + "\n")
+        SELF.assertEqual(DECODE_JSONL(LINE), E)
+        SELF.assertEqual(DECODE_JSONL(LINE.encode("utf-8")), E)
+        # CSV: SELBE BYTES WIE DER FRÜHERE csv.DictWriter-WEG
+        import csv
+        import io
+
+        SELF.STORE = STORAGE(SELF.DB_PATH, "CSV")
+        SELF.STORE.APPEND(E)
+        BUF = io.StringIO(newline="")
+        WRITER = csv.DictWriter(BUF, fieldnames=["ID", "DATE", "ITEM", "GRAMS", "REASON"])
+        WRITER.writeheader()
+        WRITER.writerow(E.TO_DICT())
+        with open(SELF.DB_PATH, "r", newline="", encoding="utf-8") as F:
+            SELF.assertEqual(F.read(), BUF.getvalue())
+        SELF.assertEqual(SELF.STORE.READ_ALL(), [E])
+
+    def test_columns_match_reference_analytics(SELF) -> None:
+        import shutil
+        from food_waste_tracker import vectorized
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            for FORMAT, PATH in [("JSONL", SELF.DB_PATH), ("CSV", os.path.join(TMP_DIR, "data.csv")),
+                                 ("COLUMNAR", os.path.join(TMP_DIR, "data.col")), ("SEGMENTED", os.path.join(TMP_DIR, "data.seg"))]:
+                SELF.STORE = STORAGE(PATH, FORMAT)
+                ENTRIES = SELF._SEED()
+                # REINES PYTHON IST DIE REFERENZ, NUMPY (FALLS INSTALLIERT) MUSS DASSELBE LIEFERN
+                for USE_NUMPY in [False, None]:
+                    with SELF.STORE.TO_COLUMNS() as COLS:
+                        SELF.assertEqual(len(COLS), 4)
+                        SELF.assertEqual(vectorized.TOTAL_WASTE(COLS, USE_NUMPY), TOTAL_WASTE(ENTRIES))
+                        SELF.assertEqual(vectorized.TOP_THREE_ITEMS(COLS, USE_NUMPY), TOP_THREE_ITEMS(ENTRIES))
+                        SELF.assertEqual(
+                            vectorized.WASTE_IN_PERIOD(COLS, date(2025, 10, 2), date(2025, 10, 3), USE_NUMPY),
+                            WASTE_IN_PERIOD(ENTRIES, date(2025, 10, 2), date(2025, 10, 3)),
+                        )
+                        SELF.assertEqual(vectorized.MOST_COMMON_REASON(COLS, USE_NUMPY), MOST_COMMON_REASON(ENTRIES))
+                        SELF.assertTrue(COLS.IS_SORTED(USE_NUMPY))
+                # UNSORTIERTE DATEN: KEINE BINÄRSUCHE
+                ENTRIES.append(ENTRY.CREATE(ITEM="KÄSE", GRAMS=7, REASON="RESTE", DATE_STR="2025-10-02"))
+                SELF.STORE.APPEND(ENTRIES[-1])
+                for USE_NUMPY in [False, None]:
+                    with SELF.STORE.TO_COLUMNS() as COLS:
+                        SELF.assertFalse(COLS.IS_SORTED(USE_NUMPY))
+                        SELF.assertEqual(
+                            vectorized.WASTE_IN_PERIOD(COLS, date(2025, 10, 2), date(2025, 10, 3), USE_NUMPY),
+                            WASTE_IN_PERIOD(ENTRIES, date(2025, 10, 2), date(2025, 10, 3)),
+                        )
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    @unittest.skipUnless(importlib.util.find_spec("numpy"), "NUMPY IST NICHT INSTALLIERT")
+    def test_numpy_columns_match_pure_python(SELF) -> None:
+        import shutil
+        from food_waste_tracker import vectorized
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            for FORMAT, PATH in [("JSONL", SELF.DB_PATH), ("COLUMNAR", os.path.join(TMP_DIR, "data.col"))]:
+                SELF.STORE = STORAGE(PATH, FORMAT)
+                SELF._SEED()
+                SELF.STORE.APPEND(ENTRY.CREATE(ITEM="KÄSE", GRAMS=280, REASON="RESTE", DATE_STR="2025-10-02"))
+                with SELF.STORE.TO_COLUMNS() as COLS:
+                    for FN, ARGS in [(vectorized.TOTAL_WASTE, ()), (vectorized.TOP_THREE_ITEMS, ()),
+                                     (vectorized.WASTE_IN_PERIOD, (date(2025, 10, 2), date(2025, 10, 3))),
+                                     (vectorized.MOST_COMMON_REASON, ())]:
+                        SELF.assertEqual(FN(COLS, *ARGS, USE_NUMPY=True), FN(COLS, *ARGS, USE_NUMPY=False))
+                    SELF.assertFalse(COLS.IS_SORTED(USE_NUMPY=True))
+            # SUMMEN ÜBER 2**53 BLEIBEN EXAKT (FLOAT64 WÜRDE 2**53 + 1 AUF 2**53 RUNDEN)
+            BUILDER = vectorized.COLUMN_BUILDER()
+            for GRAMS, ITEM in [(2**53, "A"), (1, "A"), (2**53 - 1, "B")]:
+                BUILDER.ADD(date(2025, 10, 1).toordinal(), GRAMS, ITEM, "RESTE")
+            SELF.assertEqual(vectorized.TOP_THREE_ITEMS(BUILDER.BUILD(), USE_NUMPY=True), [("A", 2**53 + 1), ("B", 2**53 - 1)])
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_report_matches_single_metrics(SELF) -> None:
+        import io
+        import json
+        import sys
+        from food_waste_tracker.analytics import REPORT
+
+        ENTRIES = SELF._SEED()
+        R = REPORT(ENTRIES, date(2025, 10, 2), date(2025, 10, 3))
+        SELF.assertEqual(R["TOTAL"], TOTAL_WASTE(ENTRIES))
+        SELF.assertEqual(R["TOP3"], TOP_THREE_ITEMS(ENTRIES))
+        SELF.assertEqual(R["PERIOD"], WASTE_IN_PERIOD(ENTRIES, date(2025, 10, 2), date(2025, 10, 3)))
+        SELF.assertEqual(R["MOST_COMMON_REASON"], MOST_COMMON_REASON(ENTRIES))
+        SELF.assertEqual(R["AVERAGE"], 900 / 4)
+        SELF.assertIsNone(REPORT(ENTRIES)["PERIOD"])
+        # CLI MIT JSON-AUSGABE, EINMAL OHNE UND EINMAL MIT SIDECAR-INDEX
+        for EXTRA in [[], ["--aggregates"]]:
+            ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH] + EXTRA + ["report", "--start", "2025-10-02", "--end", "2025-10-03", "--json"])
+            BUF = io.StringIO()
+            OLD = sys.stdout
+            try:
+                sys.stdout = BUF
+                SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+            finally:
+                sys.stdout = OLD
+            OUT = json.loads(BUF.getvalue())
+            SELF.assertEqual(OUT["TOTAL"], 900)
+            SELF.assertEqual(OUT["TOP3"][0], {"ITEM": "MILCH", "GRAMS": 500})
+            SELF.assertEqual(OUT["PERIOD"], {"START": "2025-10-02", "END": "2025-10-03", "GRAMS": 280})
+            SELF.assertEqual(OUT["MOST_COMMON_REASON"], "VERDORBEN")
+
+    def test_top_n_ties_and_cli(SELF) -> None:
+        import io
+        import sys
+        from food_waste_tracker import vectorized
+        from food_waste_tracker.aggregates import AGGREGATE_INDEX
+        from food_waste_tracker.analytics import REPORT, TOP_N_ITEMS, TOP_N_REASONS
+
+        ENTRIES = SELF._SEED()
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM="APFEL", GRAMS=200, REASON="VERDORBEN", DATE_STR="2025-10-05"))
+        ENTRIES = SELF.STORE.READ_ALL()
+        # GLEICHSTAND (200 G): ALPHABETISCH, UNABHÄNGIG VON DER REIHENFOLGE
+        SELF.assertEqual(TOP_N_ITEMS(ENTRIES, 3), [("MILCH", 500), ("APFEL", 200), ("BROT", 200)])
+        SELF.assertEqual(TOP_N_ITEMS(list(reversed(ENTRIES)), 3), TOP_N_ITEMS(ENTRIES, 3))
+        SELF.assertEqual(TOP_THREE_ITEMS(ENTRIES), TOP_N_ITEMS(ENTRIES, 3))
+        SELF.assertEqual(TOP_N_ITEMS(ENTRIES, 1, BY="count"), [("BROT", 2)])
+        SELF.assertEqual(TOP_N_REASONS(ENTRIES, 2), [("VERDORBEN", 3), ("MHD ABGELAUFEN", 1)])
+        SELF.assertEqual(TOP_N_ITEMS(ENTRIES, 0), [])
+        with SELF.assertRaises(ValueError):
+            TOP_N_ITEMS(ENTRIES, 3, BY="PRICE")
+        AGG = AGGREGATE_INDEX.BUILD(ENTRIES)
+        SELF.assertEqual(AGG.TOP_ITEMS(1, BY="count"), [("BROT", 2)])
+        with SELF.assertRaises(ValueError):
+            AGG.TOP_ITEMS(3, BY="PRICE")
+        # HÄUFIGSTER GRUND BEI GLEICHSTAND: ALPHABETISCH WIE TOP_N, IN ALLEN QUELLEN
+        TIED = [ENTRY.CREATE(ITEM="BROT", GRAMS=1, REASON=R, DATE_STR="2025-10-01") for R in ["ZU VIEL", "ALT", "ALT", "ZU VIEL"]]
+        SQL_STORE = STORAGE(SELF.DB_PATH + ".sqlite", "SQLITE")
+        SQL_STORE.APPEND_MANY(TIED)
+        BUILDER = vectorized.COLUMN_BUILDER()
+        for E in TIED:
+            BUILDER.ADD(E.DATE.toordinal(), E.GRAMS, E.ITEM, E.REASON)
+        SELF.assertEqual(TOP_N_REASONS(TIED, 1), [("ALT", 2)])
+        for RESULT in [MOST_COMMON_REASON(TIED), REPORT(TIED)["MOST_COMMON_REASON"], AGGREGATE_INDEX.BUILD(TIED).MOST_COMMON_REASON(),
+                       SQL_STORE.BACKEND.MOST_COMMON_REASON(), vectorized.MOST_COMMON_REASON(BUILDER.BUILD(), False),
+                       vectorized.MOST_COMMON_REASON(BUILDER.BUILD())]:
+            SELF.assertEqual(RESULT, "ALT")
+        SQL_STORE.BACKEND.CLOSE()
+        # CLI: GLEICHES ERGEBNIS MIT UND OHNE SIDECAR-INDEX
+        for EXTRA in [[], ["--aggregates"]]:
+            ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH] + EXTRA + ["top", "--n", "2", "--by", "reason"])
+            BUF = io.StringIO()
+            OLD = sys.stdout
+            try:
+                sys.stdout = BUF
+                SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+            finally:
+                sys.stdout = OLD
+            SELF.assertEqual(BUF.getvalue().splitlines(), ["1. VERDORBEN: 3 ENTRIES", "2. MHD ABGELAUFEN: 1 ENTRIES"])
+
+    def test_cli_imports_only_what_the_command_needs(SELF) -> None:
+        import subprocess
+        import sys
+
+        # EIGENER PROZESS, DAMIT DIE BEREITS GELADENEN MODULE DIESES TESTLAUFS NICHT STÖREN
+        CODE = (
+            "import sys\n"
+            "from food_waste_tracker.cli import BUILD_PARSER, RUN_FROM_ARGS\n"
+            "ARGS = BUILD_PARSER().parse_args(['--db', sys.argv[1], 'total'])\n"
+            "print(','.join(sorted(sys.modules)))\n"
+            "RUN_FROM_ARGS(ARGS)\n"
+            "print(','.join(sorted(sys.modules)))\n"
+        )
+        ENV = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        OUT = subprocess.run([sys.executable, "-c", CODE, SELF.DB_PATH], env=ENV, capture_output=True, text=True, check=True).stdout
+        PARSED, RAN = (set(LINE.split(",")) for LINE in OUT.splitlines() if "," in LINE)
+        SELF.assertNotIn("food_waste_tracker.storage", PARSED)
+        SELF.assertNotIn("food_waste_tracker.models", PARSED)
+        for NAME in ["food_waste_tracker.columnar", "food_waste_tracker.segments", "food_waste_tracker.dateindex",
+                     "food_waste_tracker.aggregates", "food_waste_tracker.vectorized", "food_waste_tracker.importers", "uuid"]:
+            SELF.assertNotIn(NAME, RAN)
+        # ÖFFENTLICHE API BLEIBT ÜBER DAS PAKET ERREICHBAR
+        import food_waste_tracker
+
+        SELF.assertIs(food_waste_tracker.STORAGE, STORAGE)
+        with SELF.assertRaises(AttributeError):
+            food_waste_tracker.NOT_THERE  # noqa: B018
+
+    def test_plan_picks_cheapest_source_and_add_reads_nothing(SELF) -> None:
+        import shutil
+        from food_waste_tracker.queries import PLAN
+
+        SELF._SEED()
+        # KAPUTTE ZEILE: JEDER LESEZUGRIFF AUF DIE DATENDATEI WÜRDE SCHEITERN, ADD DARF SIE NICHT ANFASSEN
+        with open(SELF.DB_PATH, "a", encoding="utf-8") as F:
+            F.write("{NOT JSON\n")
+        for EXTRA in [[], ["--date-index"]]:
+            ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH] + EXTRA + ["add", "--item", "KÄSE", "--grams", "10", "--reason", "RESTE"])
+            SELF.assertEqual(ARGS.NEEDS, "NONE")
+            SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+        SELF.assertEqual(PLAN(SELF.STORE, "NONE"), "NONE")
+        SELF.assertEqual(PLAN(SELF.STORE, "SUM"), "BYTES")
+        SELF.assertEqual(PLAN(STORAGE(SELF.DB_PATH, "JSONL", USE_DATE_INDEX=True), "RANGE"), "DATE_INDEX")
+        SELF.assertEqual(PLAN(STORAGE(SELF.DB_PATH, "JSONL", USE_AGGREGATES=True), "RANGE"), "SIDECAR")
+        SELF.assertEqual(PLAN(STORAGE(SELF.DB_PATH, "JSONL", USE_AGGREGATES=True), "ROWS"), "SCAN")
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            SELF.assertEqual(PLAN(STORAGE(os.path.join(TMP_DIR, "c"), "COLUMNAR"), "SUM"), "COLUMNS")
+            SELF.assertEqual(PLAN(STORAGE(os.path.join(TMP_DIR, "c"), "COLUMNAR"), "AGGREGATES"), "SCAN")
+            SELF.assertEqual(PLAN(STORAGE(os.path.join(TMP_DIR, "s"), "SEGMENTED"), "RANGE"), "SEGMENTS")
+        finally:
+            shutil.rmtree(TMP_DIR)
+        with SELF.assertRaises(ValueError):
+            PLAN(SELF.STORE, "EVERYTHING")
+
+    def test_parallel_import_matches_serial(SELF) -> None:
+        import shutil
+        from food_waste_tracker.importers import IMPORT_CSV_TO_STORAGE
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            CSV_PATH = os.path.join(TMP_DIR, "in.csv")
+            with open(CSV_PATH, "w", encoding="utf-8", newline="") as F:
+                F.write("DATE;ITEM;GRAMS;REASON\n")
+                for I in range(300):
+                    if I == 50:
+                        F.write("\n")     # LEERZEILE ZÄHLT BEI DEN ZEILENNUMMERN MIT
+                    GRAMS = "-5" if I % 97 == 0 else str(I)
+                    F.write(f"0{1 + I % 9}.10.2025;KÄSE {I % 7};{GRAMS};RESTE\n")
+            RESULTS = []
+            for WORKERS in [1, 3]:
+                STORE = STORAGE(os.path.join(TMP_DIR, f"out{WORKERS}.jsonl"))
+                STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, WORKERS=WORKERS, CHUNK_BYTES=512)
+                ROWS = [(E.DATE, E.ITEM, E.GRAMS, E.REASON) for E in STORE.READ_ALL()]
+                RESULTS.append((STATS["added"], STATS["skipped"], STATS["errors"], ROWS))
+            SELF.assertEqual(RESULTS[0], RESULTS[1])
+            SELF.assertEqual(RESULTS[0][1], 4)
+            SELF.assertTrue(RESULTS[0][2][0].startswith("line 2:"))
+            SELF.assertTrue(RESULTS[0][2][1].startswith("line 100:"))     # ZEILE 99 + LEERZEILE
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_parallel_import_falls_back_for_multiline_fields(SELF) -> None:
+        from food_waste_tracker.importers import IMPORT_CSV_TO_STORAGE
+
+        CSV_PATH = SELF.DB_PATH + ".in.csv"
+        with open(CSV_PATH, "w", encoding="utf-8", newline="") as F:
+            F.write("DATE,ITEM,GRAMS,REASON\n")
+            for I in range(200):
+                ITEM = f'"KÄSE\n{I}, ""ALT""\n"' if I >= 60 and I % 3 == 0 else f"BROT {I}"   # MEHRZEILIGE FELDER AB ZEILE 60
+                F.write(f"2025-10-{1 + I % 28:02d},{ITEM},{'X' if I == 150 else I},RESTE\n")
+        RESULTS = []
+        for WORKERS in [1, 2]:
+            STORE = STORAGE(SELF.DB_PATH + f".out{WORKERS}.jsonl")
+            STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, WORKERS=WORKERS, CHUNK_BYTES=128)
+            RESULTS.append((STATS["added"], STATS["errors"], [(E.DATE, E.ITEM, E.GRAMS) for E in STORE.READ_ALL()]))
+        SELF.assertEqual(RESULTS[0], RESULTS[1])
+        SELF.assertEqual(RESULTS[1][0], 199)
+        SELF.assertEqual(len(RESULTS[1][1]), 1)
+        SELF.assertIn('KÄSE\n63, "ALT"', [ROW[1] for ROW in RESULTS[1][2]])
+
+    def test_reimport_with_id_index_and_bloom_filter(SELF) -> None:
+        from food_waste_tracker.importers import IMPORT_CSV_TO_STORAGE
+
+        CSV_PATH = SELF.DB_PATH + ".in.csv"
+        with open(CSV_PATH, "w", encoding="utf-8", newline="") as F:
+            F.write("ID,DATE,ITEM,GRAMS,REASON\n")
+            for I in range(50):
+                F.write(f"ID-{I},2025-10-{1 + I % 28:02d},KÄSE {I % 5},{I},RESTE\n")
+            F.write(",2025-10-05,BROT,10,ALT\n,2025-10-05,BROT,10,ALT\n")    # OHNE ID: INHALTS-HASH JE VORKOMMEN, BEIDE ZEILEN BLEIBEN
+        SELF.STORE.APPEND(ENTRY("ID-0", date(2025, 10, 1), "KÄSE 0", 0, "RESTE"))
+        # PROBELAUF: DUBLETTEN IM SPEICHER PRÜFEN, KEINE INDEXDATEIEN ANLEGEN
+        STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, SELF.STORE, ON_DUPLICATE="skip", DRY_RUN=True)
+        SELF.assertEqual((STATS["added"], STATS["duplicates"]), (51, 1))
+        SELF.assertEqual(glob.glob(SELF.DB_PATH + ".*"), [CSV_PATH])
+        SELF.STORE.SAVE_ALL([])
+        STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, SELF.STORE, ON_DUPLICATE="skip", BATCH_SIZE=7)
+        SELF.assertEqual((STATS["added"], STATS["duplicates"]), (52, 0))
+        # ZWEITER LAUF MIT FRISCHER STORAGE: INDEX WIRD ERKANNT, NICHTS KOMMT DOPPELT HINZU
+        STORE = STORAGE(SELF.DB_PATH, "JSONL")
+        SELF.assertIsNotNone(STORE.ID_INDEX)
+        STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, ON_DUPLICATE="skip")
+        SELF.assertEqual((STATS["added"], STATS["duplicates"]), (0, 52))
+        SELF.assertEqual(len(STORE.READ_ALL()), 52)
+        SELF.assertEqual(STORE.IDS().DISK_READS, 52)    # JEDE DUBLETTE EINE INDEX-SUCHE, DIE ID-LISTE WIRD NIE GANZ GELADEN
+        # NEUE ZEILEN (BLOOM-FILTER SAGT "NEU") LESEN DIE ID-LISTE NICHT VON DER PLATTE
+        STORE = STORAGE(SELF.DB_PATH, "JSONL")
+        STORE.APPEND(ENTRY.CREATE(ITEM="APFEL", GRAMS=1, REASON="X", DATE_STR="2025-11-01"))   # INDEX WIRD FORTGESCHRIEBEN
+        INDEX = STORE.IDS()
+        SELF.assertEqual(INDEX.COUNT, 53)
+        SELF.assertEqual(sum(f"NEW-{I}" in INDEX for I in range(200)), 0)
+        SELF.assertLessEqual(INDEX.DISK_READS, 1)
+        SELF.assertIn("ID-7", INDEX)
+        SELF.assertNotIn("ID-7X", INDEX)
+        # REPLACE ÜBERSCHREIBT WERTE, ERROR BRICHT AB
+        with open(CSV_PATH, "w", encoding="utf-8", newline="") as F:
+            F.write("ID,DATE,ITEM,GRAMS,REASON\nID-3,2025-10-04,KÄSE 3,999,RESTE\nID-NEU,2025-10-04,QUARK,5,RESTE\n")
+        STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, ON_DUPLICATE="replace")
+        SELF.assertEqual((STATS["added"], STATS["duplicates"]), (1, 1))
+        ROWS = {E.ID: E.GRAMS for E in STORE.ITER_ENTRIES()}
+        SELF.assertEqual((len(ROWS), ROWS["ID-3"], ROWS["ID-NEU"]), (54, 999, 5))
+        with SELF.assertRaises(ValueError):
+            IMPORT_CSV_TO_STORAGE(CSV_PATH, STORAGE(SELF.DB_PATH, "JSONL"), ON_DUPLICATE="error")
+
+    def test_import_streams_rejects_and_caps_errors(SELF) -> None:
+        import csv
+        from food_waste_tracker.importers import IMPORT_CSV_TO_STORAGE
+
+        CSV_PATH = SELF.DB_PATH + ".in.csv"
+        REJECTS_PATH = SELF.DB_PATH + ".rejects.csv"
+        with open(CSV_PATH, "w", encoding="utf-8", newline="") as F:
+            F.write("DATE,ITEM,GRAMS,REASON\n")
+            for I in range(100):
+                F.write(f"2025-10-01,BROT,{'X' if I % 4 == 0 else I},ALT\n")
+        STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, SELF.STORE, REJECTS_PATH=REJECTS_PATH, ERROR_SAMPLE=5)
+        SELF.assertEqual((STATS["added"], STATS["skipped"], len(STATS["errors"]), STATS["aborted"]), (75, 25, 5, False))
+        with open(REJECTS_PATH, encoding="utf-8", newline="") as F:
+            ROWS = list(csv.reader(F))
+        SELF.assertEqual(ROWS[0], ["LINE", "ERROR", "DATE", "ITEM", "GRAMS", "REASON"])
+        SELF.assertEqual(len(ROWS), 26)
+        SELF.assertEqual((ROWS[1][0], ROWS[1][2:]), ("2", ["2025-10-01", "BROT", "X", "ALT"]))
+        # ABBRUCH NACH MEHR ALS MAX_ERRORS FEHLERN, SERIELL UND PARALLEL
+        for WORKERS in [1, 2]:
+            STORE = STORAGE(SELF.DB_PATH + f".out{WORKERS}.jsonl")
+            STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, MAX_ERRORS=2, WORKERS=WORKERS, CHUNK_BYTES=256)
+            SELF.assertTrue(STATS["aborted"])
+            SELF.assertEqual(STATS["skipped"], 3)
+            SELF.assertLess(STATS["added"], 75)
+        ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "import-csv", "--file", CSV_PATH, "--max-errors", "0"])
+        SELF.assertEqual(RUN_FROM_ARGS(ARGS), 1)
+
+    def test_directory_import_keeps_file_order(SELF) -> None:
+        import shutil
+        from food_waste_tracker.importers import IMPORT_CSV_DIR_TO_STORAGE
+
+        TMP_DIR = tempfile.mkdtemp()
+        try:
+            for DAY in range(1, 6):
+                with open(os.path.join(TMP_DIR, f"2025-10-{DAY:02d}.csv"), "w", encoding="utf-8", newline="") as F:
+                    F.write("DATE;ITEM;GRAMS;REASON\n")
+                    for I in range(40):
+                        F.write(f"{DAY:02d}.10.2025;KÄSE {I};{'X' if I == 7 else I};RESTE\n")
+            with open(os.path.join(TMP_DIR, "kaputt.csv"), "w", encoding="utf-8") as F:
+                F.write("FOO,BAR\n1,2\n")
+            with open(os.path.join(TMP_DIR, "notes.txt"), "w", encoding="utf-8") as F:
+                F.write("KEIN CSV\n")
+            PROGRESS: List[tuple] = []
+            STATS = IMPORT_CSV_DIR_TO_STORAGE(
+                TMP_DIR, SELF.STORE, JOBS=3, BATCH_SIZE=8, ON_DUPLICATE="skip", PROGRESS=lambda D, T: PROGRESS.append((D, T))
+            )
+            SELF.assertEqual([F["file"] for F in STATS["files"]], [f"2025-10-0{D}.csv" for D in range(1, 6)] + ["kaputt.csv"])
+            SELF.assertEqual((STATS["added"], STATS["skipped"]), (195, 5))
+            SELF.assertIsNone(STATS["files"][0]["error"])
+            SELF.assertIn("Missing required columns", STATS["files"][-1]["error"])
+            SELF.assertTrue(STATS["errors"][0].startswith("2025-10-01.csv: line 9:"))
+            # EIN GEORDNETER SCHREIBER: EINTRÄGE IN DATEI- UND ZEILENREIHENFOLGE
+            ROWS = [(E.DATE.day, int(E.ITEM.split()[1])) for E in SELF.STORE.ITER_ENTRIES()]
+            SELF.assertEqual(ROWS, [(D, I) for D in range(1, 6) for I in range(40) if I != 7])
+            SELF.assertEqual(PROGRESS[-1][0], PROGRESS[-1][1])
+            SELF.assertEqual(PROGRESS, sorted(PROGRESS))
+            # ZWEITER LAUF ÜBER DIE CLI: ALLES DUBLETTEN, FEHLERHAFTE DATEI -> EXIT-CODE 1
+            ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "import-csv", "--dir", TMP_DIR, "--jobs", "2", "--on-duplicate", "skip"])
+            SELF.assertEqual(RUN_FROM_ARGS(ARGS), 1)
+            SELF.assertEqual(len(SELF.STORE.READ_ALL()), 195)
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_directory_import_rejects_share_one_header(SELF) -> None:
+        import csv
+        import shutil
+        from food_waste_tracker.importers import IMPORT_CSV_DIR_TO_STORAGE
+
+        TMP_DIR = tempfile.mkdtemp()
+        REJECTS_PATH = SELF.DB_PATH + ".rejects.csv"
+        try:
+            with open(os.path.join(TMP_DIR, "a.csv"), "w", encoding="utf-8", newline="") as F:
+                F.write("DATE,ITEM,GRAMS,REASON\n2025-10-01,BROT,X,ALT\n")
+            with open(os.path.join(TMP_DIR, "b.csv"), "w", encoding="utf-8", newline="") as F:
+                F.write("reason,grams,id,item,date,notiz\nRESTE,10,B-1,KÄSE,2025-10-02,OK\nRESTE,-1,B-2,QUARK,2025-10-03,FALSCH\n")
+            STATS = IMPORT_CSV_DIR_TO_STORAGE(TMP_DIR, SELF.STORE, REJECTS_PATH=REJECTS_PATH)
+            SELF.assertEqual((STATS["added"], STATS["skipped"]), (1, 2))
+            # EIN HEADER FÜR ALLE DATEIEN, WERTE ÜBER DAS SPALTEN-MAPPING DER JEWEILIGEN DATEI
+            with open(REJECTS_PATH, encoding="utf-8", newline="") as F:
+                ROWS = list(csv.reader(F))
+            SELF.assertEqual(ROWS[0], ["FILE", "LINE", "ERROR", "ID", "DATE", "ITEM", "GRAMS", "REASON"])
+            SELF.assertEqual([R[:2] + R[3:] for R in ROWS[1:]], [
+                ["a.csv", "2", "", "2025-10-01", "BROT", "X", "ALT"],
+                ["b.csv", "3", "B-2", "2025-10-03", "QUARK", "-1", "RESTE"],
+            ])
+            # --workers GILT NUR FÜR --file
+            ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "import-csv", "--dir", TMP_DIR, "--workers", "2"])
+            with SELF.assertRaises(ValueError):
+                RUN_FROM_ARGS(ARGS)
+        finally:
+            shutil.rmtree(TMP_DIR)
+
+    def test_compact_sorts_externally_and_drops_duplicates(SELF) -> None:
+        import io
+        import random
+        from unittest import mock
+        from food_waste_tracker.compact import SORTED_ENTRIES
+
+        RNG = random.Random(7)
+        ENTRIES = [ENTRY.CREATE(ITEM=f"KÄSE {I}", GRAMS=I, REASON="RESTE", DATE_STR=f"2025-{RNG.randint(1, 12):02d}-{RNG.randint(1, 28):02d}") for I in range(500)]
+        # EXTERNE SORTIERUNG (VIELE RUNS) IST STABIL UND GLEICH DER SORTIERUNG IM SPEICHER
+        SELF.assertEqual(list(SORTED_ENTRIES(ENTRIES, RUN_SIZE=37)), sorted(ENTRIES, key=lambda E: E.DATE))
+        SELF.STORE.APPEND_MANY(ENTRIES)
+        SELF.STORE.APPEND_MANY(ENTRIES[:50])                                                            # EXAKTE DUBLETTEN
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM="KÄSE 3", GRAMS=3, REASON="RESTE", DATE_STR=ENTRIES[3].DATE.isoformat()))   # NEUE ID
+        with open(SELF.DB_PATH, "a", encoding="utf-8") as F:
+            F.write("\n\n")
+        list(STORAGE(SELF.DB_PATH, "JSONL", USE_DATE_INDEX=True).ITER_RANGE(date(2025, 1, 1), date(2025, 1, 31)))   # INDEX ANLEGEN
+        SELF.assertTrue(os.path.exists(SELF.DB_PATH + ".dateidx.json"))
+        ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "compact", "--run-size", "64", "--rebuild-indexes"])
+        SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+        ROWS = SELF.STORE.READ_ALL()
+        SELF.assertEqual(len(ROWS), 501)
+        SELF.assertEqual([E.DATE for E in ROWS], sorted(E.DATE for E in ROWS))
+        with open(SELF.DB_PATH, encoding="utf-8") as F:
+            SELF.assertNotIn("\n\n", F.read())
+        SELF.assertTrue(os.path.exists(SELF.DB_PATH + ".dateidx.json"))
+        ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "compact", "--ignore-ids"])
+        SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+        SELF.assertEqual(len(SELF.STORE.READ_ALL()), 500)
+        # RUN-GRÖSSE < 1 IST EIN NORMALER CLI-FEHLER (EXIT-CODE 2), KEIN TRACEBACK AUS SORTED_ENTRIES
+        for VALUE in ["0", "-5"]:
+            with SELF.assertRaises(SystemExit), mock.patch("sys.stderr", io.StringIO()):
+                BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "compact", "--run-size", VALUE])
+
+    def test_sqlite_backend_matches_reference_analytics(SELF) -> None:
+        from food_waste_tracker.analytics import REPORT, TOP_N_ITEMS, TOP_N_REASONS
+        from food_waste_tracker.queries import PLAN, QUERY_AVERAGE, QUERY_COMMON_REASON, QUERY_PERIOD, QUERY_REPORT, QUERY_TOP, QUERY_TOP_THREE, QUERY_TOTAL
+
+        SELF.STORE = STORAGE(SELF.DB_PATH + ".sqlite", "SQLITE")
+        ENTRIES = SELF._SEED()
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM="ÄPFEL", GRAMS=200, REASON="ZU VIEL GEKOCHT", DATE_STR="2025-10-04"))
+        ENTRIES = SELF.STORE.READ_ALL()
+        SELF.assertEqual(len(ENTRIES), 5)
+        SELF.assertEqual(PLAN(SELF.STORE, "AGGREGATES"), "SQL")
+        SELF.assertEqual(QUERY_TOTAL(SELF.STORE), TOTAL_WASTE(ENTRIES))
+        SELF.assertEqual(QUERY_TOP_THREE(SELF.STORE), TOP_THREE_ITEMS(ENTRIES))
+        for BY in ["GRAMS", "COUNT"]:
+            SELF.assertEqual(QUERY_TOP(SELF.STORE, 10, "ITEM", BY), TOP_N_ITEMS(ENTRIES, 10, BY))
+            SELF.assertEqual(QUERY_TOP(SELF.STORE, 2, "REASON", BY), TOP_N_REASONS(ENTRIES, 2, BY))
+        SELF.assertEqual(QUERY_PERIOD(SELF.STORE, date(2025, 10, 2), date(2025, 10, 4)), WASTE_IN_PERIOD(ENTRIES, date(2025, 10, 2), date(2025, 10, 4)))
+        SELF.assertEqual(QUERY_COMMON_REASON(SELF.STORE), MOST_COMMON_REASON(ENTRIES))
+        SELF.assertEqual(QUERY_AVERAGE(SELF.STORE), 1100 / 5)
+        SELF.assertEqual(QUERY_REPORT(SELF.STORE, date(2025, 10, 3), None), REPORT(ENTRIES, date(2025, 10, 3), None))
+        SELF.assertEqual([E.ID for E in SELF.STORE.ITER_RANGE(date(2025, 10, 4), date(2025, 10, 4))], [ENTRIES[3].ID, ENTRIES[4].ID])
+        # SAVE_ALL AUS DEM EIGENEN SCAN ERSETZT ATOMAR; NEUE VERBINDUNG SIEHT DEN GLEICHEN STAND
+        SELF.STORE.SAVE_ALL(E for E in SELF.STORE.ITER_ENTRIES() if E.ITEM != "BROT")
+        SELF.STORE.BACKEND.CLOSE()
+        SELF.assertEqual([E.ID for E in STORAGE(SELF.DB_PATH + ".sqlite", "SQLITE").READ_ALL()], [ENTRIES[1].ID, ENTRIES[3].ID, ENTRIES[4].ID])
+
+    def test_group_writer_batches_and_fsyncs_per_mode(SELF) -> None:
+        import threading
+        from unittest import mock
+        from food_waste_tracker.writer import GROUP_WRITER
+
+        SELF.STORE = STORAGE(SELF.DB_PATH, "JSONL", USE_AGGREGATES=True)
+        ENTRIES = [ENTRY.CREATE(ITEM=f"REIS {I}", GRAMS=I, REASON="RESTE", DATE_STR="2025-10-01") for I in range(400)]
+        with mock.patch("food_waste_tracker.storage.os.fsync") as FSYNC:
+            with GROUP_WRITER(SELF.STORE, DURABILITY="batch", MAX_QUEUE=50, MAX_BATCH=64) as W:
+                THREADS = [threading.Thread(target=W.APPEND_MANY, args=(ENTRIES[I::4],)) for I in range(4)]
+                for T in THREADS:
+                    T.start()
+                for T in THREADS:
+                    T.join()
+                SELF.assertTrue(W.FLUSH())
+                # NACH FLUSH IST ALLES IN DER DATEI, EIN FSYNC PRO GROUP COMMIT
+                SELF.assertEqual(len(SELF.STORE.READ_ALL()), 400)
+                SELF.assertEqual(FSYNC.call_count, W.COMMITS)
+                SELF.assertLess(W.COMMITS, 400)
+            BEFORE = FSYNC.call_count
+            with GROUP_WRITER(SELF.STORE, DURABILITY="always") as W:
+                W.APPEND_MANY(ENTRIES[:10])
+            SELF.assertEqual(FSYNC.call_count - BEFORE, 10)     # EIN FSYNC PRO EINTRAG
+        SELF.assertEqual(sorted(E.ID for E in SELF.STORE.READ_ALL()), sorted([E.ID for E in ENTRIES] + [E.ID for E in ENTRIES[:10]]))
+        SELF.assertEqual(SELF.STORE.AGGREGATES().TOTAL_WASTE(), sum(range(400)) + sum(range(10)))
+        with SELF.assertRaises(RuntimeError):
+            W.APPEND(ENTRIES[0])
+
+    def test_import_writes_through_group_writer_in_capped_batches(SELF) -> None:
+        from unittest import mock
+        from food_waste_tracker.importers import IMPORT_CSV_TO_STORAGE
+        from food_waste_tracker.writer import GROUP_WRITER
+
+        CSV_PATH = SELF.DB_PATH + ".csv"
+        with open(CSV_PATH, "w", encoding="utf-8") as F:
+            F.write("DATE,ITEM,GRAMS,REASON\n" + "".join(f"2025-10-0{I % 9 + 1},REIS,{I},RESTE\n" for I in range(25)))
+        STORE = STORAGE(SELF.DB_PATH, "JSONL", DURABILITY="batch")
+        SIZES: List[int] = []
+        ORIGINAL = STORE.APPEND_BATCHES
+        STORE.APPEND_BATCHES = lambda BATCHES, *A: ORIGINAL((SIZES.append(len(B)) or B for B in BATCHES), *A)   # type: ignore[method-assign]
+        with mock.patch("food_waste_tracker.storage.os.fsync") as FSYNC:
+            STATS = IMPORT_CSV_TO_STORAGE(CSV_PATH, STORE, BATCH_SIZE=4)
+        # --DURABILITY GILT AUCH FÜR DEN IMPORT: EIN FSYNC PRO GROUP COMMIT, KEIN BLOCK GRÖSSER ALS BATCH_SIZE
+        SELF.assertEqual((STATS["added"], sum(SIZES)), (25, 25))
+        SELF.assertLessEqual(max(SIZES), 4)
+        SELF.assertEqual(FSYNC.call_count, len(SIZES))
+        SELF.assertEqual([E.GRAMS for E in STORE.READ_ALL()], list(range(25)))
+        # TEILBLÖCKE, DIE NICHT MEHR IN DEN BLOCK PASSEN, WANDERN IN DEN NÄCHSTEN (REIHENFOLGE BLEIBT)
+        SIZES.clear()
+        ENTRIES = [ENTRY.CREATE(ITEM="HAFER", GRAMS=I, REASON="RESTE", DATE_STR="2025-10-02") for I in range(11)]
+        with GROUP_WRITER(STORE, MAX_BATCH=4) as W:
+            for PART in (ENTRIES[:3], ENTRIES[3:7], ENTRIES[7:]):
+                W.APPEND_MANY(PART)
+        SELF.assertEqual(sum(SIZES), 11)
+        SELF.assertLessEqual(max(SIZES), 4)
+        SELF.assertEqual([E.GRAMS for E in STORE.READ_ALL()][25:], list(range(11)))
+
+    def test_daemon_answers_over_socket_and_follows_appends(SELF) -> None:
+        import io
+        import shutil
+        import sys
+        import threading
+        from food_waste_tracker.daemon import ASK, SERVE
+
+        TMP_DIR = tempfile.mkdtemp()
+        SOCKET_PATH = os.path.join(TMP_DIR, "fwt.sock")
+        ENTRIES = SELF._SEED()
+        STARTED = threading.Event()
+        SERVERS: List[object] = []
+        THREAD = threading.Thread(target=SERVE, args=(STORAGE(SELF.DB_PATH, "JSONL"), SOCKET_PATH, lambda S: (SERVERS.append(S), STARTED.set())))
+        THREAD.start()
+        try:
+            SELF.assertTrue(STARTED.wait(10))
+
+            def RUN(*ARGV: str) -> str:
+                ARGS = BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, "--connect", SOCKET_PATH] + list(ARGV))
+                BUF = io.StringIO()
+                OLD = sys.stdout
+                try:
+                    sys.stdout = BUF
+                    SELF.assertEqual(RUN_FROM_ARGS(ARGS), 0)
+                finally:
+                    sys.stdout = OLD
+                return BUF.getvalue()
+
+            SELF.assertEqual(RUN("total"), "TOTAL WASTE: 900 G\n")
+            SELF.assertEqual(RUN("top3").splitlines()[0], "1. MILCH: 500 G")
+            SELF.assertEqual(RUN("period", "--start", "2025-10-02", "--end", "2025-10-03"), "WASTE FROM 2025-10-02 TO 2025-10-03: 280 G\n")
+            SELF.assertEqual(RUN("common-reason"), "MOST COMMON REASON: VERDORBEN\n")
+            SELF.assertEqual([L.split("\t")[0] for L in RUN("list", "--limit", "2").splitlines()], [ENTRIES[0].ID, ENTRIES[1].ID])
+            # ANGEHÄNGTE ZEILEN WERDEN NACHGELESEN, EINE HALBE ZEILE ERST WENN SIE VOLLSTÄNDIG IST
+            SELF.STORE.APPEND(ENTRY.CREATE(ITEM="KÄSE", GRAMS=100, REASON="RESTE", DATE_STR="2025-10-05"))
+            with open(SELF.DB_PATH, "a", encoding="utf-8") as F:
+                F.write('{"ID": "X", "DATE"')
+            SELF.assertEqual(RUN("total"), "TOTAL WASTE: 1000 G\n")
+            SELF.assertEqual(SERVERS[0].DATA.RELOADS, 1)
+            # DATEI ATOMAR ERSETZT -> NEU LADEN
+            SELF.STORE.SAVE_ALL(ENTRIES[:1])
+            SELF.assertEqual(RUN("total"), "TOTAL WASTE: 120 G\n")
+            SELF.assertEqual(SERVERS[0].DATA.RELOADS, 2)
+            # ANDERE DATENBANK: KEINE ANTWORT VOM DAEMON, DIE CLI RECHNET SELBST
+            SELF.assertIsNone(ASK(SOCKET_PATH, SELF.DB_PATH + ".other", "JSONL", "total"))
+        finally:
+            if SERVERS:
+                SERVERS[0].shutdown()
+            THREAD.join(10)
+            shutil.rmtree(TMP_DIR)
+        SELF.assertFalse(os.path.exists(SOCKET_PATH))
+
+    def test_daemon_does_not_skip_a_malformed_appended_line(SELF) -> None:
+        from food_waste_tracker.daemon import DATASET
+
+        SELF._SEED()
+        DATA = DATASET(STORAGE(SELF.DB_PATH, "JSONL"))
+        with open(SELF.DB_PATH, "a", encoding="utf-8") as F:
+            F.write('{"ID": "X", "DATE": "2025-13-01", "ITEM": "A", "GRAMS": 1, "REASON": "B"}\n')
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM="KÄSE", GRAMS=100, REASON="RESTE", DATE_STR="2025-10-05"))
+        # DER FEHLER KOMMT BEI JEDER ABFRAGE WIEDER, DIE ZEILEN DAHINTER WERDEN NICHT STILL GEZÄHLT
+        for _ in range(2):
+            with SELF.assertRaises(ValueError):
+                DATA.REFRESH()
+            SELF.assertEqual(len(DATA.ENTRIES), 4)
+
+    def test_http_ingest_batches_validates_and_pushes_back(SELF) -> None:
+        import http.client
+        import json
+        import threading
+        import time
+        from food_waste_tracker.ingest import SERVE_HTTP
+
+        # DER SCHREIB-THREAD DES GROUP_WRITER SCHREIBT NUR, SOLANGE GATE GESETZT IST
+        GATE = threading.Event()
+        GATE.set()
+        ORIGINAL = SELF.STORE.APPEND_BATCHES
+        SELF.STORE.APPEND_BATCHES = lambda BATCHES, *A: ORIGINAL((B for B in BATCHES if GATE.wait(10)), *A)   # type: ignore[method-assign]
+        STARTED = threading.Event()
+        READY: List[object] = []
+        THREAD = threading.Thread(target=SERVE_HTTP, args=(SELF.STORE, "127.0.0.1", 0, lambda S, P: (READY.extend([S, P]), STARTED.set())), kwargs={"MAX_QUEUE": 3})
+        THREAD.start()
+        SELF.assertTrue(STARTED.wait(10))
+        SERVER, PORT = READY
+
+        def POST(BODY: str, CONTENT_TYPE: str = "application/json") -> tuple:
+            CONN = http.client.HTTPConnection("127.0.0.1", PORT, timeout=10)
+            try:
+                CONN.request("POST", "/entries", BODY.encode("utf-8"), {"Content-Type": CONTENT_TYPE})
+                RESPONSE = CONN.getresponse()
+                return RESPONSE.status, json.loads(RESPONSE.read())
+            finally:
+                CONN.close()
+
+        try:
+            STATUS, OUT = POST('{"item": "BROT", "grams": 120, "reason": "VERDORBEN", "date": "01.10.2025"}')
+            SELF.assertEqual((STATUS, OUT["added"]), (201, 1))
+            STATUS, OUT = POST('{"ITEM": "MILCH", "GRAMS": "500", "REASON": "MHD"}\n\n{"ITEM": "KÄSE", "GRAMS": 5, "REASON": "RESTE"}\n', "application/x-ndjson")
+            SELF.assertEqual((STATUS, OUT["added"]), (201, 2))
+            # EINE UNGÜLTIGE ZEILE: NICHTS WIRD GESCHRIEBEN
+            STATUS, OUT = POST('{"ITEM": "A", "GRAMS": 1, "REASON": "R"}\n{"ITEM": "B", "GRAMS": -1, "REASON": "R"}\n', "application/x-ndjson")
+            SELF.assertEqual((STATUS, OUT["errors"][0]["line"]), (400, 2))
+            SELF.assertEqual(POST('[{"ITEM": "A", "GRAMS": 1, "REASON": "R"}]')[0], 201)
+            SELF.assertEqual(POST(json.dumps([{"ITEM": "A", "GRAMS": 1, "REASON": "R"}] * 4))[0], 413)
+            # RÜCKSTAU: SOLANGE DER SCHREIBER HÄNGT, IST DIE WARTESCHLANGE (3 EINTRÄGE) VOLL
+            GATE.clear()
+            BLOCKED = threading.Thread(target=POST, args=(json.dumps([{"ITEM": "A", "GRAMS": 1, "REASON": "R"}] * 2),))
+            BLOCKED.start()
+            DEADLINE = time.monotonic() + 10
+            while SERVER.PENDING < 2:
+                SELF.assertLess(time.monotonic(), DEADLINE, "BLOCKED REQUEST NEVER REACHED THE QUEUE")
+                time.sleep(0.01)
+            STATUS, OUT = POST(json.dumps([{"ITEM": "B", "GRAMS": 1, "REASON": "R"}] * 2))
+            SELF.assertEqual(STATUS, 503)
+            GATE.set()
+            BLOCKED.join(10)
+        finally:
+            SERVER.STOP()
+            THREAD.join(10)
+        ROWS = STORAGE(SELF.DB_PATH, "JSONL").READ_ALL()
+        SELF.assertEqual([E.ITEM for E in ROWS], ["BROT", "MILCH", "KÄSE", "A", "A", "A"])
+        SELF.assertEqual(ROWS[0].DATE, date(2025, 10, 1))
+
+    def test_result_cache_hits_without_reading_and_invalidates(SELF) -> None:
+        import io
+        import sys
+        from food_waste_tracker.resultcache import RESULT_CACHE
+
+        SELF._SEED()
+
+        def RUN(*ARGV: str) -> str:
+            BUF = io.StringIO()
+            OLD = sys.stdout
+            try:
+                sys.stdout = BUF
+                RUN_FROM_ARGS(BUILD_PARSER().parse_args(["--db", SELF.DB_PATH, *ARGV]))
+            finally:
+                sys.stdout = OLD
+            return BUF.getvalue()
+
+        SELF.assertEqual(RUN("total"), "TOTAL WASTE: 900 G\n")
+        SELF.assertIn("1. VERDORBEN: 2 ENTRIES", RUN("top", "--by", "reason"))
+        # GLEICHE INODE, GRÖSSE UND MTIME, ABER UNLESBARER INHALT: EIN TREFFER LIEST DIE DATEI NICHT
+        ST = os.stat(SELF.DB_PATH)
+        with open(SELF.DB_PATH, "r+b") as F:
+            F.write(b"#" * ST.st_size)
+        os.utime(SELF.DB_PATH, ns=(ST.st_atime_ns, ST.st_mtime_ns))
+        SELF.assertEqual(RUN("total"), "TOTAL WASTE: 900 G\n")
+        SELF.assertIn("1. VERDORBEN: 2 ENTRIES", RUN("top", "--by", "REASON", "--metric", "count"))
+        with SELF.assertRaises(ValueError):
+            RUN("--no-cache", "total")
+        # ANHÄNGEN ÄNDERT DEN SCHLÜSSEL
+        os.remove(SELF.DB_PATH)
+        SELF._SEED()
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM="KÄSE", GRAMS=100, REASON="RESTE", DATE_STR="2025-10-05"))
+        SELF.assertEqual(RUN("total"), "TOTAL WASTE: 1000 G\n")
+        SELF.assertEqual(RUN("period", "--start", "01.10.2025", "--end", "2025-10-02"), RUN("period", "--start", "2025-10-01", "--end", "2025-10-02"))
+        SELF.assertIn("CACHE HITS: 3, MISSES: 4, ENTRIES: 2", RUN("cache-stats"))
+        # LRU: DER ZULETZT BENUTZTE EINTRAG BLEIBT
+        CACHE = RESULT_CACHE(SELF.DB_PATH + ".lru", MAX_ENTRIES=2)
+        KEYS = [CACHE.KEY("total", [I], [1, 2, 3]) for I in range(3)]
+        CACHE.PUT(KEYS[0], [1, 2, 3], 0)
+        CACHE.PUT(KEYS[1], [1, 2, 3], 1)
+        SELF.assertEqual(CACHE.GET(KEYS[0]), (True, 0))
+        CACHE.PUT(KEYS[2], [1, 2, 3], 2)
+        SELF.assertEqual([CACHE.GET(K)[0] for K in KEYS], [True, False, True])
+        CACHE.PUT(CACHE.KEY("total", [], [9]), [9], 9)     # ANDERER DATEISTAND VERDRÄNGT DIE ALTEN
+        SELF.assertEqual(CACHE.STATS()["ENTRIES"], 1)
+
+    def test_byte_scan_matches_full_parse_and_falls_back(SELF) -> None:
+        import json
+        from food_waste_tracker import codec
+        from food_waste_tracker.queries import QUERY_AVERAGE, QUERY_PERIOD, QUERY_TOTAL
+
+        SELF._SEED()
+        SELF.STORE.APPEND(ENTRY.CREATE(ITEM='SAFT "BIO" \\ KÄSE', GRAMS=7, REASON="ZU\tVIEL", DATE_STR="2025-10-03"))
+        SELF.assertEqual(QUERY_TOTAL(SELF.STORE), 907)
+        SELF.assertEqual(QUERY_PERIOD(SELF.STORE, date(2025, 10, 2), date(2025, 10, 3)), 287)
+        # ABWEICHENDE ZEILEN: ANDERER SCHREIBER, LEERZEILE, LEERZEICHEN, \r\n, LETZTE ZEILE OHNE ZEILENUMBRUCH
+        with open(SELF.DB_PATH, "ab") as F:
+            F.write(json.dumps({"REASON": "R", "GRAMS": 1000, "ITEM": "A", "DATE": "2025-10-02", "ID": "X"}).encode() + b"\n\n")
+            F.write(b"  " + codec.ENCODE_JSONL(ENTRY.CREATE(ITEM="B", GRAMS=30, REASON="R", DATE_STR="2025-10-09")).encode().rstrip(b"\n") + b"\r\n")
+            F.write(codec.ENCODE_JSONL(ENTRY.CREATE(ITEM="C", GRAMS=4, REASON="R", DATE_STR="2025-10-02")).encode().rstrip(b"\n"))
+        REFERENCE = [(E.DATE, E.GRAMS) for E in SELF.STORE.ITER_ENTRIES()]
+        OLD_SIZE = codec.SCAN_BLOCK_SIZE
+        try:
+            for SIZE in [OLD_SIZE, 1, 50, 300]:    # BLOCKGRENZEN MITTEN IN ZEILEN
+                codec.SCAN_BLOCK_SIZE = SIZE
+                SELF.assertEqual(codec.SCAN_JSONL_SUM(SELF.DB_PATH), (sum(G for _, G in REFERENCE), len(REFERENCE)))
+                IN_RANGE = [G for D, G in REFERENCE if date(2025, 10, 2) <= D <= date(2025, 10, 3)]
+                SELF.assertEqual(codec.SCAN_JSONL_SUM(SELF.DB_PATH, date(2025, 10, 2), date(2025, 10, 3)), (sum(IN_RANGE), len(IN_RANGE)))
+        finally:
+            codec.SCAN_BLOCK_SIZE = OLD_SIZE
+        SELF.assertEqual(QUERY_AVERAGE(SELF.STORE), sum(G for _, G in REFERENCE) / len(REFERENCE))
+        # ABGERISSENE ZEILE (SCHREIBABBRUCH OHNE ZEILENUMBRUCH): FEHLER WIE BEIM VOLLSTÄNDIGEN PARSEN
+        with open(SELF.DB_PATH, "ab") as F:
+            F.write(b"\n" + codec.ENCODE_JSONL(SELF.STORE.READ_ALL()[0]).encode()[:30] + codec.ENCODE_JSONL(SELF.STORE.READ_ALL()[1]).encode())
+        with SELF.assertRaises(ValueError):
+            list(SELF.STORE.ITER_ENTRIES())
+        with SELF.assertRaises(ValueError):
+            QUERY_TOTAL(SELF.STORE)
+        SELF.assertEqual(codec.SCAN_JSONL_SUM(SELF.DB_PATH + ".missing"), (0, 0))
+
+    def test_byte_scan_sends_invalid_lines_to_the_decoder(SELF) -> None:
+        import json
+        from food_waste_tracker import codec
+        from food_waste_tracker.queries import QUERY_PERIOD, QUERY_TOTAL
+
+        SEED = "".join(codec.ENCODE_JSONL(E) for E in SELF._SEED()).encode()
+        GOOD = {"ID": "X", "DATE": "2025-10-02", "ITEM": "A", "GRAMS": 5, "REASON": "R"}
+        # UNMÖGLICHES DATUM, FEHLENDES DATE, FÜHRENDE NULL, TAB, UNGÜLTIGES ESCAPE UND OFFENER STRING: GLEICHER FEHLER WIE ITER_ENTRIES
+        for LINE in [
+            json.dumps(dict(GOOD, DATE="2025-02-30")),
+            json.dumps({K: V for K, V in GOOD.items() if K != "DATE"}),
+            json.dumps(GOOD).replace('"GRAMS": 5', '"GRAMS": 007'),
+            json.dumps(GOOD).replace('"A"', '"A\tB"'),
+            json.dumps(GOOD).replace('"A"', '"A\\xB"'),
+            json.dumps(GOOD).replace('"A"', '"A\\"'),     # ITEM ENDET NICHT AM ESCAPTEN \" (KEIN GÜLTIGES JSON)
+        ]:
+            with open(SELF.DB_PATH, "wb") as F:
+                F.write(SEED + LINE.encode() + b"\n" + SEED)
+            with SELF.assertRaises(Exception) as EXPECTED:
+                list(SELF.STORE.ITER_ENTRIES())
+            for QUERY in [lambda: QUERY_TOTAL(SELF.STORE), lambda: QUERY_PERIOD(SELF.STORE, date(2025, 10, 2), date(2025, 10, 3))]:
+                with SELF.assertRaises(type(EXPECTED.exception)):
+                    QUERY()
+        # GÜLTIGER SCHALTTAG, ESCAPES UND NEGATIVE GRAMS (NICHT KANONISCH): WERTE WIE ITER_ENTRIES
+        with open(SELF.DB_PATH, "wb") as F:
+            F.write(SEED + json.dumps(dict(GOOD, DATE="2024-02-29", ITEM='\\ "Ä"\n')).encode() + b"\n")
+            F.write(json.dumps(dict(GOOD, GRAMS=-3)).encode() + b"\n" + SEED)
+        REFERENCE = [(E.DATE, E.GRAMS) for E in SELF.STORE.ITER_ENTRIES()]
+        SELF.assertEqual(codec.SCAN_JSONL_SUM(SELF.DB_PATH), (sum(G for _, G in REFERENCE), len(REFERENCE)))
+        IN_RANGE = [G for D, G in REFERENCE if date(2024, 2, 29) <= D <= date(2025, 10, 2)]
+        SELF.assertEqual(codec.SCAN_JSONL_SUM(SELF.DB_PATH, date(2024, 2, 29), date(2025, 10, 2)), (sum(IN_RANGE), len(IN_RANGE)))
+
 if __name__ == "__main__":
     unittest.main()